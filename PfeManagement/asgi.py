@@ -3,6 +3,10 @@ ASGI config for PfeManagement project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serving through this callable (for example ``uvicorn PfeManagement.asgi:application``)
+lets the server-sent events endpoint at ``internship/events/`` hold idle
+connections on the event loop instead of tying up a worker thread each.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -12,5 +16,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'PfeManagement.settings')
+# Read by the settings: no persistent database connections under ASGI without a pool
+os.environ.setdefault('SERVER_INTERFACE', 'asgi')
 
 application = get_asgi_application()
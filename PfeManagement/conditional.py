@@ -0,0 +1,62 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+
+def collection_state(queryset, *timestamp_fields):
+    """
+    Return (last_modified, count) for a queryset with one aggregate query.
+    The count catches deletions, which leave no newer timestamp behind.
+    """
+    aggregates = {f'latest_{index}': Max(field) for index, field in enumerate(timestamp_fields or ['updated_at'])}
+    state = queryset.order_by().aggregate(count=Count('pk'), **aggregates)
+    timestamps = [state[key] for key in aggregates if state[key] is not None]
+    return (max(timestamps) if timestamps else None), state['count']
+
+
+class ConditionalGetMixin:
+    """
+    ETag / Last-Modified support for APIViews. A view computes a cheap version
+    of its resource and calls not_modified() before loading and serializing it:
+
+        not_modified = self.not_modified(request, internship.updated_at)
+        if not_modified:
+            return not_modified
+
+    Lists use collection_not_modified() with collection_state() instead.
+    """
+
+    def not_modified(self, request, last_modified, *version):
+        """Return a 304 response when the client's copy is current, otherwise None"""
+        return self._conditional_response(request, last_modified, version, send_last_modified=True)
+
+    def collection_not_modified(self, request, last_modified, count, *version):
+        """
+        not_modified() for a list, with the (last_modified, count) of
+        collection_state(). Lists are validated by ETag only: a deletion changes
+        the count but no timestamp, so If-Modified-Since would answer 304.
+        """
+        return self._conditional_response(request, last_modified, (count, *version), send_last_modified=False)
+
+    def _conditional_response(self, request, last_modified, version, send_last_modified):
+        fingerprint = '|'.join(str(part) for part in (
+            request.user.pk, request.get_full_path(),
+            last_modified.isoformat() if last_modified else '', *version
+        ))
+        self.etag = '"%s"' % hashlib.sha1(fingerprint.encode()).hexdigest()
+        self.last_modified = int(last_modified.timestamp()) if last_modified and send_last_modified else None
+        return get_conditional_response(request, etag=self.etag, last_modified=self.last_modified)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        etag = getattr(self, 'etag', None)
+        if etag and response.status_code in (200, 201, 304) and request.method in ('GET', 'HEAD'):
+            response['ETag'] = etag
+            if self.last_modified is not None:
+                response['Last-Modified'] = http_date(self.last_modified)
+            # Responses depend on who is asking; make shared caches revalidate
+            response['Cache-Control'] = 'private, no-cache'
+            patch_vary_headers(response, ['Authorization'])
+        return response
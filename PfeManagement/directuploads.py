@@ -0,0 +1,226 @@
+"""
+Direct uploads to object storage.
+
+Instead of posting a file through the API, a client asks for a presigned PUT
+URL, sends the file straight to the bucket and confirms the upload:
+
+    POST /uploads/presign/  {"target": "report", "file_name": "r.pdf", "size": 48213}
+    PUT  <url> with the returned headers and the file as body
+    POST /uploads/confirm/  {"upload_id": "..."}
+
+Confirmation applies the checks LimitedUploadHandler makes on proxied
+uploads (size, magic bytes) to the stored object and returns an upload id.
+The create and update endpoints accept that id in place of the file, so no
+file byte ever passes through an application worker. Every presigned key gets
+a delayed job that deletes the object if no row has attached it once its
+upload ids have expired, so abandoned uploads do not pile up in the bucket.
+"""
+import os
+import uuid
+from datetime import timedelta
+
+from django.apps import apps
+from django.core import signing
+from django.utils.text import get_valid_filename
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import serializers, status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from jobs.queue import enqueue
+from PfeManagement.objectstorage import content_type_for, is_enabled, presign
+from PfeManagement.uploads import DOCUMENT_UPLOAD, IMAGE_UPLOAD, SNIFF_LENGTH, UploadRejected, sniff
+
+UPLOAD_TARGETS = {
+    'cahier_de_charges': ('internship.Internship', 'cahier_de_charges', DOCUMENT_UPLOAD),
+    'report': ('student.Report', 'file_path', DOCUMENT_UPLOAD),
+    'profile_picture': ('authentication.User', 'profile_picture', IMAGE_UPLOAD),
+}
+
+EXTENSION_KINDS = {
+    '.pdf': 'pdf', '.doc': 'doc', '.docx': 'docx',
+    '.jpg': 'jpeg', '.jpeg': 'jpeg', '.png': 'png', '.gif': 'gif', '.webp': 'webp',
+}
+
+PENDING_SALT = 'direct-upload.pending'
+CONFIRMED_SALT = 'direct-upload.confirmed'
+# Upload ids are valid for a day; the PUT URL itself expires much sooner
+UPLOAD_ID_MAX_AGE = 24 * 60 * 60
+# A pending id can be confirmed on its last second, and the confirmed id lasts as long again
+DISCARD_UNATTACHED_AFTER = timedelta(seconds=2 * UPLOAD_ID_MAX_AGE)
+
+
+def _target_field(target):
+    model_label, field_name, limit = UPLOAD_TARGETS[target]
+    return apps.get_model(model_label)._meta.get_field(field_name), limit
+
+
+def _object_key(field, file_name):
+    """Unique key under the field's upload_to, trimmed to fit the column"""
+    name = get_valid_filename(os.path.basename(file_name))
+    key = field.generate_filename(None, f'{uuid.uuid4().hex}/{name}')
+    excess = len(key) - field.max_length
+    if excess > 0:
+        stem, extension = os.path.splitext(name)
+        key = field.generate_filename(None, f'{uuid.uuid4().hex}/{stem[:-excess]}{extension}')
+    return key
+
+
+def start_upload(user, target, file_name, size):
+    """Reserve an object key and return the presigned PUT for it; raises UploadRejected"""
+    field, limit = _target_field(target)
+    kind = EXTENSION_KINDS.get(os.path.splitext(file_name)[1].lower())
+    if kind not in limit.kinds:
+        raise UploadRejected(
+            f"'{file_name}' is not an allowed file type ({', '.join(limit.kinds)}).",
+            status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+        )
+    if size > limit.max_bytes:
+        raise UploadRejected(
+            f"'{file_name}' exceeds the {limit.max_bytes // (1024 * 1024)}MB limit for {target}.",
+            status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        )
+
+    key = _object_key(field, file_name)
+    enqueue('administrator.discard_unattached_upload', {'target': target, 'key': key}, delay=DISCARD_UNATTACHED_AFTER)
+    # Signed, so the bucket refuses a body of another size or type
+    headers = {'Content-Type': content_type_for(key), 'Content-Length': str(size)}
+    return {
+        'upload_id': signing.dumps({'user': user.id, 'target': target, 'key': key, 'size': size}, salt=PENDING_SALT),
+        'method': 'PUT',
+        'url': presign('PUT', key, headers=headers),
+        'headers': headers,
+    }
+
+
+def _load(upload_id, salt, user=None):
+    try:
+        upload = signing.loads(upload_id, salt=salt, max_age=UPLOAD_ID_MAX_AGE)
+    except signing.BadSignature:
+        return None
+    if user is not None and upload['user'] != user.id:
+        return None
+    return upload
+
+
+def confirm_upload(user, upload_id):
+    """
+    Check an object the client has PUT and return the id that attaches it to
+    a model. Objects failing the checks are deleted; raises UploadRejected.
+    """
+    upload = _load(upload_id, PENDING_SALT, user)
+    if upload is None:
+        raise UploadRejected('Invalid or expired upload id.', status.HTTP_400_BAD_REQUEST)
+    field, limit = _target_field(upload['target'])
+    storage = field.storage
+
+    headers = storage.head(upload['key'])
+    if headers is None:
+        raise UploadRejected('The file has not been uploaded yet.', status.HTTP_400_BAD_REQUEST)
+    size = int(headers['Content-Length'])
+    if size > limit.max_bytes:
+        storage.delete(upload['key'])
+        raise UploadRejected(
+            f"The file exceeds the {limit.max_bytes // (1024 * 1024)}MB limit.",
+            status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        )
+    if sniff(storage.read_head(upload['key'], SNIFF_LENGTH)) not in limit.kinds:
+        storage.delete(upload['key'])
+        raise UploadRejected(
+            f"The file is not an allowed file type ({', '.join(limit.kinds)}).",
+            status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+        )
+
+    confirmed = {'user': upload['user'], 'target': upload['target'], 'key': upload['key']}
+    return {
+        'upload_id': signing.dumps(confirmed, salt=CONFIRMED_SALT),
+        'name': upload['key'],
+        'size': size,
+    }
+
+
+def discard_unattached(target, key):
+    """Delete a directly uploaded object that no row attached before its ids expired"""
+    field, _ = _target_field(target)
+    if not field.model.objects.filter(**{field.name: key}).exists():
+        field.storage.delete(key)
+
+
+class DirectUploadMixin:
+    """
+    File serializer field that also accepts the id of a confirmed direct
+    upload; the stored object is then attached as it is.
+    """
+
+    def __init__(self, *args, upload_target, **kwargs):
+        self.upload_target = upload_target
+        super().__init__(*args, **kwargs)
+
+    def to_internal_value(self, data):
+        if not isinstance(data, str) or not data:
+            return super().to_internal_value(data)
+        request = self.context.get('request')
+        user = getattr(request, 'user', None)
+        # Ids are bound to their uploader, so there must be one to check against
+        if user is None or not user.is_authenticated:
+            raise serializers.ValidationError('Upload ids require an authenticated user.')
+        upload = _load(data, CONFIRMED_SALT, user)
+        if upload is None or upload['target'] != self.upload_target:
+            raise serializers.ValidationError('Invalid or expired upload id.')
+        field, _ = _target_field(self.upload_target)
+        # The object is deleted with its row, so it must belong to one row only
+        if field.model.objects.filter(**{field.name: upload['key']}).exists():
+            raise serializers.ValidationError('This upload is already attached.')
+        return upload['key']
+
+
+class DirectUploadFileField(DirectUploadMixin, serializers.FileField):
+    pass
+
+
+class DirectUploadImageField(DirectUploadMixin, serializers.ImageField):
+    pass
+
+
+class PresignUploadSerializer(serializers.Serializer):
+    target = serializers.ChoiceField(choices=list(UPLOAD_TARGETS))
+    file_name = serializers.CharField(max_length=255)
+    size = serializers.IntegerField(min_value=1)
+
+
+class ConfirmUploadSerializer(serializers.Serializer):
+    upload_id = serializers.CharField()
+
+
+class PresignUploadView(APIView):
+    """Issue a presigned URL to upload a file directly to object storage"""
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(request_body=PresignUploadSerializer)
+    def post(self, request):
+        if not is_enabled():
+            return Response({'error': 'Direct uploads are not enabled.'}, status=status.HTTP_404_NOT_FOUND)
+        serializer = PresignUploadSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        upload = start_upload(request.user, **serializer.validated_data)
+        return Response(upload, status=status.HTTP_201_CREATED)
+
+
+class ConfirmUploadView(APIView):
+    """Check a direct upload and return the id to attach it with"""
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(request_body=ConfirmUploadSerializer)
+    def post(self, request):
+        if not is_enabled():
+            return Response({'error': 'Direct uploads are not enabled.'}, status=status.HTTP_404_NOT_FOUND)
+        serializer = ConfirmUploadSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            upload = confirm_upload(request.user, serializer.validated_data['upload_id'])
+        except OSError:
+            return Response({'error': 'Object storage is unavailable.'}, status=status.HTTP_502_BAD_GATEWAY)
+        return Response(upload, status=status.HTTP_200_OK)
@@ -0,0 +1,108 @@
+"""
+Sparse fieldsets: `?fields=id,title,status` limits a response to some fields
+and `?expand=student_id` nests a related object in place of its id.
+
+Serializers opt in with SparseFieldsetMixin and describe, in Meta, what each
+computed field reads:
+
+    field_sources = {'student_name': ['student_id__first_name', ...]}
+    expandable_fields = {'student_id': UserSummarySerializer}
+
+Views parse the request into a Fieldset, which both narrows the queryset
+(.only() on the columns the kept fields read, select_related only for the
+relations they traverse) and prunes the serializer:
+
+    fieldset, error = parse_fieldset(request, InternshipSerializer)
+    if error:
+        return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+    serializer = InternshipSerializer(fieldset.apply(internships), many=True, fieldset=fieldset)
+"""
+from drf_yasg import openapi
+
+FIELDSET_PARAMETERS = [
+    openapi.Parameter(
+        'fields', openapi.IN_QUERY,
+        description="Comma-separated fields to include (default: all)", type=openapi.TYPE_STRING
+    ),
+    openapi.Parameter(
+        'expand', openapi.IN_QUERY,
+        description="Comma-separated related fields to nest as objects", type=openapi.TYPE_STRING
+    ),
+]
+
+
+def _split(value):
+    return [name.strip() for name in (value or '').split(',') if name.strip()]
+
+
+class Fieldset:
+    """The fields and expansions requested for one serializer class"""
+
+    def __init__(self, serializer_class, fields=None, expand=()):
+        self.serializer_class = serializer_class
+        self.fields = set(fields) if fields else None
+        self.expand = set(expand)
+
+    def includes(self, name):
+        return self.fields is None or name in self.fields or name in self.expand
+
+    def source_paths(self):
+        """Model paths read by the kept fields, e.g. 'title' or 'student_id__last_name'"""
+        meta = self.serializer_class.Meta
+        sources = getattr(meta, 'field_sources', {})
+        expandable = getattr(meta, 'expandable_fields', {})
+        paths = set()
+        for name in meta.fields:
+            if not self.includes(name):
+                continue
+            if name in self.expand:
+                paths.update(f'{name}__{field}' for field in expandable[name].Meta.fields)
+            else:
+                paths.update(sources.get(name, [name]))
+        return paths
+
+    def apply(self, queryset, *extra_paths):
+        """Load only the columns and joins the kept fields need (plus `extra_paths`)"""
+        paths = self.source_paths() | set(extra_paths)
+        relations = set()
+        for path in paths:
+            parts = path.split('__')
+            relations.update('__'.join(parts[:depth]) for depth in range(1, len(parts)))
+        # A relation traversed by select_related must itself be loaded
+        queryset = queryset.select_related(*sorted(relations)) if relations else queryset.select_related(None)
+        return queryset.only(*sorted(paths | relations))
+
+
+def parse_fieldset(request, serializer_class):
+    """Return (Fieldset, None), or (None, error message) for unknown field names"""
+    meta = serializer_class.Meta
+    readable = [
+        name for name, field in serializer_class().fields.items() if not field.write_only
+    ]
+    fields = _split(request.query_params.get('fields'))
+    expand = _split(request.query_params.get('expand'))
+
+    unknown = [name for name in fields if name not in readable]
+    if unknown:
+        return None, f"Unknown fields: {', '.join(unknown)}."
+    expandable = getattr(meta, 'expandable_fields', {})
+    not_expandable = [name for name in expand if name not in expandable]
+    if not_expandable:
+        return None, f"Fields cannot be expanded: {', '.join(not_expandable)}."
+    return Fieldset(serializer_class, fields, expand), None
+
+
+class SparseFieldsetMixin:
+    """Serializer mixin dropping the fields a Fieldset leaves out and nesting expanded ones"""
+
+    def __init__(self, *args, fieldset=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fieldset is None:
+            return
+        if fieldset.fields is not None:
+            for name in list(self.fields):
+                if not fieldset.includes(name):
+                    self.fields.pop(name)
+        expandable = getattr(self.Meta, 'expandable_fields', {})
+        for name in fieldset.expand:
+            self.fields[name] = expandable[name](read_only=True)
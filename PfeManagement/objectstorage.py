@@ -0,0 +1,166 @@
+"""
+S3-compatible object storage without an SDK.
+
+Every request is authenticated with an AWS Signature Version 4 presigned
+URL, which AWS S3, MinIO and the other S3-compatible services all accept.
+The same signing serves clients (direct uploads and downloads, see
+PfeManagement/directuploads.py) and the server: ObjectStorage is the Django
+storage backend used for file fields when OBJECT_STORAGE_ENDPOINT is set.
+"""
+import datetime
+import hashlib
+import hmac
+import mimetypes
+from urllib.error import HTTPError
+from urllib.parse import quote, urlsplit
+from urllib.request import Request, urlopen
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import Storage
+from django.utils.deconstruct import deconstructible
+
+ALGORITHM = 'AWS4-HMAC-SHA256'
+REQUEST_TIMEOUT = 30
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def is_enabled():
+    return bool(getattr(settings, 'OBJECT_STORAGE_ENDPOINT', ''))
+
+
+def object_url(key):
+    """Path-style URL of an object, which works without bucket DNS names"""
+    endpoint = settings.OBJECT_STORAGE_ENDPOINT.rstrip('/')
+    return f"{endpoint}/{settings.OBJECT_STORAGE_BUCKET}/{quote(key, safe='/~')}"
+
+
+def _host(parts):
+    # Clients leave default ports out of the Host header, so the signature must too
+    if parts.port and parts.port != DEFAULT_PORTS.get(parts.scheme):
+        return f'{parts.hostname}:{parts.port}'
+    return parts.hostname
+
+
+def _hmac(key, message):
+    return hmac.new(key, message.encode(), hashlib.sha256).digest()
+
+
+def presign(method, key, headers=None, expires=None, now=None):
+    """
+    Presigned URL for one `method` request on `key`. `headers` (e.g.
+    Content-Type and Content-Length of an upload) are signed as well: the
+    request is refused unless it sends exactly those values.
+    """
+    expires = expires or settings.OBJECT_STORAGE_URL_EXPIRY
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    amz_date = now.strftime('%Y%m%dT%H%M%SZ')
+    scope = f'{amz_date[:8]}/{settings.OBJECT_STORAGE_REGION}/s3/aws4_request'
+
+    url = object_url(key)
+    parts = urlsplit(url)
+    signed = {'host': _host(parts)}
+    signed.update({name.lower(): str(value).strip() for name, value in (headers or {}).items()})
+    signed_headers = ';'.join(sorted(signed))
+
+    query = {
+        'X-Amz-Algorithm': ALGORITHM,
+        'X-Amz-Credential': f'{settings.OBJECT_STORAGE_ACCESS_KEY}/{scope}',
+        'X-Amz-Date': amz_date,
+        'X-Amz-Expires': str(expires),
+        'X-Amz-SignedHeaders': signed_headers,
+    }
+    canonical_query = '&'.join(
+        f"{quote(name, safe='~')}={quote(value, safe='~')}" for name, value in sorted(query.items())
+    )
+    canonical_request = '\n'.join([
+        method,
+        parts.path,
+        canonical_query,
+        ''.join(f'{name}:{signed[name]}\n' for name in sorted(signed)),
+        signed_headers,
+        'UNSIGNED-PAYLOAD',
+    ])
+    string_to_sign = '\n'.join([
+        ALGORITHM, amz_date, scope, hashlib.sha256(canonical_request.encode()).hexdigest()
+    ])
+
+    signing_key = f'AWS4{settings.OBJECT_STORAGE_SECRET_KEY}'.encode()
+    for part in (amz_date[:8], settings.OBJECT_STORAGE_REGION, 's3', 'aws4_request'):
+        signing_key = _hmac(signing_key, part)
+    signature = hmac.new(signing_key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+    return f'{url}?{canonical_query}&X-Amz-Signature={signature}'
+
+
+def content_type_for(name):
+    return mimetypes.guess_type(name)[0] or 'application/octet-stream'
+
+
+@deconstructible
+class ObjectStorage(Storage):
+    """Django storage backend keeping files in the OBJECT_STORAGE_BUCKET bucket"""
+
+    def _request(self, method, name, data=None, headers=None):
+        request = Request(presign(method, name), data=data, method=method, headers=headers or {})
+        return urlopen(request, timeout=REQUEST_TIMEOUT)
+
+    def head(self, name):
+        """Response headers of the object, or None when it does not exist"""
+        try:
+            with self._request('HEAD', name) as response:
+                return response.headers
+        except HTTPError as exc:
+            if exc.code == 404:
+                return None
+            raise
+
+    def read_head(self, name, length):
+        """First `length` bytes of the object, without downloading the rest"""
+        with self._request('GET', name, headers={'Range': f'bytes=0-{length - 1}'}) as response:
+            return response.read(length)
+
+    def _open(self, name, mode='rb'):
+        """
+        The object as it arrives: reads come straight from the GET response, so
+        nothing is written to disk and the first bytes are available at once.
+        The file is not seekable; callers needing random access copy it first.
+        """
+        try:
+            response = self._request('GET', name)
+        except HTTPError as exc:
+            if exc.code == 404:
+                # What FileSystemStorage raises, so callers need not know the backend
+                raise FileNotFoundError(name) from exc
+            raise
+        streamed = File(response, name=name)
+        streamed.size = int(response.headers['Content-Length'])
+        return streamed
+
+    def _save(self, name, content):
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        # urllib streams file objects in blocks when the length is known
+        headers = {'Content-Length': str(content.size), 'Content-Type': content_type_for(name)}
+        self._request('PUT', name, data=content, headers=headers).close()
+        return name
+
+    def exists(self, name):
+        return self.head(name) is not None
+
+    def size(self, name):
+        headers = self.head(name)
+        if headers is None:
+            raise FileNotFoundError(name)
+        return int(headers['Content-Length'])
+
+    def delete(self, name):
+        if not name:
+            raise ValueError('The name must be given to delete().')
+        try:
+            self._request('DELETE', name).close()
+        except HTTPError as exc:
+            if exc.code != 404:
+                raise
+
+    def url(self, name):
+        return presign('GET', name)
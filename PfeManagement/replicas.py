@@ -0,0 +1,211 @@
+"""
+Read-replica routing.
+
+ReplicaRoutingMiddleware records each request in a context variable, and
+ReplicaRouter sends the reads of GET, HEAD and OPTIONS requests to one of
+settings.DATABASE_REPLICAS, picked once per request. Everything else goes to
+the primary ('default'): writes, every read after the request's first write
+(so a transaction reads what it wrote), background jobs and management
+commands.
+
+Read-your-writes: a request that wrote makes its user sticky for
+REPLICA_STICKY_SECONDS, during which all of that user's reads go to the primary.
+The mark is kept in the default cache, which must be shared by the server
+processes: the middleware refuses to start with replicas and a cache private
+to one process. A replica lagging more than REPLICA_MAX_LAG_SECONDS,
+or that cannot be reached, is skipped until its next check, every
+REPLICA_LAG_CHECK_INTERVAL seconds per process.
+"""
+import random
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.auth.base_user import AbstractBaseUser
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# app_label of the model DatabaseCache queries through
+CACHE_APP_LABEL = 'django_cache'
+
+# Cache backends that cannot carry a sticky mark to the other processes
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+_request_state = ContextVar('replica_request_state', default=None)
+
+# alias -> (checked at, lag in seconds or None when unreachable)
+_lag_checks = {}
+_lag_lock = threading.Lock()
+
+# On a replica, the time since the last replayed transaction; 0 once it has
+# replayed everything it received, so an idle primary does not look like lag
+POSTGRES_LAG_QUERY = """
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+
+def sticky_key(user_id):
+    return f'replicas:sticky:{user_id}'
+
+
+def replica_lag(alias):
+    """Replication lag of a replica in seconds; raises DatabaseError when unreachable"""
+    connection = connections[alias]
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(POSTGRES_LAG_QUERY)
+            return float(cursor.fetchone()[0] or 0)
+        cursor.execute('SELECT 1')
+        return 0.0
+
+
+def last_lag(alias):
+    """(checked at, lag) of the last check of a replica in this process, or None"""
+    with _lag_lock:
+        return _lag_checks.get(alias)
+
+
+def replica_is_usable(alias):
+    now = time.monotonic()
+    with _lag_lock:
+        checked = _lag_checks.get(alias)
+    if checked is None or now - checked[0] >= settings.REPLICA_LAG_CHECK_INTERVAL:
+        try:
+            lag = replica_lag(alias)
+        except DatabaseError:
+            lag = None
+        checked = (now, lag)
+        with _lag_lock:
+            _lag_checks[alias] = checked
+    lag = checked[1]
+    return lag is not None and lag <= settings.REPLICA_MAX_LAG_SECONDS
+
+
+def reset_lag_checks():
+    with _lag_lock:
+        _lag_checks.clear()
+
+
+class RequestState:
+    """Routing decisions for one request"""
+
+    def __init__(self, request):
+        self.request = request
+        self.safe = request.method in SAFE_METHODS
+        self.wrote = False
+        self._sticky = None
+        self._replica = None
+
+    def user_id(self):
+        # type(), not isinstance(): the lazy session user must not be evaluated
+        # from inside the router. DRF stores the authenticated user here.
+        user = self.request.__dict__.get('user')
+        if user is not None and issubclass(type(user), AbstractBaseUser) and user.pk:
+            return user.pk
+        return None
+
+    def sticky(self):
+        if self._sticky is None:
+            user_id = self.user_id()
+            if user_id is None:
+                # Not authenticated yet; asked again on the next read
+                return False
+            self._sticky = bool(cache.get(sticky_key(user_id)))
+        return self._sticky
+
+    def read_alias(self):
+        if not self.safe or self.wrote or self.sticky():
+            return None
+        if self._replica is None:
+            usable = [alias for alias in settings.DATABASE_REPLICAS if replica_is_usable(alias)]
+            # '' when none is usable, so the check is not repeated within the request
+            self._replica = random.choice(usable) if usable else ''
+        return self._replica or None
+
+    def finish(self):
+        user_id = self.user_id()
+        if self.wrote and user_id is not None:
+            return sticky_key(user_id)
+        return None
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _request_state.get()
+        if state is None or not settings.DATABASE_REPLICAS:
+            return None
+        if model._meta.app_label == CACHE_APP_LABEL:
+            # The database cache (sticky marks among others) is read where it is written
+            return DEFAULT_DB_ALIAS
+        return state.read_alias()
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        # Filling the cache on a read is not a write the user must read back
+        if state is not None and model._meta.app_label != CACHE_APP_LABEL:
+            state.wrote = True
+        # Explicit, or an instance read from a replica would be saved back to it
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        aliases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+        if settings.DATABASE_REPLICAS and settings.CACHES['default']['BACKEND'] in PROCESS_LOCAL_CACHES:
+            # A write served by one worker would not make the next request's worker read the primary
+            raise ImproperlyConfigured(
+                'DATABASE_REPLICAS needs a default cache shared by all processes (CACHE_URL) '
+                'to keep users who wrote on the primary.'
+            )
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = RequestState(request)
+        token = _request_state.set(state)
+        try:
+            return self.get_response(request)
+        finally:
+            _request_state.reset(token)
+            key = state.finish()
+            if key:
+                cache.set(key, True, settings.REPLICA_STICKY_SECONDS)
+
+    async def __acall__(self, request):
+        state = RequestState(request)
+        token = _request_state.set(state)
+        try:
+            return await self.get_response(request)
+        finally:
+            _request_state.reset(token)
+            key = state.finish()
+            if key:
+                await cache.aset(key, True, settings.REPLICA_STICKY_SECONDS)
@@ -53,11 +53,31 @@ INSTALLED_APPS = [
     'student',
     'internship',
     'administrator',
+    'jobs',
 ]
 AUTH_USER_MODEL = 'authentication.User'
-# BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-# MEDIA_ROOT = os.path.join(BASE_DIR, 'uploads') 
+# A directory dedicated to uploads: dedupe_media and collect_orphaned_media walk it,
+# and refuse to run on one that holds the project itself. Uploads saved before it was
+# set live under the server's working directory; `manage.py move_media` (run by
+# `entrypoint.sh migrate`) moves them here, keeping their stored names valid.
+MEDIA_ROOT = os.environ.get('MEDIA_ROOT', str(BASE_DIR / 'uploads'))
 MEDIA_URL = '/media/'
+# Uploads are deduplicated by content; see PfeManagement/storage.py
+STORAGES = {
+    'default': {'BACKEND': 'PfeManagement.storage.ContentAddressedStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+CAS_BLOB_DIR = '.blobs'
+# Direct uploads to an S3-compatible bucket (AWS S3, MinIO, ...); see PfeManagement/objectstorage.py
+# Leave OBJECT_STORAGE_ENDPOINT empty to keep files on the local filesystem
+OBJECT_STORAGE_ENDPOINT = os.environ.get('OBJECT_STORAGE_ENDPOINT', '')
+OBJECT_STORAGE_BUCKET = os.environ.get('OBJECT_STORAGE_BUCKET', 'internflow')
+OBJECT_STORAGE_REGION = os.environ.get('OBJECT_STORAGE_REGION', 'us-east-1')
+OBJECT_STORAGE_ACCESS_KEY = os.environ.get('OBJECT_STORAGE_ACCESS_KEY', '')
+OBJECT_STORAGE_SECRET_KEY = os.environ.get('OBJECT_STORAGE_SECRET_KEY', '')
+OBJECT_STORAGE_URL_EXPIRY = int(os.environ.get('OBJECT_STORAGE_URL_EXPIRY', '900'))
+if OBJECT_STORAGE_ENDPOINT:
+    STORAGES['default'] = {'BACKEND': 'PfeManagement.objectstorage.ObjectStorage'}
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -89,6 +109,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'PfeManagement.replicas.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -126,6 +147,61 @@ DATABASES = {
     'default': env.db('DATABASE_URL')
 }
 
+# Connection reuse. Without a pool, each worker thread keeps its connection for
+# DATABASE_CONN_MAX_AGE seconds (0 reconnects on every request). DATABASE_POOL=True
+# gives every server process its own psycopg pool (PostgreSQL with psycopg 3 only);
+# that also covers ASGI. Without a pool, ASGI never keeps connections: sync code runs
+# on executor threads that come and go, so a persistent connection would be left
+# open on each of them. Health checks test a reused connection before handing it out.
+SERVER_INTERFACE = os.environ.get('SERVER_INTERFACE', 'wsgi')
+DATABASE_POOL = os.environ.get('DATABASE_POOL', 'False') == 'True'
+DATABASES['default']['CONN_HEALTH_CHECKS'] = os.environ.get('DATABASE_CONN_HEALTH_CHECKS', 'True') == 'True'
+if DATABASE_POOL and DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+    # Pooled connections are returned after each request
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default'].setdefault('OPTIONS', {})['pool'] = {
+        'min_size': int(os.environ.get('DATABASE_POOL_MIN_SIZE', '2')),
+        # At least GUNICORN_THREADS, or threads wait for each other
+        'max_size': int(os.environ.get('DATABASE_POOL_MAX_SIZE', '8')),
+        # Seconds a request waits for a free connection before failing
+        'timeout': float(os.environ.get('DATABASE_POOL_TIMEOUT', '10')),
+        'max_idle': float(os.environ.get('DATABASE_POOL_MAX_IDLE', '300')),
+    }
+elif SERVER_INTERFACE == 'asgi':
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+else:
+    DATABASES['default']['CONN_MAX_AGE'] = int(os.environ.get('DATABASE_CONN_MAX_AGE', '60'))
+
+# Cache shared by every server process and the job worker: calendar feeds, user
+# statistics and replica stickiness are invalidated across processes through it.
+# CACHE_URL also takes redis://host:6379/0 (with the redis package installed);
+# the default is a table in the primary database (manage.py createcachetable).
+CACHES = {
+    'default': env.cache('CACHE_URL', default='dbcache://django_cache')
+}
+
+# Read replicas: DATABASE_REPLICA_URLS is a comma-separated list of database URLs.
+# GET requests read from a replica (PfeManagement/replicas.py); a user who wrote
+# reads from the primary for REPLICA_STICKY_SECONDS, and a replica lagging more
+# than REPLICA_MAX_LAG_SECONDS is skipped until its next check.
+DATABASE_REPLICAS = []
+for index, url in enumerate(filter(None, os.environ.get('DATABASE_REPLICA_URLS', '').split(','))):
+    alias = f'replica_{index}'
+    DATABASES[alias] = env.db_url_config(url.strip())
+    # Same connection reuse as the primary
+    for key in ('CONN_MAX_AGE', 'CONN_HEALTH_CHECKS'):
+        DATABASES[alias][key] = DATABASES['default'][key]
+    if 'pool' in DATABASES['default'].get('OPTIONS', {}) and DATABASES[alias]['ENGINE'] == DATABASES['default']['ENGINE']:
+        DATABASES[alias].setdefault('OPTIONS', {})['pool'] = dict(DATABASES['default']['OPTIONS']['pool'])
+    # Tests read the replicas' rows from the test primary
+    DATABASES[alias]['TEST'] = {'MIRROR': 'default'}
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['PfeManagement.replicas.ReplicaRouter']
+REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS', '15'))
+REPLICA_MAX_LAG_SECONDS = float(os.environ.get('REPLICA_MAX_LAG_SECONDS', '5'))
+REPLICA_LAG_CHECK_INTERVAL = float(os.environ.get('REPLICA_LAG_CHECK_INTERVAL', '5'))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -163,6 +239,76 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Email
+# Notifications are sent by the background worker (python manage.py runworker)
+
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
+DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'InternFlow <no-reply@internflow.local>')
+EMAIL_HOST = os.environ.get('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.environ.get('EMAIL_PORT', 25))
+EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS', 'False') == 'True'
+EMAIL_FILE_PATH = os.environ.get('EMAIL_FILE_PATH', BASE_DIR / 'sent_emails')
+
+# Calendar feeds and delta sync
+
+CALENDAR_FEED_CACHE_TIMEOUT = 60 * 60 * 24
+SYNC_OVERLAP_SECONDS = 5
+SYNC_TOMBSTONE_RETENTION_DAYS = 30
+
+# Live events (server-sent events, served under ASGI)
+# PostgreSQL LISTEN/NOTIFY reaches the streams of every process and node; the in-process
+# broker only those of the publishing process, so gunicorn refuses it with several workers
+
+EVENTS_BROKER = os.environ.get('EVENTS_BROKER', (
+    'internship.events.PostgresNotifyBroker'
+    if DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql'
+    else 'internship.events.InProcessBroker'
+))
+EVENTS_HEARTBEAT_SECONDS = 20
+
+# Administrator dashboard
+# Longest time, in seconds, a cached user statistics snapshot is served
+
+USER_STATS_MAX_STALENESS = 300
+
+# Minimum pg_trgm word similarity for a fuzzy user search match (PostgreSQL only).
+# Passed as a connection startup option, so it is set once per physical
+# connection rather than on every request or pool checkout.
+
+USER_SEARCH_SIMILARITY_THRESHOLD = 0.3
+for database in DATABASES.values():
+    if database['ENGINE'] == 'django.db.backends.postgresql':
+        options = database.setdefault('OPTIONS', {})
+        options['options'] = (
+            f"{options.get('options', '')} -c pg_trgm.word_similarity_threshold={USER_SEARCH_SIMILARITY_THRESHOLD}"
+        ).strip()
+
+# Users updated per UPDATE statement by the bulk user endpoint
+
+BULK_USER_CHUNK_SIZE = int(os.environ.get('BULK_USER_CHUNK_SIZE', '1000'))
+
+# Audit log: events are buffered per process and written in batches
+
+AUDIT_BUFFER_SIZE = int(os.environ.get('AUDIT_BUFFER_SIZE', '100'))
+AUDIT_FLUSH_INTERVAL = float(os.environ.get('AUDIT_FLUSH_INTERVAL', '5'))
+AUDIT_SPOOL_PATH = os.environ.get('AUDIT_SPOOL_PATH', str(BASE_DIR / 'audit-spool.jsonl'))
+# Reverse proxies in front of the app that append to X-Forwarded-For; 0 trusts none
+# and records REMOTE_ADDR
+AUDIT_TRUSTED_PROXY_COUNT = int(os.environ.get('AUDIT_TRUSTED_PROXY_COUNT', '0'))
+
+# Self-service account deletion: rows deleted per transaction, and batches per purge job
+
+ACCOUNT_PURGE_BATCH_SIZE = int(os.environ.get('ACCOUNT_PURGE_BATCH_SIZE', '200'))
+ACCOUNT_PURGE_BATCHES_PER_JOB = int(os.environ.get('ACCOUNT_PURGE_BATCHES_PER_JOB', '20'))
+
+# Background jobs
+
+JOBS_MAX_ATTEMPTS = 5
+JOBS_RETRY_BASE_SECONDS = 10
+JOBS_LOCK_TIMEOUT_SECONDS = 15 * 60
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -0,0 +1,167 @@
+"""
+Deduplicating file storage for uploads.
+
+ContentAddressedStorage behaves like FileSystemStorage for models: every
+upload gets its own name under upload_to and can be opened, replaced and
+deleted independently. On disk, each distinct content is stored once as a
+blob named by its SHA-256 digest under CAS_BLOB_DIR, and every file name is a
+hard link to its blob. The link count of the blob is its reference count, so
+the last delete of a content removes the blob as well. The digest is also
+kept in an extended attribute of the blob's inode, which all its names share,
+so deletes find the blob without hashing the file again.
+
+MEDIA_ROOT must be a directory of its own; media_root() enforces that before
+anything walks or writes the tree.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files import locks
+from django.core.files.storage import FileSystemStorage
+from django.db import models
+
+DIGEST_XATTR = 'user.cas.sha256'
+
+
+def media_root(location):
+    """
+    Resolved storage location; refuses an unset one (the working directory) or
+    one that contains the project, whose source files would pass for media.
+    """
+    project = os.path.realpath(settings.BASE_DIR)
+    root = os.path.realpath(location) if location else ''
+    if not root or project == root or project.startswith(root + os.sep):
+        raise ImproperlyConfigured('MEDIA_ROOT must be set to a directory dedicated to uploads.')
+    return root
+
+
+def upload_directories():
+    """Top-level media directories the FileFields save into (the fixed part of upload_to)"""
+    directories = set()
+    for model in apps.get_models():
+        for field in model._meta.concrete_fields:
+            if isinstance(field, models.FileField) and isinstance(field.upload_to, str):
+                top = field.upload_to.split('%')[0].strip('/').split('/')[0]
+                if top:
+                    directories.add(top)
+    return sorted(directories)
+
+
+class ContentAddressedStorage(FileSystemStorage):
+
+    @property
+    def blob_root(self):
+        return os.path.join(media_root(self.base_location), getattr(settings, 'CAS_BLOB_DIR', '.blobs'))
+
+    def blob_path(self, digest):
+        # Two levels of fan-out keep directories small
+        return os.path.join(self.blob_root, digest[:2], digest[2:4], digest)
+
+    def _save(self, name, content):
+        os.makedirs(os.path.dirname(self.path(name)), exist_ok=True)
+        os.makedirs(self.blob_root, exist_ok=True)
+
+        # Hash while streaming to a temporary file next to the blobs (same filesystem, so
+        # moving it into place is a rename)
+        digest = hashlib.sha256()
+        handle, temp_path = tempfile.mkstemp(dir=self.blob_root, prefix='.upload-')
+        try:
+            with os.fdopen(handle, 'wb') as temp_file:
+                if hasattr(content, 'seek'):
+                    content.seek(0)
+                for chunk in content.chunks():
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode()
+                    digest.update(chunk)
+                    temp_file.write(chunk)
+
+            blob = self.blob_path(digest.hexdigest())
+            os.makedirs(os.path.dirname(blob), exist_ok=True)
+            try:
+                # Content already stored: the upload only costs a hash and a link
+                name = self._link(blob, name)
+            except FileNotFoundError:
+                # mkstemp creates owner-only files
+                os.chmod(temp_path, self.file_permissions_mode or 0o644)
+                self.remember_digest(temp_path, digest.hexdigest())
+                os.replace(temp_path, blob)
+                name = self._link(blob, name)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return str(name).replace('\\', '/')
+
+    def _link(self, blob, name):
+        """Point `name` at a blob; raises FileNotFoundError when the blob does not exist"""
+        while True:
+            try:
+                os.link(blob, self.path(name))
+                return name
+            except FileExistsError:
+                # A concurrent upload took the name; pick another like FileSystemStorage does
+                name = self.get_available_name(name)
+            except FileNotFoundError:
+                raise
+            except OSError:
+                # No hard links here (e.g. another filesystem); keep a private copy
+                self._copy(blob, self.path(name))
+                return name
+
+    def _copy(self, source, destination):
+        with open(source, 'rb') as src, open(destination, 'xb') as dst:
+            locks.lock(dst, locks.LOCK_EX)
+            shutil.copyfileobj(src, dst)
+        os.chmod(destination, self.file_permissions_mode or 0o644)
+
+    def _digest(self, path):
+        digest = hashlib.sha256()
+        with open(path, 'rb') as handle:
+            for chunk in iter(lambda: handle.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def remember_digest(self, path, digest):
+        try:
+            os.setxattr(path, DIGEST_XATTR, digest.encode())
+        except (AttributeError, OSError):
+            # No extended attributes on this platform or filesystem; deletes hash instead
+            pass
+
+    def stored_digest(self, path):
+        """Digest of a stored file, hashed only when it was not recorded"""
+        try:
+            return os.getxattr(path, DIGEST_XATTR).decode()
+        except FileNotFoundError:
+            raise
+        except (AttributeError, OSError):
+            return self._digest(path)
+
+    def references(self, name):
+        """How many stored names share the content of `name`"""
+        # Names are hard links to their blob, so the link count less the blob itself
+        return max(os.stat(self.path(name)).st_nlink - 1, 1)
+
+    def delete(self, name):
+        if not name:
+            raise ValueError('The name must be given to delete().')
+        path = self.path(name)
+        try:
+            # Two links are this name and its blob: the blob goes with the name
+            digest = self.stored_digest(path) if os.stat(path).st_nlink == 2 else None
+        except FileNotFoundError:
+            return
+        super().delete(name)
+        if digest is None:
+            return
+        blob = self.blob_path(digest)
+        try:
+            if os.stat(blob).st_nlink == 1:
+                # That was the last name pointing at this content
+                os.remove(blob)
+        except FileNotFoundError:
+            pass
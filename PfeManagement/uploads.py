@@ -0,0 +1,139 @@
+"""
+Upload limits enforced while the request body streams in.
+
+Views list their file fields with a size limit and the allowed file kinds,
+and parse multipart bodies with LimitedMultiPartParser:
+
+    parser_classes = [LimitedMultiPartParser, FormParser]
+    upload_limits = {'cahier_de_charges': DOCUMENT_UPLOAD}
+
+The upload handler rejects a request as soon as its declared length, or the
+bytes received for a file, exceed the limit, and checks the magic bytes at
+the start of each file instead of the client-sent content type. Rejected
+uploads stop reading the body, so an oversized or disguised file costs one
+chunk instead of the whole transfer. Accepted files are spooled to a
+temporary file chunk by chunk, never held in memory.
+"""
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.files.uploadhandler import FileUploadHandler, StopUpload, TemporaryFileUploadHandler
+from django.http import QueryDict
+from django.utils.datastructures import MultiValueDict
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.parsers import MultiPartParser
+
+UploadLimit = namedtuple('UploadLimit', ['max_bytes', 'kinds'])
+
+DOCUMENT_UPLOAD = UploadLimit(10 * 1024 * 1024, ('pdf', 'doc', 'docx'))
+IMAGE_UPLOAD = UploadLimit(5 * 1024 * 1024, ('jpeg', 'png', 'gif', 'webp'))
+
+# Bytes needed to recognise every kind below
+SNIFF_LENGTH = 12
+
+
+def sniff(head):
+    """Return the file kind announced by the first bytes of a file, or None"""
+    if head.startswith(b'%PDF-'):
+        return 'pdf'
+    if head.startswith(b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'):
+        return 'doc'  # OLE2 compound document (legacy Office)
+    if head.startswith(b'PK\x03\x04'):
+        return 'docx'  # OOXML is a ZIP archive
+    if head.startswith(b'\xff\xd8\xff'):
+        return 'jpeg'
+    if head.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'png'
+    if head[:6] in (b'GIF87a', b'GIF89a'):
+        return 'gif'
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'webp'
+    return None
+
+
+class UploadRejected(APIException):
+    status_code = status.HTTP_400_BAD_REQUEST
+
+    def __init__(self, message, status_code):
+        super().__init__({'error': message})
+        self.status_code = status_code
+
+
+class LimitedUploadHandler(FileUploadHandler):
+    """Checks every file against its UploadLimit and stops the upload at the first violation"""
+    chunk_size = 64 * 1024
+
+    def __init__(self, request, limits):
+        super().__init__(request)
+        self.limits = limits
+        self.limit = None
+        self.head = b''
+        self.rejection = None
+
+    def reject(self, message, status_code):
+        self.rejection = (message, status_code)
+        # Stop reading the body: the rest of the upload is never received
+        raise StopUpload(connection_reset=True)
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        form_allowance = settings.DATA_UPLOAD_MAX_MEMORY_SIZE or 0
+        ceiling = sum(limit.max_bytes for limit in self.limits.values()) + form_allowance
+        if content_length > ceiling:
+            self.rejection = ('Request body is too large.', status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+            # Answer without reading any of the body
+            return QueryDict(encoding=encoding), MultiValueDict()
+        return None
+
+    def new_file(self, field_name, file_name, content_type, content_length, charset=None, content_type_extra=None):
+        super().new_file(field_name, file_name, content_type, content_length, charset, content_type_extra)
+        self.head = b''
+        self.limit = self.limits.get(field_name)
+        if self.limit is None:
+            self.reject(f"Unexpected file field '{field_name}'.", status.HTTP_400_BAD_REQUEST)
+        if content_length and content_length > self.limit.max_bytes:
+            self._too_large()
+
+    def _too_large(self):
+        megabytes = self.limit.max_bytes // (1024 * 1024)
+        self.reject(
+            f"'{self.file_name}' exceeds the {megabytes}MB limit for {self.field_name}.",
+            status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        )
+
+    def _check_kind(self):
+        if sniff(self.head) not in self.limit.kinds:
+            self.reject(
+                f"'{self.file_name}' is not an allowed file type ({', '.join(self.limit.kinds)}).",
+                status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+            )
+
+    def receive_data_chunk(self, raw_data, start):
+        if start + len(raw_data) > self.limit.max_bytes:
+            self._too_large()
+        if len(self.head) < SNIFF_LENGTH:
+            self.head += raw_data[:SNIFF_LENGTH - len(self.head)]
+            if len(self.head) >= SNIFF_LENGTH:
+                self._check_kind()
+        return raw_data
+
+    def file_complete(self, file_size):
+        # Files shorter than the sniffed prefix
+        if len(self.head) < SNIFF_LENGTH:
+            self._check_kind()
+        return None
+
+
+class LimitedMultiPartParser(MultiPartParser):
+    """MultiPartParser applying the view's upload_limits while the body is read"""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        request = parser_context['request']
+        limits = getattr(parser_context.get('view'), 'upload_limits', {})
+        handler = LimitedUploadHandler(request._request, limits)
+        # Files go straight to disk, one chunk at a time
+        request._request.upload_handlers = [handler, TemporaryFileUploadHandler(request._request)]
+        result = super().parse(stream, media_type, parser_context)
+        if handler.rejection:
+            raise UploadRejected(*handler.rejection)
+        return result
@@ -8,6 +8,7 @@ from rest_framework import permissions
 from drf_yasg.views import get_schema_view
 from django.conf import settings
 from django.conf.urls.static import static
+from PfeManagement.directuploads import PresignUploadView, ConfirmUploadView
 
 schema_view = get_schema_view(
     openapi.Info(
@@ -42,6 +43,10 @@ urlpatterns = [
     path('internship/', include('internship.urls')),
     path('administrator/', include('administrator.urls')),
 
+    # Direct uploads to object storage
+    path('uploads/presign/', PresignUploadView.as_view(), name='presign-upload'),
+    path('uploads/confirm/', ConfirmUploadView.as_view(), name='confirm-upload'),
+
 ]
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
@@ -0,0 +1,63 @@
+"""
+Process warm-up for production serving (see gunicorn.conf.py).
+
+warm_up_application() runs once in the gunicorn master after the preloaded
+application is imported. It does the lazy setup Django would otherwise do
+on each worker's first requests, so every forked worker shares the result
+copy-on-write. warm_up_worker() runs in each worker before it accepts
+connections: it starts the audit flush timer, checks that the databases
+answer (which creates the worker's own pool with DATABASE_POOL) and fills
+caches. Requests are served from other threads than the one running it
+(gthread's pool, or the executor of an ASGI worker), and Django connections
+belong to the thread that opened them, so it closes its connections when
+done; pooled ones go back to the pool, where the request threads pick them up.
+"""
+import logging
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hashers
+from django.db import DatabaseError, connections
+from django.urls import get_resolver
+from django.utils import translation
+
+from administrator import audit
+from administrator.dbmetrics import connection_pool
+from administrator.stats import get_user_stats
+
+logger = logging.getLogger(__name__)
+
+
+def warm_up_application():
+    # Resolve every URL pattern (and import its view) once
+    resolver = get_resolver()
+    resolver.reverse_dict
+    # Password hashers are loaded by the first login otherwise
+    get_hashers()
+    translation.activate(settings.LANGUAGE_CODE)
+    translation.deactivate()
+    # Sockets must not be shared by the forked workers
+    connections.close_all()
+    # Nor pools: each worker opens its own on its first connection
+    for connection in connections.all(initialized_only=True):
+        if connection_pool(connection) is not None:
+            connection.close_pool()
+
+
+def warm_up_worker():
+    # Buffered audit events are written on time even when the worker goes idle
+    audit.start_flush_timer()
+    try:
+        for alias in connections:
+            try:
+                connections[alias].ensure_connection()
+            except DatabaseError:
+                # Not fatal: the first request retries, and reports the failure if it persists
+                logger.warning("Could not connect to database %r during warm-up", alias, exc_info=True)
+                return
+
+        try:
+            get_user_stats()
+        except DatabaseError:
+            logger.warning("Could not warm the user statistics cache", exc_info=True)
+    finally:
+        connections.close_all()
@@ -0,0 +1,85 @@
+"""
+ZIP archives streamed while they are built.
+
+stream_zip() writes entries through zipfile into a buffer that is emptied
+after every chunk, so a response can start at once and memory stays flat
+whatever the archive size: no temporary file, no whole archive in memory.
+zipfile switches to data descriptors on a stream it cannot seek, and to
+ZIP64 records once the archive passes 4GB.
+"""
+import zipfile
+
+from django.utils import timezone
+
+from PfeManagement.uploads import SNIFF_LENGTH, sniff
+
+CHUNK_SIZE = 64 * 1024
+
+# Kinds that are compressed already (OOXML is a ZIP archive); deflating them again only costs CPU
+COMPRESSED_KINDS = frozenset(['docx', 'jpeg', 'png', 'gif', 'webp'])
+
+MISSING_FILES_NAME = 'missing-files.txt'
+
+
+class _Sink:
+    """Write-only, non-seekable buffer that zipfile writes to and stream_zip drains"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def file_chunks(field_file, chunk_size=CHUNK_SIZE):
+    """Yield the content of a stored file chunk by chunk"""
+    with field_file.storage.open(field_file.name, 'rb') as handle:
+        for chunk in iter(lambda: handle.read(chunk_size), b''):
+            yield chunk
+
+
+def stream_zip(entries):
+    """
+    Yield a ZIP archive of `entries`, (name, chunks) pairs where chunks is an
+    iterable of bytes. Entries whose first chunk raises FileNotFoundError are
+    skipped and listed in missing-files.txt at the end of the archive.
+    """
+    sink = _Sink()
+    missing = []
+    date_time = timezone.localtime().timetuple()[:6]
+    with zipfile.ZipFile(sink, 'w', allowZip64=True) as archive:
+        for name, chunks in entries:
+            chunks = iter(chunks)
+            try:
+                first = next(chunks, b'')
+            except FileNotFoundError:
+                missing.append(name)
+                continue
+
+            info = zipfile.ZipInfo(name, date_time=date_time)
+            if sniff(first[:SNIFF_LENGTH]) in COMPRESSED_KINDS:
+                info.compress_type = zipfile.ZIP_STORED
+            else:
+                info.compress_type = zipfile.ZIP_DEFLATED
+            with archive.open(info, 'w') as target:
+                target.write(first)
+                for chunk in chunks:
+                    target.write(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            yield sink.drain()
+
+        if missing:
+            archive.writestr(MISSING_FILES_NAME, '\n'.join(missing) + '\n', zipfile.ZIP_DEFLATED)
+    # Central directory, written when the archive closes
+    yield sink.drain()
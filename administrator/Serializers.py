@@ -1,7 +1,12 @@
 from rest_framework import serializers
 from authentication.models import User, Role
+from administrator.models import AuditEvent
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
+from PfeManagement.fieldsets import SparseFieldsetMixin
+from PfeManagement.directuploads import DirectUploadImageField
+from authentication.purge import PURGE_REACTIVATED_ERROR
+from authentication.thumbnails import ProfilePictureField
 
 class RoleSerializer(serializers.ModelSerializer):
     class Meta:
@@ -9,9 +14,10 @@ class RoleSerializer(serializers.ModelSerializer):
         fields = ['id', 'name']
         ref_name = 'AuthRole'
 
-class UserListSerializer(serializers.ModelSerializer):
+class UserListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for listing users"""
     role_name = serializers.CharField(source='role.name', read_only=True)
+    profile_picture = ProfilePictureField('small')
     
     class Meta:
         model = User
@@ -22,10 +28,16 @@ class UserListSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['date_joined']
         ref_name = 'AuthUserList'
+        field_sources = {
+            'role_name': ['role__name'],
+            'profile_picture': ['profile_picture', 'profile_picture_variants'],
+        }
+        expandable_fields = {'role': RoleSerializer}
 
 class UserDetailSerializer(serializers.ModelSerializer):
     """Serializer for detailed user view"""
     role_name = serializers.CharField(source='role.name', read_only=True)
+    profile_picture = ProfilePictureField('medium')
     
     class Meta:
         model = User
@@ -109,7 +121,8 @@ class UserCreateSerializer(serializers.ModelSerializer):
 
 class UserUpdateSerializer(serializers.ModelSerializer):
     """Serializer for updating existing users"""
-    
+    profile_picture = DirectUploadImageField(upload_target='profile_picture', required=False, allow_null=True)
+
     class Meta:
         model = User
         fields = [
@@ -125,6 +138,12 @@ class UserUpdateSerializer(serializers.ModelSerializer):
         
         return value.lower()
 
+    def validate_is_active(self, value):
+        """Refuse to reactivate an account whose purge is queued"""
+        if value and self.instance.pending_purge_at is not None:
+            raise serializers.ValidationError(PURGE_REACTIVATED_ERROR)
+        return value
+
 class ChangePasswordSerializer(serializers.Serializer):
     """Serializer for password reset by admin"""
     new_password = serializers.CharField(
@@ -156,4 +175,50 @@ class ChangePasswordSerializer(serializers.Serializer):
                 "new_password_confirm": "Passwords do not match."
             })
         
-        return attrs
\ No newline at end of file
+        return attrs
+
+
+class BulkUserFiltersSerializer(serializers.Serializer):
+    """The user list filters accepted by a bulk action"""
+    role = serializers.IntegerField(required=False, allow_null=True)
+    is_active = serializers.BooleanField(required=False, allow_null=True)
+    search = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+
+    def to_internal_value(self, data):
+        if isinstance(data, dict):
+            unknown = set(data) - set(self.fields)
+            if unknown:
+                raise serializers.ValidationError(f"Unknown filters: {', '.join(sorted(unknown))}.")
+        return super().to_internal_value(data)
+
+    def validate(self, attrs):
+        if not any(value not in (None, '') for value in attrs.values()):
+            raise serializers.ValidationError("At least one filter is required.")
+        return attrs
+
+
+class BulkUserActionSerializer(serializers.Serializer):
+    """Serializer for bulk user actions; targets are ids or the user list filters"""
+    action = serializers.ChoiceField(choices=['deactivate', 'reactivate', 'set_role'])
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+    filters = BulkUserFiltersSerializer(required=False)
+    role = serializers.PrimaryKeyRelatedField(queryset=Role.objects.all(), required=False)
+
+    def validate(self, attrs):
+        """Validate targets and the role of a set_role action"""
+        if ('ids' in attrs) == ('filters' in attrs):
+            raise serializers.ValidationError("Provide either ids or filters.")
+        if attrs['action'] == 'set_role' and 'role' not in attrs:
+            raise serializers.ValidationError({"role": "A role is required for set_role."})
+        return attrs
+
+
+class AuditEventSerializer(serializers.ModelSerializer):
+    """Serializer for audit log entries"""
+
+    class Meta:
+        model = AuditEvent
+        fields = [
+            'id', 'actor', 'actor_username', 'action', 'target_type',
+            'target_id', 'data', 'ip_address', 'created_at'
+        ]
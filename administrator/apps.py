@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class AdministratorConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'administrator'
+    def ready(self):
+        import administrator.signals
+        import administrator.audit
+        import administrator.dbmetrics
@@ -0,0 +1,311 @@
+"""
+Audit log of administrator and review actions.
+
+record() is called from views; the event is captured once the surrounding
+transaction commits and kept in a per-process buffer. After a request has
+finished, the buffer is written with one bulk_create if it holds
+AUDIT_BUFFER_SIZE events or its oldest event is AUDIT_FLUSH_INTERVAL seconds
+old, so no response waits on an audit INSERT. Server workers also start a
+flush timer (see PfeManagement/warmup.py): a daemon thread that writes the
+buffer once it is due, so events reach the database within
+AUDIT_FLUSH_INTERVAL even when no further request comes. Events that cannot be written
+(database down, process exiting) are appended to the AUDIT_SPOOL_PATH file
+as JSON lines and loaded back by the `replay_audit_spool` command.
+"""
+import atexit
+import base64
+import json
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.core.signals import request_finished
+from django.db import DatabaseError, connections, transaction
+from django.db.models import Q
+from django.dispatch import receiver
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import AuditEvent
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class AuditBuffer:
+    """Thread-safe per-process event buffer"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._events = []
+        self._oldest = None
+        self._pid = os.getpid()
+        self._timer = None
+        self._timer_stop = None
+
+    def add(self, event):
+        with self._lock:
+            if self._pid != os.getpid():
+                # Forked worker: the parent's events are the parent's to flush
+                self._events, self._oldest = [], None
+                self._pid = os.getpid()
+            self._events.append(event)
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+
+    def pending(self):
+        with self._lock:
+            return len(self._events)
+
+    def due(self):
+        """True once the buffer holds AUDIT_BUFFER_SIZE events or its oldest is AUDIT_FLUSH_INTERVAL old"""
+        with self._lock:
+            if not self._events:
+                return False
+            return (
+                len(self._events) >= _setting('AUDIT_BUFFER_SIZE', 100)
+                or time.monotonic() - self._oldest >= _setting('AUDIT_FLUSH_INTERVAL', 5)
+            )
+
+    def seconds_until_due(self):
+        """Time left before the oldest event is AUDIT_FLUSH_INTERVAL old; the full interval when empty"""
+        interval = _setting('AUDIT_FLUSH_INTERVAL', 5)
+        with self._lock:
+            if not self._events:
+                return interval
+            return max(self._oldest + interval - time.monotonic(), 0)
+
+    def start_timer(self):
+        """Flush from a daemon thread whenever the buffer is due; once per process"""
+        with self._lock:
+            if self._timer is not None and self._timer.is_alive():
+                return
+            self._timer_stop = threading.Event()
+            self._timer = threading.Thread(
+                target=self._flush_when_due, args=(self._timer_stop,), name='audit-flush', daemon=True
+            )
+            self._timer.start()
+
+    def stop_timer(self):
+        with self._lock:
+            timer, stop, self._timer = self._timer, self._timer_stop, None
+        if timer is not None:
+            stop.set()
+            timer.join()
+
+    def _flush_when_due(self, stop):
+        while not stop.wait(self.seconds_until_due()):
+            if self.due():
+                try:
+                    self.flush()
+                finally:
+                    # This thread's connection would otherwise stay open between flushes
+                    connections.close_all()
+
+    def take(self):
+        with self._lock:
+            events, self._events, self._oldest = self._events, [], None
+        return events
+
+    def flush(self):
+        """Write buffered events; returns how many were written to the database"""
+        events = self.take()
+        if not events:
+            return 0
+        try:
+            AuditEvent.objects.bulk_create(events, batch_size=500)
+        except DatabaseError:
+            logger.exception("Could not write %s audit events, spooling them", len(events))
+            spool(events)
+            return 0
+        return len(events)
+
+
+_buffer = AuditBuffer()
+
+
+def get_buffer():
+    return _buffer
+
+
+def flush():
+    return _buffer.flush()
+
+
+def start_flush_timer():
+    _buffer.start_timer()
+
+
+def stop_flush_timer():
+    _buffer.stop_timer()
+
+
+@receiver(request_finished)
+def flush_if_due(sender, **kwargs):
+    # Runs once the response has been handed to the server, off the client's critical path
+    if _buffer.due():
+        _buffer.flush()
+
+
+@atexit.register
+def _flush_at_exit():
+    events = _buffer.take()
+    if events:
+        # The database may already be unreachable on shutdown; the spool file is not
+        try:
+            AuditEvent.objects.bulk_create(events, batch_size=500)
+        except Exception:
+            spool(events)
+
+
+def _client_ip(request):
+    # Each proxy appends the address it received the request from; entries left
+    # of the ones our own proxies added are client-supplied and can be forged
+    proxies = settings.AUDIT_TRUSTED_PROXY_COUNT
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR')
+    if proxies > 0 and forwarded:
+        entries = [entry.strip() for entry in forwarded.split(',') if entry.strip()]
+        if entries:
+            return entries[-proxies] if len(entries) >= proxies else entries[0]
+    return request.META.get('REMOTE_ADDR')
+
+
+def record(request, action, target, **data):
+    """
+    Capture an audit event for `target` (a model instance) once the current
+    transaction commits; rolled-back actions are not recorded.
+    """
+    actor = request.user if request.user.is_authenticated else None
+    event = AuditEvent(
+        actor_id=actor.id if actor else None,
+        actor_username=actor.username if actor else '',
+        action=action,
+        target_type=target._meta.label_lower,
+        target_id=str(target.pk),
+        data=data,
+        ip_address=_client_ip(request),
+        created_at=timezone.now(),
+    )
+    transaction.on_commit(lambda: _buffer.add(event))
+
+
+def record_many(request, action, target_type, target_ids, **data):
+    """Capture one event per target id, e.g. for bulk actions"""
+    actor = request.user
+    now = timezone.now()
+    ip_address = _client_ip(request)
+    events = [
+        AuditEvent(
+            actor_id=actor.id, actor_username=actor.username, action=action,
+            target_type=target_type, target_id=str(target_id), data=data,
+            ip_address=ip_address, created_at=now,
+        )
+        for target_id in target_ids
+    ]
+
+    def add_all():
+        for event in events:
+            _buffer.add(event)
+    transaction.on_commit(add_all)
+
+
+def spool_path():
+    return _setting('AUDIT_SPOOL_PATH', os.path.join(settings.BASE_DIR, 'audit-spool.jsonl'))
+
+
+def spool(events):
+    """Append events to the spool file, one JSON object per line"""
+    with open(spool_path(), 'a', encoding='utf-8') as spool_file:
+        for event in events:
+            spool_file.write(json.dumps({
+                'actor_id': event.actor_id,
+                'actor_username': event.actor_username,
+                'action': event.action,
+                'target_type': event.target_type,
+                'target_id': event.target_id,
+                'data': event.data,
+                'ip_address': event.ip_address,
+                'created_at': event.created_at.isoformat(),
+            }) + '\n')
+        spool_file.flush()
+        os.fsync(spool_file.fileno())
+
+
+def replay_spool():
+    """Load spooled events into the database and empty the spool; returns the count"""
+    path = spool_path()
+    replaying = f'{path}.replaying'
+    # A replay that failed halfway left its file behind; finish that one first
+    if not os.path.exists(replaying):
+        if not os.path.exists(path):
+            return 0
+        # Rename first so events spooled meanwhile land in a fresh file
+        os.replace(path, replaying)
+    events = []
+    with open(replaying, encoding='utf-8') as spool_file:
+        for line in spool_file:
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            row['created_at'] = parse_datetime(row['created_at'])
+            events.append(AuditEvent(**row))
+    AuditEvent.objects.bulk_create(events, batch_size=500)
+    os.remove(replaying)
+    return len(events)
+
+
+def encode_cursor(event):
+    raw = f'{event.created_at.isoformat()}|{event.id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(value):
+    """Return (created_at, id) of a cursor; raises ValueError when invalid"""
+    try:
+        created_at, event_id = base64.urlsafe_b64decode(value.encode()).decode().split('|')
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError('Invalid cursor.')
+    created = parse_datetime(created_at)
+    if created is None:
+        raise ValueError('Invalid cursor.')
+    return created, int(event_id)
+
+
+def filter_events(params):
+    """
+    Build the audit event query from request parameters (actor, action,
+    target_type, target_id, since, until, cursor); returns (queryset, error).
+    Results are newest first and paginated by keyset, so every page is an
+    index range scan whatever its depth.
+    """
+    events = AuditEvent.objects.all()
+    actor = params.get('actor')
+    if actor:
+        if not actor.isdigit():
+            return None, 'actor must be a user id.'
+        events = events.filter(actor_id=int(actor))
+    for name in ('action', 'target_type', 'target_id'):
+        if params.get(name):
+            events = events.filter(**{name: params[name]})
+
+    for name, lookup in (('since', 'created_at__gte'), ('until', 'created_at__lt')):
+        if params.get(name):
+            moment = parse_datetime(params[name])
+            if moment is None:
+                return None, f'{name} must be an ISO 8601 datetime.'
+            if timezone.is_naive(moment):
+                moment = timezone.make_aware(moment)
+            events = events.filter(**{lookup: moment})
+
+    if params.get('cursor'):
+        try:
+            created_at, event_id = decode_cursor(params['cursor'])
+        except ValueError as exc:
+            return None, str(exc)
+        events = events.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=event_id))
+    return events.order_by('-created_at', '-id'), None
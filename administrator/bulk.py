@@ -0,0 +1,107 @@
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from authentication.models import User
+from authentication.purge import PURGE_REACTIVATED_ERROR
+from administrator.search import filter_users
+from administrator.stats import invalidate_user_stats
+
+BULK_ACTIONS = ['deactivate', 'reactivate', 'set_role']
+
+
+def bulk_chunk_size():
+    return getattr(settings, 'BULK_USER_CHUNK_SIZE', 1000)
+
+
+def target_user_ids(ids=None, filters=None):
+    """Ids to act on: the given list, or every user matching the ListUsersView filters"""
+    if ids is not None:
+        return list(dict.fromkeys(ids))
+    users, _ = filter_users(User.objects.all(), filters)
+    return list(users.order_by('id').values_list('id', flat=True))
+
+
+def _changes(action, role):
+    if action == 'deactivate':
+        return {'is_active': False}
+    if action == 'reactivate':
+        return {'is_active': True}
+    return {'role_id': role.id}
+
+
+def _self_error(action):
+    if action == 'deactivate':
+        return 'You cannot deactivate your own account.'
+    if action == 'set_role':
+        return 'You cannot change your own role.'
+    return None
+
+
+def apply_bulk_action(actor, action, ids=None, filters=None, role=None):
+    """
+    Apply one action to many users with a single UPDATE per chunk.
+    Returns one result per target id: updated, unchanged, not_found or an error.
+    """
+    changes = _changes(action, role)
+    results = []
+    updated_ids = []
+    target_ids = target_user_ids(ids, filters)
+    chunk_size = bulk_chunk_size()
+
+    for start in range(0, len(target_ids), chunk_size):
+        chunk = target_ids[start:start + chunk_size]
+        with transaction.atomic():
+            current = {
+                row['id']: row
+                for row in User.objects.filter(id__in=chunk).values('id', 'pending_purge_at', *changes)
+            }
+            to_update = []
+            for user_id in chunk:
+                row = current.get(user_id)
+                if row is None:
+                    results.append({'id': user_id, 'status': 'not_found'})
+                elif user_id == actor.id and _self_error(action):
+                    # Prevent admin from locking themselves out
+                    results.append({'id': user_id, 'status': 'error', 'error': _self_error(action)})
+                elif action == 'reactivate' and row['pending_purge_at'] is not None:
+                    results.append({'id': user_id, 'status': 'error', 'error': PURGE_REACTIVATED_ERROR})
+                elif all(row[field] == value for field, value in changes.items()):
+                    results.append({'id': user_id, 'status': 'unchanged'})
+                else:
+                    to_update.append(user_id)
+                    results.append({'id': user_id, 'status': 'updated'})
+            if to_update:
+                users = User.objects.filter(id__in=to_update)
+                if action == 'reactivate':
+                    # Nor an account whose deletion was requested since it was read
+                    users = users.filter(pending_purge_at__isnull=True)
+                users.update(updated_at=timezone.now(), **changes)
+                if action == 'deactivate':
+                    revoke_tokens(to_update)
+        updated_ids.extend(to_update)
+
+    # update() sends no signals; refresh the cached statistics once for the whole run
+    if updated_ids:
+        invalidate_user_stats()
+    return results, len(updated_ids)
+
+
+def revoke_tokens(user_ids):
+    """
+    Blacklist the outstanding refresh tokens of deactivated users. simplejwt
+    already refuses tokens of inactive users, so this only matters when the
+    token_blacklist app is installed.
+    """
+    if not apps.is_installed('rest_framework_simplejwt.token_blacklist'):
+        return 0
+    from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+    token_ids = OutstandingToken.objects.filter(
+        user_id__in=user_ids, expires_at__gt=timezone.now()
+    ).values_list('id', flat=True)
+    created = BlacklistedToken.objects.bulk_create(
+        [BlacklistedToken(token_id=token_id) for token_id in token_ids], ignore_conflicts=True
+    )
+    return len(created)
@@ -0,0 +1,81 @@
+"""
+Database connection metrics of the current process.
+
+Every server process has its own connections, or its own pool when
+DATABASE_POOL is on, so the figures describe the process that answers the
+request; `pid` tells the gunicorn workers apart. Without a pool,
+`connections_opened` counts real connections. With one, it counts checkouts,
+and the pool's own statistics give its size and the time requests spent
+waiting for a connection. Replicas also report the lag seen by their last
+routing check (None when unreachable or not checked yet).
+"""
+import os
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from PfeManagement.replicas import last_lag
+
+_opened = Counter()
+_lock = threading.Lock()
+
+
+@receiver(connection_created)
+def count_connection(sender, connection, **kwargs):
+    with _lock:
+        _opened[connection.alias] += 1
+
+
+def connection_pool(connection):
+    """The pool of a connection if it has been created, without creating it"""
+    return getattr(connection, '_connection_pools', {}).get(connection.alias)
+
+
+def pool_metrics(pool):
+    stats = pool.get_stats()
+    requests = stats.get('requests_num', 0)
+    return {
+        'min_size': stats.get('pool_min'),
+        'max_size': stats.get('pool_max'),
+        'size': stats.get('pool_size'),
+        'available': stats.get('pool_available'),
+        'waiting': stats.get('requests_waiting', 0),
+        'requests': requests,
+        'requests_queued': stats.get('requests_queued', 0),
+        'requests_errors': stats.get('requests_errors', 0),
+        'wait_ms_total': stats.get('requests_wait_ms', 0),
+        'wait_ms_average': round(stats.get('requests_wait_ms', 0) / requests, 2) if requests else 0,
+        'connections_opened': stats.get('connections_num', 0),
+        'connections_ms_total': stats.get('connections_ms', 0),
+        'connections_lost': stats.get('connections_lost', 0),
+        'connections_errors': stats.get('connections_errors', 0),
+    }
+
+
+def database_metrics():
+    databases = {}
+    for alias in connections:
+        connection = connections[alias]
+        pool = connection_pool(connection)
+        with _lock:
+            opened = _opened[alias]
+        databases[alias] = {
+            'vendor': connection.vendor,
+            'pooled': bool(connection.settings_dict.get('OPTIONS', {}).get('pool')),
+            'conn_max_age': connection.settings_dict['CONN_MAX_AGE'],
+            'health_checks': connection.settings_dict['CONN_HEALTH_CHECKS'],
+            'connections_opened': opened,
+            'pool': pool_metrics(pool) if pool is not None else None,
+        }
+        if alias in settings.DATABASE_REPLICAS:
+            checked = last_lag(alias)
+            databases[alias]['replica'] = {
+                'lag_seconds': checked[1] if checked else None,
+                'checked_seconds_ago': round(time.monotonic() - checked[0], 1) if checked else None,
+            }
+    return {'pid': os.getpid(), 'databases': databases}
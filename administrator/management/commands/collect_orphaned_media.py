@@ -0,0 +1,56 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.core.management.base import BaseCommand, CommandError
+
+from administrator.orphans import DELETE, QUARANTINE, REPORT, OrphanCollector, referenced_hashes
+
+
+class Command(BaseCommand):
+    help = 'Find media files no row refers to any more; report them, or delete or quarantine them'
+
+    def add_arguments(self, parser):
+        action = parser.add_mutually_exclusive_group()
+        action.add_argument('--delete', action='store_true', help='Delete orphaned files')
+        action.add_argument('--quarantine', metavar='DIR',
+                            help='Move orphaned files under DIR, keeping their relative paths')
+        parser.add_argument('--grace-hours', type=float, default=24,
+                            help='Leave files younger than this alone (default: 24)')
+        parser.add_argument('--workers', type=int, default=8, help='Directory scanning threads (default: 8)')
+
+    def handle(self, *args, **options):
+        storage = default_storage
+        if not isinstance(storage, FileSystemStorage):
+            # An object storage bucket has no tree to walk; unattached direct uploads are
+            # discarded by their own job, and a bucket lifecycle rule covers the rest
+            raise CommandError(
+                f'Orphan collection only walks filesystem storages, not {storage.__class__.__name__}.'
+            )
+
+        if options['delete']:
+            action = DELETE
+        elif options['quarantine']:
+            action = QUARANTINE
+        else:
+            action = REPORT
+
+        on_orphan = None
+        if options['verbosity'] > 1 or action == REPORT:
+            def on_orphan(name):
+                self.stdout.write(name)
+
+        referenced = referenced_hashes()
+        try:
+            collector = OrphanCollector(
+                storage, referenced, grace_seconds=options['grace_hours'] * 3600, action=action,
+                quarantine_dir=options['quarantine'], workers=max(options['workers'], 1), on_orphan=on_orphan,
+            )
+        except ImproperlyConfigured as exc:
+            raise CommandError(str(exc))
+        totals = collector.run()
+
+        verb = {REPORT: 'Found', DELETE: 'Deleted', QUARANTINE: 'Quarantined'}[action]
+        self.stdout.write(
+            f"{verb} {totals['orphaned']} orphaned file(s), {totals['orphaned_bytes']} byte(s), "
+            f"out of {totals['scanned']} scanned against {len(referenced)} reference(s); "
+            f"{totals['recent']} recent unreferenced file(s) kept"
+        )
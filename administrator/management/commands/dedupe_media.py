@@ -0,0 +1,38 @@
+import os
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+
+from PfeManagement.storage import ContentAddressedStorage, media_root, upload_directories
+
+
+class Command(BaseCommand):
+    help = 'Move existing uploads into the content-addressed blob store, linking duplicates together'
+
+    def handle(self, *args, **options):
+        storage = default_storage
+        if not isinstance(storage, ContentAddressedStorage):
+            raise CommandError('The default storage is not ContentAddressedStorage.')
+
+        root = media_root(storage.base_location)
+        linked = saved = 0
+        # Only the upload directories: nothing else under MEDIA_ROOT belongs to a FileField
+        for directory in upload_directories():
+            for parent, dirs, files in os.walk(os.path.join(root, directory)):
+                for filename in files:
+                    path = os.path.join(parent, filename)
+                    digest = storage.stored_digest(path)
+                    blob = storage.blob_path(digest)
+                    os.makedirs(os.path.dirname(blob), exist_ok=True)
+                    if not os.path.exists(blob):
+                        os.link(path, blob)
+                        storage.remember_digest(blob, digest)
+                    elif not os.path.samefile(path, blob):
+                        # Swap the copy for a link to the stored content
+                        size = os.path.getsize(path)
+                        temp_path = f'{path}.dedupe'
+                        os.link(blob, temp_path)
+                        os.replace(temp_path, path)
+                        saved += size
+                    linked += 1
+        self.stdout.write(f'Linked {linked} file(s), freed {saved} byte(s)')
@@ -0,0 +1,61 @@
+import os
+import shutil
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.core.management.base import BaseCommand, CommandError
+
+from PfeManagement.storage import media_root, upload_directories
+
+
+class Command(BaseCommand):
+    help = (
+        'Move uploads saved under an earlier media root into MEDIA_ROOT. Before MEDIA_ROOT was '
+        'set, files were stored relative to the working directory of the server.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='source', default=os.getcwd(),
+                            help='Earlier media root (default: the current working directory)')
+
+    def handle(self, *args, **options):
+        storage = default_storage
+        if not isinstance(storage, FileSystemStorage):
+            raise CommandError(f'Only filesystem storages can be moved into, not {storage.__class__.__name__}.')
+        try:
+            target = media_root(storage.base_location)
+        except ImproperlyConfigured as exc:
+            raise CommandError(str(exc))
+        source = os.path.realpath(options['source'])
+        if source == target:
+            self.stdout.write('The uploads are already in MEDIA_ROOT')
+            return
+
+        moved = conflicts = 0
+        copied = False
+        # Names are stored relative to the media root, so the same relative paths keep them valid
+        for directory in upload_directories() + [getattr(settings, 'CAS_BLOB_DIR', '.blobs')]:
+            for parent, dirs, files in os.walk(os.path.join(source, directory), topdown=False):
+                for filename in files:
+                    path = os.path.join(parent, filename)
+                    destination = os.path.join(target, os.path.relpath(path, source))
+                    if os.path.lexists(destination):
+                        self.stderr.write(f'Left in place, {destination} exists: {path}')
+                        conflicts += 1
+                        continue
+                    os.makedirs(os.path.dirname(destination), exist_ok=True)
+                    try:
+                        # A rename keeps the inode, so names stay hard links to their blob
+                        os.rename(path, destination)
+                    except OSError:
+                        # Another filesystem: copied, which separates names from their blob
+                        shutil.move(path, destination)
+                        copied = True
+                    moved += 1
+                if not os.listdir(parent):
+                    os.rmdir(parent)
+
+        self.stdout.write(f'Moved {moved} file(s) from {source} to {target}; {conflicts} left in place')
+        if copied:
+            self.stdout.write('Files were copied across filesystems; run dedupe_media to link duplicates again')
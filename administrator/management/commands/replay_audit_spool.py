@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from administrator.audit import replay_spool
+
+
+class Command(BaseCommand):
+    help = 'Load audit events spooled to AUDIT_SPOOL_PATH into the database'
+
+    def handle(self, *args, **options):
+        loaded = replay_spool()
+        self.stdout.write(f'Loaded {loaded} audit event(s)')
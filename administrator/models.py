@@ -1,3 +1,34 @@
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
-# Create your models here.
+
+class AuditEvent(models.Model):
+    """Who did what to which object; written in batches by administrator.audit"""
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='audit_events',
+        # Audit rows are appended in bulk; no constraint check or lock on the user row
+        db_constraint=False
+    )
+    actor_username = models.CharField(max_length=150, blank=True)
+    action = models.CharField(max_length=100)
+    target_type = models.CharField(max_length=100)
+    target_id = models.CharField(max_length=64)
+    data = models.JSONField(default=dict, blank=True)
+    ip_address = models.GenericIPAddressField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['-created_at', '-id']
+        indexes = [
+            models.Index(fields=['created_at'], name='admin_audit_created_idx'),
+            models.Index(fields=['actor', 'created_at'], name='admin_audit_actor_idx'),
+            models.Index(fields=['target_type', 'target_id', 'created_at'], name='admin_audit_target_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.actor_username or 'system'} {self.action} {self.target_type}#{self.target_id}"
@@ -0,0 +1,156 @@
+"""
+Garbage collection of orphaned media files.
+
+Files stay on disk when their row is deleted or their field is given a new
+file. referenced_hashes() streams every name stored in a FileField column
+(plus the profile picture variants, see authentication/thumbnails.py) into
+a set of 64-bit hashes; OrphanCollector walks the directories uploads are
+saved to (upload_to, the variants and the blob store; nothing else under
+MEDIA_ROOT) with a pool of threads, one directory per task, and handles each unreferenced file older than the
+grace period as it is found. Memory is bounded by the number of references
+(8-byte hashes), not by the number of files on disk. A hash collision can
+only keep an orphan, never remove a referenced file.
+
+With ContentAddressedStorage, names are hard links to blobs: an orphaned
+name is removed through the storage, and a blob no name links to any more
+(link count 1) is itself an orphan.
+"""
+import hashlib
+import os
+import shutil
+import threading
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.apps import apps
+from django.db import models
+
+from authentication.models import User
+from authentication.thumbnails import VARIANT_DIRECTORY, variant_names
+from PfeManagement.storage import ContentAddressedStorage, media_root, upload_directories
+
+REFERENCE_CHUNK_SIZE = 5000
+
+REPORT, DELETE, QUARANTINE = 'report', 'delete', 'quarantine'
+
+
+def name_hash(name):
+    return int.from_bytes(hashlib.blake2b(name.encode(), digest_size=8).digest(), 'big')
+
+
+def referenced_names():
+    """Yield every media name stored in the database"""
+    for model in apps.get_models():
+        for field in model._meta.concrete_fields:
+            if not isinstance(field, models.FileField):
+                continue
+            names = (
+                model._default_manager.exclude(**{f'{field.attname}__isnull': True})
+                .exclude(**{field.attname: ''}).values_list(field.attname, flat=True)
+            )
+            yield from names.iterator(chunk_size=REFERENCE_CHUNK_SIZE)
+
+    users = User.objects.exclude(profile_picture_variants={}).only('id', 'profile_picture_variants')
+    for user in users.iterator(chunk_size=REFERENCE_CHUNK_SIZE):
+        yield from variant_names(user)
+
+
+def referenced_hashes():
+    return {name_hash(name) for name in referenced_names()}
+
+
+def media_directories(root):
+    """Top-level directories under `root` that media files are saved to"""
+    names = set(upload_directories())
+    names.add(VARIANT_DIRECTORY.split('/')[0])
+    return [os.path.join(root, name) for name in sorted(names)]
+
+
+class OrphanCollector:
+    """
+    Walks a FileSystemStorage tree and reports, deletes or quarantines the
+    files not in `referenced` (a set of name_hash() values).
+    """
+
+    def __init__(self, storage, referenced, grace_seconds, action=REPORT, quarantine_dir=None,
+                 workers=8, on_orphan=None):
+        self.storage = storage
+        self.referenced = referenced
+        self.cutoff = time.time() - grace_seconds
+        self.action = action
+        self.quarantine_dir = os.path.realpath(quarantine_dir) if quarantine_dir else None
+        self.workers = workers
+        self.on_orphan = on_orphan
+        self.root = media_root(storage.base_location)
+        self.blob_root = (
+            os.path.realpath(storage.blob_root) if isinstance(storage, ContentAddressedStorage) else None
+        )
+        self.directories = media_directories(self.root) + ([self.blob_root] if self.blob_root else [])
+        self._lock = threading.Lock()
+
+    def run(self):
+        """Scan the media directories; returns a Counter of scanned, orphaned, recent and orphaned_bytes"""
+        totals = Counter()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            pending = {pool.submit(self._scan, path) for path in self.directories if os.path.isdir(path)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    counts, subdirectories = future.result()
+                    totals.update(counts)
+                    pending.update(pool.submit(self._scan, path) for path in subdirectories)
+        return totals
+
+    def _scan(self, directory):
+        counts = Counter()
+        subdirectories = []
+        in_blobs = self.blob_root is not None and (
+            directory == self.blob_root or directory.startswith(self.blob_root + os.sep)
+        )
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if os.path.realpath(entry.path) != self.quarantine_dir:
+                        subdirectories.append(entry.path)
+                    continue
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+                counts['scanned'] += 1
+                stat = entry.stat(follow_symlinks=False)
+                if in_blobs:
+                    # A blob with no other link, or an abandoned upload
+                    orphaned = stat.st_nlink == 1 or entry.name.startswith('.upload-')
+                else:
+                    name = os.path.relpath(entry.path, self.root).replace(os.sep, '/')
+                    orphaned = name_hash(name) not in self.referenced
+                if not orphaned:
+                    continue
+                # A new hard link only changes ctime, so both times count for the age
+                if max(stat.st_mtime, stat.st_ctime) > self.cutoff:
+                    counts['recent'] += 1
+                    continue
+                counts['orphaned'] += 1
+                counts['orphaned_bytes'] += stat.st_size
+                self._handle(entry.path, in_blobs)
+        return counts, subdirectories
+
+    def _handle(self, path, is_blob):
+        name = os.path.relpath(path, self.root).replace(os.sep, '/')
+        if self.on_orphan:
+            with self._lock:
+                self.on_orphan(name)
+        try:
+            if self.action == DELETE:
+                if is_blob:
+                    os.remove(path)
+                else:
+                    # Through the storage, so a blob loses the reference as well
+                    self.storage.delete(name)
+            elif self.action == QUARANTINE:
+                target = os.path.join(self.quarantine_dir, name)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                shutil.move(path, target)
+        except FileNotFoundError:
+            # A blob removed meanwhile along with its last name
+            pass
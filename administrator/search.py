@@ -0,0 +1,105 @@
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import connection
+from django.db.models import Case, F, FloatField, IntegerField, Lookup, Q, Value, When
+from django.db.models.functions import Greatest
+
+from authentication.models import User
+
+SEARCH_FIELDS = ['username', 'email', 'first_name', 'last_name']
+
+
+class ILike(Lookup):
+    """Plain ILIKE, so trigram GIN indexes on the raw columns apply (icontains wraps them in UPPER())"""
+    lookup_name = 'ilike'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} ILIKE {rhs}', lhs_params + rhs_params
+
+
+class WordSimilar(Lookup):
+    """`term <% column`: the column contains a word similar to the term; served by gin_trgm_ops"""
+    lookup_name = 'word_similar'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{rhs} <%% {lhs}', rhs_params + lhs_params
+
+
+def _escape_like(value):
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def search_users(queryset, term):
+    """
+    Filter users matching a search term and annotate them with `search_rank`.
+    On PostgreSQL this uses pg_trgm (substring and typo-tolerant word matches,
+    both index-assisted); other databases get a token-based icontains fallback.
+    """
+    term = term.strip()
+    if not term:
+        return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+    if connection.vendor == 'postgresql':
+        return _trigram_search(queryset, term)
+    return _portable_search(queryset, term)
+
+
+def filter_users(queryset, params):
+    """
+    Apply the user list filters (role, is_active, search) from query parameters
+    or a request body; returns the queryset and whether a search term was given.
+    """
+    role_id = params.get('role')
+    if role_id:
+        queryset = queryset.filter(role_id=role_id)
+
+    is_active = params.get('is_active')
+    if is_active is not None:
+        queryset = queryset.filter(is_active=str(is_active).lower() in ['true', '1', 'yes'])
+
+    # Search (trigram indexed on PostgreSQL, tolerant to typos)
+    search = params.get('search')
+    if search:
+        queryset = search_users(queryset, search)
+    return queryset, bool(search)
+
+
+def _trigram_search(queryset, term):
+    pattern = Value(f'%{_escape_like(term)}%')
+    condition = Q()
+    for field in SEARCH_FIELDS:
+        condition |= Q(ILike(F(field), pattern)) | Q(WordSimilar(F(field), Value(term)))
+    rank = Greatest(*[TrigramWordSimilarity(term, field) for field in SEARCH_FIELDS])
+    return queryset.filter(condition).annotate(search_rank=rank)
+
+
+def _portable_search(queryset, term):
+    # Every word of the term must appear in one of the fields
+    for token in term.split():
+        token_condition = Q()
+        for field in SEARCH_FIELDS:
+            token_condition |= Q(**{f'{field}__icontains': token})
+        queryset = queryset.filter(token_condition)
+    rank = Case(
+        When(Q(username__iexact=term) | Q(email__iexact=term), then=Value(3)),
+        When(Q(username__istartswith=term) | Q(first_name__istartswith=term) | Q(last_name__istartswith=term),
+             then=Value(2)),
+        default=Value(1),
+        output_field=IntegerField(),
+    )
+    return queryset.annotate(search_rank=rank)
+
+
+def trigram_index_statements():
+    """SQL creating the pg_trgm GIN indexes used by the PostgreSQL search"""
+    table = User._meta.db_table
+    statements = ['CREATE EXTENSION IF NOT EXISTS pg_trgm']
+    for field in SEARCH_FIELDS:
+        column = User._meta.get_field(field).column
+        statements.append(
+            f'CREATE INDEX IF NOT EXISTS {table}_{column}_trgm '
+            f'ON {table} USING gin ({column} gin_trgm_ops)'
+        )
+    return statements
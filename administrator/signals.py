@@ -0,0 +1,50 @@
+import logging
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import DatabaseError, connections
+from django.db.models.signals import post_migrate, post_save, post_delete
+from django.dispatch import receiver
+
+from authentication.models import Role, User
+from administrator.search import trigram_index_statements
+from administrator.stats import invalidate_user_stats
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_stats_on_user_change(sender, instance, update_fields=None, **kwargs):
+    # Logging in only touches last_login, which the statistics do not use
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    invalidate_user_stats()
+
+
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+def invalidate_stats_on_role_change(sender, instance, **kwargs):
+    invalidate_user_stats()
+
+
+@receiver(post_migrate)
+def create_cache_table(sender, using='default', **kwargs):
+    # The database cache (settings.CACHES) must exist before the post_migrate
+    # handlers that create users run; it is a no-op once the table exists
+    call_command('createcachetable', database=using, verbosity=0)
+
+
+@receiver(post_migrate)
+def create_user_search_indexes(sender, using='default', **kwargs):
+    connection = connections[using]
+    # Replicas receive the indexes from the primary
+    if sender.name != 'authentication' or connection.vendor != 'postgresql' or using in settings.DATABASE_REPLICAS:
+        return
+    try:
+        with connection.cursor() as cursor:
+            for statement in trigram_index_statements():
+                cursor.execute(statement)
+    except DatabaseError:
+        # Creating the extension needs elevated rights; search still works, only slower
+        logger.warning("Could not create the pg_trgm user search indexes", exc_info=True)
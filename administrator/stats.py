@@ -0,0 +1,69 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.db.models.functions import TruncWeek
+from django.utils import timezone
+
+from authentication.models import User, Role
+
+USER_STATS_CACHE_KEY = 'administrator:user-stats'
+MAX_TREND_WEEKS = 104
+
+
+def compute_user_stats():
+    """Build the user statistics snapshot from grouped aggregate queries"""
+    # Totals, active counts and the role breakdown in a single GROUP BY
+    rows = (
+        User.objects.order_by()
+        .values('role__name')
+        .annotate(total=Count('id'), active=Count('id', filter=Q(is_active=True)))
+    )
+    users_by_role = {name: 0 for name in Role.objects.values_list('name', flat=True)}
+    total_users = active_users = 0
+    for row in rows:
+        total_users += row['total']
+        active_users += row['active']
+        if row['role__name'] is not None:
+            users_by_role[row['role__name']] = row['total']
+
+    # Weekly signups per role, oldest week first
+    since = timezone.now() - timedelta(weeks=MAX_TREND_WEEKS)
+    weekly = (
+        User.objects.filter(date_joined__gte=since)
+        .annotate(week=TruncWeek('date_joined'))
+        .order_by()
+        .values('week', 'role__name')
+        .annotate(count=Count('id'))
+    )
+    weeks = {}
+    for row in weekly:
+        week = weeks.setdefault(row['week'].date().isoformat(), {'total': 0, 'by_role': {}})
+        week['total'] += row['count']
+        if row['role__name'] is not None:
+            week['by_role'][row['role__name']] = row['count']
+
+    return {
+        'total_users': total_users,
+        'active_users': active_users,
+        'inactive_users': total_users - active_users,
+        'users_by_role': users_by_role,
+        'signups_by_week': [
+            {'week': week, **counts} for week, counts in sorted(weeks.items())
+        ],
+        'generated_at': timezone.now().isoformat(),
+    }
+
+
+def get_user_stats():
+    """Return the cached snapshot, rebuilding it when missing or older than USER_STATS_MAX_STALENESS"""
+    stats = cache.get(USER_STATS_CACHE_KEY)
+    if stats is None:
+        stats = compute_user_stats()
+        cache.set(USER_STATS_CACHE_KEY, stats, getattr(settings, 'USER_STATS_MAX_STALENESS', 300))
+    return stats
+
+
+def invalidate_user_stats():
+    cache.delete(USER_STATS_CACHE_KEY)
@@ -0,0 +1,8 @@
+from jobs.queue import task
+from PfeManagement.directuploads import discard_unattached
+
+
+@task('administrator.discard_unattached_upload')
+def discard_unattached_upload(target, key):
+    """Delete a direct upload that was never attached to a row"""
+    discard_unattached(target, key)
@@ -0,0 +1,151 @@
+import time
+from datetime import date, timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from authentication.models import Role
+from administrator import audit
+from administrator.models import AuditEvent
+from internship.models import Internship
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestAuditLog:
+    """Test cases for the buffered audit log"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, settings, tmp_path):
+        settings.AUDIT_SPOOL_PATH = str(tmp_path / 'audit-spool.jsonl')
+        settings.AUDIT_FLUSH_INTERVAL = 3600
+        audit.get_buffer().take()
+        self.admin = User.objects.create_user(
+            username='auditadmin', password='pass12345', role=Role.objects.get(name='Administrator')
+        )
+        self.student = User.objects.create_user(
+            username='auditstudent', password='pass12345', role=Role.objects.get(name='Student')
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        yield
+        audit.get_buffer().take()
+
+    def _internship(self):
+        return Internship.objects.create(
+            student_id=self.student, type='PFE', company_name='Acme',
+            cahier_de_charges='cahiers_de_charges/a.pdf',
+            start_date=date(2025, 2, 1), end_date=date(2025, 6, 30), title='Audit'
+        )
+
+    def test_events_are_buffered_then_flushed(self, django_capture_on_commit_callbacks):
+        """Test that actions are captured after commit and written in one batch"""
+        internship = self._internship()
+        with django_capture_on_commit_callbacks(execute=True):
+            self.client.patch(f'/internship/admin/{internship.id}/reject/', {'reason': 'Incomplete'}, format='json')
+            self.client.delete(f'/administrator/users/{self.student.id}/delete/')
+        assert not AuditEvent.objects.exists()
+        assert audit.get_buffer().pending() == 2
+
+        assert audit.flush() == 2
+        reject = AuditEvent.objects.get(action='internship.reject')
+        assert reject.actor_id == self.admin.id
+        assert reject.target_id == str(internship.id)
+        assert reject.data == {'reason': 'Incomplete'}
+        assert AuditEvent.objects.filter(action='user.deactivate', target_id=str(self.student.id)).exists()
+
+    def test_full_buffer_is_flushed_after_the_request(self, settings, django_capture_on_commit_callbacks):
+        """Test that reaching AUDIT_BUFFER_SIZE writes the buffer once the request finishes"""
+        settings.AUDIT_BUFFER_SIZE = 2
+        other = User.objects.create_user(username='auditother', password='pass12345')
+        with django_capture_on_commit_callbacks(execute=True):
+            self.client.delete(f'/administrator/users/{self.student.id}/delete/')
+        assert AuditEvent.objects.count() == 0
+        with django_capture_on_commit_callbacks(execute=True):
+            self.client.delete(f'/administrator/users/{other.id}/delete/')
+        # Test transactions run commit callbacks after the request; the next one flushes
+        self.client.get('/administrator/roles/')
+        assert AuditEvent.objects.count() == 2
+
+    def test_failed_writes_are_spooled_and_replayed(self, monkeypatch):
+        """Test that events survive a database failure through the spool file"""
+        event = AuditEvent(actor_id=self.admin.id, actor_username='auditadmin', action='user.update',
+                           target_type='authentication.user', target_id='7', created_at=timezone.now())
+        audit.get_buffer().add(event)
+
+        def fail(*args, **kwargs):
+            raise DatabaseError('database is down')
+        monkeypatch.setattr(AuditEvent.objects, 'bulk_create', fail)
+        assert audit.flush() == 0
+        monkeypatch.undo()
+
+        assert audit.replay_spool() == 1
+        assert AuditEvent.objects.get().action == 'user.update'
+        assert audit.replay_spool() == 0
+
+    def test_query_filters_and_pages(self):
+        """Test that the audit endpoint filters by actor, target and time, newest first"""
+        now = timezone.now()
+        AuditEvent.objects.bulk_create([
+            AuditEvent(actor_id=self.admin.id, action='user.update', target_type='authentication.user',
+                       target_id=str(i % 2), created_at=now - timedelta(minutes=i))
+            for i in range(5)
+        ])
+        response = self.client.get('/administrator/audit/', {'actor': self.admin.id, 'page_size': 2})
+        assert response.status_code == 200
+        first_page = response.data['results']
+        assert len(first_page) == 2
+        assert first_page[0]['created_at'] > first_page[1]['created_at']
+
+        seen = [event['id'] for event in first_page]
+        cursor = response.data['next_cursor']
+        while cursor:
+            response = self.client.get('/administrator/audit/', {'page_size': 2, 'cursor': cursor})
+            seen += [event['id'] for event in response.data['results']]
+            cursor = response.data['next_cursor']
+        assert len(seen) == len(set(seen)) == 5
+
+        response = self.client.get('/administrator/audit/', {
+            'target_type': 'authentication.user', 'target_id': '0',
+            'since': (now - timedelta(minutes=3, seconds=30)).isoformat(),
+        })
+        assert len(response.data['results']) == 2
+        assert self.client.get('/administrator/audit/', {'cursor': 'nope'}).status_code == 400
+
+    def test_forwarded_ip_is_only_trusted_behind_configured_proxies(self, settings, rf):
+        """Test that a client cannot forge the audited address through X-Forwarded-For"""
+        request = rf.get('/', HTTP_X_FORWARDED_FOR='6.6.6.6, 203.0.113.7', REMOTE_ADDR='10.0.0.2')
+        settings.AUDIT_TRUSTED_PROXY_COUNT = 0
+        assert audit._client_ip(request) == '10.0.0.2'
+        settings.AUDIT_TRUSTED_PROXY_COUNT = 1
+        assert audit._client_ip(request) == '203.0.113.7'
+        settings.AUDIT_TRUSTED_PROXY_COUNT = 2
+        assert audit._client_ip(request) == '6.6.6.6'
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAuditFlushTimer:
+    """Test cases for the flush timer of idle workers"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, settings, tmp_path):
+        settings.AUDIT_SPOOL_PATH = str(tmp_path / 'audit-spool.jsonl')
+        settings.AUDIT_FLUSH_INTERVAL = 0.2
+        audit.get_buffer().take()
+        yield
+        audit.stop_flush_timer()
+        audit.get_buffer().take()
+
+    def test_due_events_are_written_without_another_request(self):
+        """Test that the timer writes the buffer once its oldest event is due"""
+        audit.start_flush_timer()
+        audit.get_buffer().add(AuditEvent(action='user.update', target_type='authentication.user', target_id='1'))
+        deadline = time.monotonic() + 5
+        while not AuditEvent.objects.exists() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert AuditEvent.objects.filter(action='user.update').exists()
+        assert audit.get_buffer().pending() == 0
@@ -0,0 +1,81 @@
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from authentication.models import Role
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestBulkUserActions:
+    """Test cases for the bulk user administration endpoint"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.admin = User.objects.create_user(
+            username='bulkadmin', password='pass12345', role=Role.objects.get(name='Administrator')
+        )
+        self.student_role = Role.objects.get(name='Student')
+        self.students = [
+            User.objects.create_user(username=f'grad{i}', password='pass12345', role=self.student_role)
+            for i in range(5)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def _post(self, payload):
+        return self.client.post('/administrator/users/bulk/', payload, format='json')
+
+    def test_deactivate_by_ids_in_chunks(self, settings, django_assert_max_num_queries):
+        """Test that ids are updated with one UPDATE per chunk and reported per id"""
+        settings.BULK_USER_CHUNK_SIZE = 2
+        ids = [user.id for user in self.students] + [999999]
+        with django_assert_max_num_queries(20):
+            response = self._post({'action': 'deactivate', 'ids': ids})
+        assert response.status_code == 200
+        assert response.data['updated'] == 5
+        statuses = {result['id']: result['status'] for result in response.data['results']}
+        assert statuses[999999] == 'not_found'
+        assert not User.objects.filter(id__in=ids, is_active=True).exists()
+
+        response = self._post({'action': 'deactivate', 'ids': ids[:2]})
+        assert [result['status'] for result in response.data['results']] == ['unchanged', 'unchanged']
+
+    def test_filters_select_targets(self):
+        """Test that the user list filters can be used instead of ids"""
+        response = self._post({'action': 'set_role', 'role': Role.objects.get(name='Teacher').id,
+                               'filters': {'search': 'grad', 'role': self.student_role.id}})
+        assert response.data['updated'] == 5
+        assert User.objects.filter(username__startswith='grad', role__name='Teacher').count() == 5
+
+    def test_admin_cannot_deactivate_themselves(self):
+        """Test that the acting administrator is skipped with an error"""
+        response = self._post({'action': 'deactivate', 'ids': [self.admin.id, self.students[0].id]})
+        assert response.data['results'][0]['status'] == 'error'
+        assert response.data['results'][1]['status'] == 'updated'
+        self.admin.refresh_from_db()
+        assert self.admin.is_active
+
+    def test_deactivated_users_lose_api_access(self):
+        """Test that tokens of deactivated users are refused"""
+        from rest_framework_simplejwt.tokens import RefreshToken
+        token = RefreshToken.for_user(self.students[0])
+        self._post({'action': 'deactivate', 'ids': [self.students[0].id]})
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token.access_token}')
+        assert client.get('/internship/my-internships/').status_code == 401
+
+    def test_invalid_requests(self):
+        """Test that targets and roles are validated"""
+        assert self._post({'action': 'deactivate'}).status_code == 400
+        assert self._post({'action': 'deactivate', 'filters': {}}).status_code == 400
+        assert self._post({'action': 'set_role', 'ids': [self.students[0].id]}).status_code == 400
+        assert self._post({'action': 'delete', 'ids': [1]}).status_code == 400
+
+    def test_filters_are_type_checked(self):
+        """Test that malformed or unknown filters are a 400, not a server error"""
+        for filters in ({'role': 'abc'}, {'is_active': 'maybe'}, {'search': ['grad']}, {'team': 'a'}):
+            response = self._post({'action': 'deactivate', 'filters': filters})
+            assert response.status_code == 400, filters
+            assert 'filters' in response.data
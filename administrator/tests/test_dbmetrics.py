@@ -0,0 +1,64 @@
+import os
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connections
+from rest_framework.test import APIClient
+
+from authentication.models import Role
+from administrator.dbmetrics import pool_metrics
+
+User = get_user_model()
+
+
+class StatsPool:
+    def __init__(self, stats):
+        self.stats = stats
+
+    def get_stats(self):
+        return dict(self.stats)
+
+
+@pytest.mark.django_db
+class TestDatabaseMetrics:
+    """Test cases for the database connection metrics endpoint"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.admin = User.objects.create_user(
+            username='dbadmin', password='pass12345', role=Role.objects.get(name='Administrator')
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_reports_connection_settings_of_this_process(self):
+        """Test that every database alias is reported for the current process"""
+        response = self.client.get('/administrator/db/')
+        assert response.status_code == 200
+        assert response.data['pid'] == os.getpid()
+        default = response.data['databases']['default']
+        assert default['vendor'] == connections['default'].vendor
+        assert default['conn_max_age'] == connections['default'].settings_dict['CONN_MAX_AGE']
+        assert default['pooled'] is False
+        assert default['pool'] is None
+
+    def test_non_administrators_are_refused(self):
+        """Test that only administrators can read the metrics"""
+        student = User.objects.create_user(
+            username='dbstudent', password='pass12345', role=Role.objects.get(name='Student')
+        )
+        self.client.force_authenticate(student)
+        assert self.client.get('/administrator/db/').status_code == 403
+
+    def test_pool_wait_time_is_averaged_over_requests(self):
+        """Test that pool statistics are reported with the average wait per checkout"""
+        metrics = pool_metrics(StatsPool({
+            'pool_min': 2, 'pool_max': 8, 'pool_size': 5, 'pool_available': 1,
+            'requests_num': 40, 'requests_queued': 4, 'requests_wait_ms': 90,
+        }))
+        assert metrics['size'] == 5
+        assert metrics['max_size'] == 8
+        assert metrics['wait_ms_total'] == 90
+        assert metrics['wait_ms_average'] == 2.25
+        assert metrics['waiting'] == 0
+        assert pool_metrics(StatsPool({'pool_min': 2, 'pool_max': 8}))['wait_ms_average'] == 0
@@ -0,0 +1,34 @@
+import io
+import os
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+
+
+@pytest.mark.django_db
+class TestMoveMedia:
+    """Test cases for the move_media command"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, settings, tmp_path):
+        # The earlier media root: the working directory the server ran in
+        self.old_root = tmp_path / 'app'
+        settings.MEDIA_ROOT = str(self.old_root)
+        self.first = default_storage.save('reports/a.pdf', ContentFile(b'%PDF-1.4 same'))
+        self.second = default_storage.save('cahiers_de_charges/b.pdf', ContentFile(b'%PDF-1.4 same'))
+        (self.old_root / 'manage.py').write_text('not an upload')
+        settings.MEDIA_ROOT = str(tmp_path / 'uploads')
+
+    def test_uploads_keep_their_names_and_links(self):
+        """Test that moved files are found under their stored names and still share a blob"""
+        out = io.StringIO()
+        call_command('move_media', '--from', str(self.old_root), stdout=out)
+        assert 'Moved 3 file(s)' in out.getvalue()
+
+        with default_storage.open(self.first) as handle:
+            assert handle.read() == b'%PDF-1.4 same'
+        assert os.path.samefile(default_storage.path(self.first), default_storage.path(self.second))
+        assert default_storage.references(self.first) == 2
+        assert sorted(os.listdir(self.old_root)) == ['manage.py']
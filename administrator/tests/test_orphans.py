@@ -0,0 +1,95 @@
+import io
+import os
+from datetime import date
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import CommandError, call_command
+
+from authentication.models import Role
+from internship.models import Internship
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestOrphanedMediaCollection:
+    """Test cases for the collect_orphaned_media command"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, settings, tmp_path):
+        settings.MEDIA_ROOT = str(tmp_path / 'media')
+        self.student = User.objects.create_user(
+            username='orphanstudent', password='pass12345', role=Role.objects.get(name='Student')
+        )
+        self.kept = default_storage.save('cahiers_de_charges/kept.pdf', ContentFile(b'%PDF-1.4 kept'))
+        Internship.objects.create(
+            student_id=self.student, type='PFE', company_name='Acme', cahier_de_charges=self.kept,
+            start_date=date(2025, 2, 1), end_date=date(2025, 6, 30)
+        )
+        # Same content as a referenced file, so only the name is orphaned
+        self.duplicate = default_storage.save('cahiers_de_charges/old-copy.pdf', ContentFile(b'%PDF-1.4 kept'))
+        self.orphan = default_storage.save('reports/replaced.pdf', ContentFile(b'%PDF-1.4 replaced'))
+
+    def _run(self, *args):
+        out = io.StringIO()
+        call_command('collect_orphaned_media', *args, stdout=out)
+        return out.getvalue()
+
+    def test_dry_run_reports_without_touching_files(self):
+        """Test that without an action orphans are listed and left in place"""
+        output = self._run('--grace-hours', '0')
+        assert 'reports/replaced.pdf' in output
+        assert 'cahiers_de_charges/old-copy.pdf' in output
+        assert 'cahiers_de_charges/kept.pdf' not in output
+        assert 'Found 2 orphaned file(s)' in output
+        assert default_storage.exists(self.orphan)
+
+    def test_grace_period_keeps_recent_files(self):
+        """Test that files younger than the grace period are never collected"""
+        output = self._run('--delete')
+        assert 'Deleted 0 orphaned file(s)' in output
+        assert '2 recent unreferenced file(s) kept' in output
+        assert default_storage.exists(self.orphan)
+
+    def test_delete_removes_orphans_and_their_blobs(self):
+        """Test that orphaned names go, shared blobs stay and unshared blobs are freed"""
+        self._run('--delete', '--grace-hours', '0')
+        assert not default_storage.exists(self.orphan)
+        assert not default_storage.exists(self.duplicate)
+        with default_storage.open(self.kept) as handle:
+            assert handle.read() == b'%PDF-1.4 kept'
+        blobs = [name for _, _, files in os.walk(default_storage.blob_root) for name in files]
+        assert len(blobs) == 1
+
+    def test_quarantine_moves_orphans(self, tmp_path):
+        """Test that quarantined files keep their relative paths"""
+        quarantine = tmp_path / 'quarantine'
+        self._run('--quarantine', str(quarantine), '--grace-hours', '0')
+        assert not default_storage.exists(self.orphan)
+        assert (quarantine / 'reports' / 'replaced.pdf').read_bytes() == b'%PDF-1.4 replaced'
+        assert default_storage.exists(self.kept)
+
+    def test_only_upload_directories_are_walked(self, settings):
+        """Test that files outside the upload directories are neither listed nor touched"""
+        stray = os.path.join(settings.MEDIA_ROOT, 'notes', 'readme.txt')
+        os.makedirs(os.path.dirname(stray))
+        with open(stray, 'w') as handle:
+            handle.write('not an upload')
+        output = self._run('--delete', '--grace-hours', '0')
+        assert 'Deleted 2 orphaned file(s)' in output
+        assert os.path.exists(stray)
+
+    def test_refuses_shared_or_non_filesystem_roots(self, settings):
+        """Test that a MEDIA_ROOT holding the project, or an object storage, is refused"""
+        settings.MEDIA_ROOT = str(settings.BASE_DIR)
+        with pytest.raises(CommandError, match='MEDIA_ROOT'):
+            self._run('--delete', '--grace-hours', '0')
+
+        settings.STORAGES = {
+            **settings.STORAGES, 'default': {'BACKEND': 'PfeManagement.objectstorage.ObjectStorage'}
+        }
+        with pytest.raises(CommandError, match='ObjectStorage'):
+            self._run()
@@ -0,0 +1,125 @@
+import pytest
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DatabaseError, connections
+from django.http import HttpResponse
+from rest_framework.test import APIClient
+
+from authentication.models import Role
+from PfeManagement import replicas
+
+User = get_user_model()
+
+REPLICA = 'replica'
+
+
+@pytest.fixture(scope='module')
+def replica_database(tmp_path_factory, django_db_setup, django_db_blocker):
+    """A second SQLite database, with the same tables as the primary"""
+    name = str(tmp_path_factory.mktemp('replica') / 'replica.sqlite3')
+    connections.settings[REPLICA] = {**connections.settings['default'], 'NAME': name}
+    with django_db_blocker.unblock():
+        with connections[REPLICA].schema_editor() as editor:
+            for model in apps.get_models():
+                if model._meta.managed and not model._meta.proxy:
+                    editor.create_model(model)
+        connections[REPLICA].close()
+    yield REPLICA
+    connections[REPLICA].close()
+    del connections[REPLICA]
+    del connections.settings[REPLICA]
+
+
+@pytest.fixture
+def replica(replica_database, settings):
+    """replica_database registered as the only replica"""
+    settings.DATABASE_REPLICAS = [replica_database]
+    replicas.reset_lag_checks()
+    cache.clear()
+    yield replica_database
+    replicas.reset_lag_checks()
+
+
+@pytest.mark.django_db(databases=['default', REPLICA])
+class TestReplicaRouting:
+    """Test cases for routing reads to replicas"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, replica):
+        self.admin_role = Role.objects.get(name='Administrator')
+        self.admin = User.objects.create_user(username='primaryadmin', password='pass12345', role=self.admin_role)
+        # Rows only the replica has tell where a list was read from
+        Role.objects.using(replica).bulk_create([Role(id=self.admin_role.id, name='Administrator')])
+        User.objects.using(replica).bulk_create([
+            User(username='replicaonly', email='replicaonly@example.com', password='!', role_id=self.admin_role.id)
+        ])
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def usernames(self):
+        response = self.client.get('/administrator/users/')
+        assert response.status_code == 200
+        return {user['username'] for user in response.data}
+
+    def test_get_requests_read_from_the_replica(self):
+        """Test that a list endpoint is served from the replica"""
+        assert self.usernames() == {'replicaonly'}
+
+    def test_reads_stick_to_the_primary_after_a_write(self):
+        """Test that a user who wrote reads their own writes from the primary"""
+        response = self.client.post('/administrator/users/create/', {
+            'username': 'newuser', 'email': 'newuser@example.com', 'password': 'pass12345',
+            'password_confirm': 'pass12345', 'first_name': 'New', 'last_name': 'User',
+            'role': Role.objects.get(name='Student').id,
+        })
+        assert response.status_code == 201, response.data
+        assert cache.get(replicas.sticky_key(self.admin.pk))
+        assert {'primaryadmin', 'newuser'} <= self.usernames()
+
+        # Other users are not affected
+        other = User.objects.create_user(username='otheradmin', password='pass12345', role=self.admin_role)
+        self.client.force_authenticate(other)
+        assert self.usernames() == {'replicaonly'}
+
+    def test_cache_fills_do_not_stick_to_the_primary(self, rf):
+        """Test that a GET which only writes the database cache keeps reading from the replica"""
+        def view(request):
+            cache.set('filled-on-read', True)
+            return HttpResponse()
+
+        request = rf.get('/administrator/users/')
+        request.user = self.admin
+        replicas.ReplicaRoutingMiddleware(view)(request)
+        assert cache.get('filled-on-read')
+        assert not cache.get(replicas.sticky_key(self.admin.pk))
+
+    def test_lagging_or_unreachable_replicas_fall_back_to_the_primary(self, monkeypatch, settings):
+        """Test that reads go to the primary when the replica is behind or down"""
+        settings.REPLICA_MAX_LAG_SECONDS = 5
+        settings.REPLICA_LAG_CHECK_INTERVAL = 0
+        monkeypatch.setattr(replicas, 'replica_lag', lambda alias: 30.0)
+        assert 'primaryadmin' in self.usernames()
+
+        def unreachable(alias):
+            raise DatabaseError('connection refused')
+        monkeypatch.setattr(replicas, 'replica_lag', unreachable)
+        assert 'primaryadmin' in self.usernames()
+
+        monkeypatch.setattr(replicas, 'replica_lag', lambda alias: 1.0)
+        assert self.usernames() == {'replicaonly'}
+
+    def test_reads_outside_requests_use_the_primary(self):
+        """Test that code without a request, such as jobs, never reads from a replica"""
+        assert User.objects.filter(username='primaryadmin').exists()
+        assert not User.objects.filter(username='replicaonly').exists()
+        assert replicas.ReplicaRouter().db_for_write(User) == 'default'
+
+    def test_replicas_need_a_shared_cache(self, settings):
+        """Test that the middleware refuses to start with a cache private to each process"""
+        settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+        with pytest.raises(ImproperlyConfigured):
+            replicas.ReplicaRoutingMiddleware(lambda request: None)
+        settings.DATABASE_REPLICAS = []
+        replicas.ReplicaRoutingMiddleware(lambda request: None)
@@ -0,0 +1,53 @@
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from authentication.models import Role
+from administrator.search import trigram_index_statements
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestUserSearch:
+    """Test cases for searching the administrator user list"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.admin = User.objects.create_user(
+            username='searchadmin', password='pass12345', role=Role.objects.get(name='Administrator')
+        )
+        student = Role.objects.get(name='Student')
+        User.objects.create_user(username='jdupont', email='jean.dupont@example.com', password='pass12345',
+                                 first_name='Jean', last_name='Dupont', role=student)
+        User.objects.create_user(username='mjean', email='marie@example.com', password='pass12345',
+                                 first_name='Marie', last_name='Dejean', role=student, is_active=False)
+        User.objects.create_user(username='pmartin', email='paul@example.com', password='pass12345',
+                                 first_name='Paul', last_name='Martin')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def _usernames(self, **params):
+        response = self.client.get('/administrator/users/', params)
+        assert response.status_code == 200
+        return [user['username'] for user in response.data]
+
+    def test_every_word_must_match(self):
+        """Test that a multi-word term matches across name fields"""
+        assert self._usernames(search='jean dupont') == ['jdupont']
+
+    def test_prefix_matches_rank_first(self):
+        """Test that users whose name starts with the term come before substring matches"""
+        assert self._usernames(search='jean') == ['jdupont', 'mjean']
+
+    def test_search_combines_with_filters(self):
+        """Test that search is applied together with the role and status filters"""
+        assert self._usernames(search='jean', is_active='false') == ['mjean']
+        assert self._usernames(search='jean', role=Role.objects.get(name='Student').id, is_active='true') == ['jdupont']
+
+    def test_index_statements_cover_search_fields(self):
+        """Test that a trigram index is declared for every searched column"""
+        statements = trigram_index_statements()
+        assert statements[0] == 'CREATE EXTENSION IF NOT EXISTS pg_trgm'
+        for column in ['username', 'email', 'first_name', 'last_name']:
+            assert any(f'({column} gin_trgm_ops)' in statement for statement in statements)
@@ -0,0 +1,62 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from authentication.models import Role
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestUserStats:
+    """Test cases for the cached user statistics endpoint"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        cache.clear()
+        self.admin = User.objects.create_user(
+            username='statsadmin', password='pass12345', role=Role.objects.get(name='Administrator')
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_stats_match_the_database(self):
+        """Test that totals and the role breakdown are computed correctly"""
+        User.objects.create_user(username='statsinactive', password='pass12345', is_active=False,
+                                 role=Role.objects.get(name='Student'))
+        User.objects.create_user(username='statsnorole', password='pass12345')
+        response = self.client.get('/administrator/stats/')
+        assert response.status_code == 200
+        data = response.data
+        assert data['total_users'] == User.objects.count()
+        assert data['active_users'] == User.objects.filter(is_active=True).count()
+        assert data['inactive_users'] == User.objects.filter(is_active=False).count()
+        for role in Role.objects.all():
+            assert data['users_by_role'][role.name] == User.objects.filter(role=role).count()
+        this_week = data['signups_by_week'][-1]
+        assert this_week['total'] >= 3
+        assert this_week['by_role']['Administrator'] >= 1
+
+    def test_cached_snapshot_costs_no_query(self, django_assert_num_queries):
+        """Test that repeat loads are served from the cache"""
+        self.client.get('/administrator/stats/')
+        # Only the read of the shared database cache
+        with django_assert_num_queries(1):
+            self.client.get('/administrator/stats/')
+
+    def test_snapshot_is_invalidated_on_user_change(self):
+        """Test that saving or deleting a user refreshes the statistics"""
+        before = self.client.get('/administrator/stats/').data['total_users']
+        user = User.objects.create_user(username='statsnew', password='pass12345')
+        assert self.client.get('/administrator/stats/').data['total_users'] == before + 1
+        user.delete()
+        assert self.client.get('/administrator/stats/').data['total_users'] == before
+
+    def test_login_does_not_invalidate(self):
+        """Test that last_login updates keep the cached snapshot"""
+        first = self.client.get('/administrator/stats/').data['generated_at']
+        self.admin.last_login = timezone.now()
+        self.admin.save(update_fields=['last_login'])
+        assert self.client.get('/administrator/stats/').data['generated_at'] == first
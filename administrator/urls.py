@@ -8,15 +8,21 @@ from .views import (
     ResetUserPasswordView,
     ListRolesView,
     GetUserStatsView,
+    BulkUserActionView,
+    AuditLogView,
+    DatabaseMetricsView,
 )
 
 urlpatterns = [
     path('users/', ListUsersView.as_view(), name='list-users'),
     path('users/<int:id>/', GetUserDetailView.as_view(), name='user-detail'),
+    path('users/bulk/', BulkUserActionView.as_view(), name='bulk-users'),
     path('users/create/', CreateUserView.as_view(), name='create-user'),
     path('users/<int:id>/update/', UpdateUserView.as_view(), name='update-user'),
     path('users/<int:id>/delete/', DeleteUserView.as_view(), name='delete-user'),
     path('users/<int:id>/reset-password/', ResetUserPasswordView.as_view(), name='reset-password'),
     path('roles/', ListRolesView.as_view(), name='list-roles'),
     path('stats/', GetUserStatsView.as_view(), name='user-stats'),
+    path('audit/', AuditLogView.as_view(), name='audit-log'),
+    path('db/', DatabaseMetricsView.as_view(), name='db-metrics'),
 ]
\ No newline at end of file
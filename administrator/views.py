@@ -2,24 +2,36 @@ from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.parsers import FormParser
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from django.shortcuts import get_object_or_404
-from django.db.models import Q
+from django.http import Http404
+from django.utils import timezone
+from datetime import timedelta
 
 from authentication.models import User, Role
+from PfeManagement.conditional import ConditionalGetMixin, collection_state
+from PfeManagement.fieldsets import FIELDSET_PARAMETERS, parse_fieldset
+from PfeManagement.uploads import IMAGE_UPLOAD, LimitedMultiPartParser
+from administrator.stats import MAX_TREND_WEEKS, get_user_stats
+from administrator.search import filter_users
+from administrator.bulk import apply_bulk_action
+from administrator import audit
+from administrator.dbmetrics import database_metrics
 from administrator.Serializers import (
     UserListSerializer,
     UserDetailSerializer,
     UserCreateSerializer,
     UserUpdateSerializer,
     ChangePasswordSerializer,
-    RoleSerializer
+    RoleSerializer,
+    BulkUserActionSerializer,
+    AuditEventSerializer
 )
 
 
-class ListUsersView(APIView):
+class ListUsersView(ConditionalGetMixin, APIView):
     """List all users with filtering and search"""
     permission_classes = [IsAuthenticated]
     
@@ -34,7 +46,7 @@ class ListUsersView(APIView):
             openapi.Parameter(
                 'search',
                 openapi.IN_QUERY,
-                description="Search by username, email, or name",
+                description="Fuzzy search by username, email, or name",
                 type=openapi.TYPE_STRING
             ),
             openapi.Parameter(
@@ -42,7 +54,8 @@ class ListUsersView(APIView):
                 openapi.IN_QUERY,
                 description="Filter by active status",
                 type=openapi.TYPE_BOOLEAN
-            )
+            ),
+            *FIELDSET_PARAMETERS
         ],
         responses={
             200: UserListSerializer(many=True),
@@ -55,39 +68,30 @@ class ListUsersView(APIView):
             return Response({
                 'error': 'Only administrators can view users.'
             }, status=status.HTTP_403_FORBIDDEN)
+
+        fieldset, error = parse_fieldset(request, UserListSerializer)
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Get all users
-        users = User.objects.all().select_related('role')
-        
-        # Filter by role
-        role_id = request.query_params.get('role')
-        if role_id:
-            users = users.filter(role_id=role_id)
-        
-        # Filter by active status
-        is_active = request.query_params.get('is_active')
-        if is_active is not None:
-            is_active_bool = is_active.lower() in ['true', '1', 'yes']
-            users = users.filter(is_active=is_active_bool)
+        # Filter by role, active status and search term
+        users, search = filter_users(User.objects.all(), request.query_params)
         
-        # Search
-        search = request.query_params.get('search')
+        not_modified = self.collection_not_modified(request, *collection_state(users))
+        if not_modified:
+            return not_modified
+
+        # Best matches first when searching, then by date joined (newest first)
         if search:
-            users = users.filter(
-                Q(username__icontains=search) |
-                Q(email__icontains=search) |
-                Q(first_name__icontains=search) |
-                Q(last_name__icontains=search)
-            )
-        
-        # Order by date joined (newest first)
-        users = users.order_by('-date_joined')
+            users = users.order_by('-search_rank', '-date_joined')
+        else:
+            users = users.order_by('-date_joined')
         
-        serializer = UserListSerializer(users, many=True)
+        # Only the columns and joins the requested fields need
+        serializer = UserListSerializer(fieldset.apply(users), many=True, fieldset=fieldset)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class GetUserDetailView(APIView):
+class GetUserDetailView(ConditionalGetMixin, APIView):
     """Get detailed information about a specific user"""
     permission_classes = [IsAuthenticated]
     
@@ -113,7 +117,14 @@ class GetUserDetailView(APIView):
                 'error': 'Only administrators can view user details.'
             }, status=status.HTTP_403_FORBIDDEN)
         
-        user = get_object_or_404(User, id=id)
+        state = User.objects.filter(id=id).values('updated_at', 'last_login').first()
+        if state is None:
+            raise Http404
+        not_modified = self.not_modified(request, state['updated_at'], state['last_login'])
+        if not_modified:
+            return not_modified
+
+        user = User.objects.select_related('role').get(id=id)
         serializer = UserDetailSerializer(user)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -121,7 +132,8 @@ class GetUserDetailView(APIView):
 class CreateUserView(APIView):
     """Create a new user"""
     permission_classes = [IsAuthenticated]
-    parser_classes = [MultiPartParser, FormParser]
+    parser_classes = [LimitedMultiPartParser, FormParser]
+    upload_limits = {'profile_picture': IMAGE_UPLOAD}
     
     @swagger_auto_schema(
         request_body=UserCreateSerializer,
@@ -141,6 +153,7 @@ class CreateUserView(APIView):
         serializer = UserCreateSerializer(data=request.data)
         if serializer.is_valid():
             user = serializer.save()
+            audit.record(request, 'user.create', user, role=user.role_id)
             detail_serializer = UserDetailSerializer(user)
             return Response({
                 'message': 'User created successfully.',
@@ -153,7 +166,8 @@ class CreateUserView(APIView):
 class UpdateUserView(APIView):
     """Update an existing user"""
     permission_classes = [IsAuthenticated]
-    parser_classes = [MultiPartParser, FormParser]
+    parser_classes = [LimitedMultiPartParser, FormParser]
+    upload_limits = {'profile_picture': IMAGE_UPLOAD}
     
     @swagger_auto_schema(
         manual_parameters=[
@@ -188,9 +202,10 @@ class UpdateUserView(APIView):
                     'error': 'You cannot deactivate your own account.'
                 }, status=status.HTTP_400_BAD_REQUEST)
         
-        serializer = UserUpdateSerializer(user, data=request.data, partial=True)
+        serializer = UserUpdateSerializer(user, data=request.data, partial=True, context={'request': request})
         if serializer.is_valid():
             serializer.save()
+            audit.record(request, 'user.update', user, fields=sorted(serializer.validated_data))
             detail_serializer = UserDetailSerializer(user)
             return Response({
                 'message': 'User updated successfully.',
@@ -238,6 +253,7 @@ class DeleteUserView(APIView):
         # Soft delete by deactivating
         user.is_active = False
         user.save()
+        audit.record(request, 'user.deactivate', user)
         
         return Response({
             'message': 'User deleted successfully.'
@@ -278,6 +294,7 @@ class ResetUserPasswordView(APIView):
         if serializer.is_valid():
             user.set_password(serializer.validated_data['new_password'])
             user.save()
+            audit.record(request, 'user.reset_password', user)
             
             return Response({
                 'message': 'Password reset successfully.'
@@ -286,6 +303,46 @@ class ResetUserPasswordView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class BulkUserActionView(APIView):
+    """Deactivate, reactivate or change the role of many users at once"""
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        request_body=BulkUserActionSerializer,
+        responses={
+            200: 'Per-user results',
+            400: 'Bad Request',
+            403: 'Forbidden'
+        }
+    )
+    def post(self, request):
+        # Check if user is an administrator
+        if not request.user.role or request.user.role.name != 'Administrator':
+            return Response({
+                'error': 'Only administrators can update users.'
+            }, status=status.HTTP_403_FORBIDDEN)
+
+        serializer = BulkUserActionSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        data = serializer.validated_data
+        results, updated = apply_bulk_action(
+            request.user, data['action'],
+            ids=data.get('ids'), filters=data.get('filters'), role=data.get('role')
+        )
+        audit.record_many(
+            request, f"user.bulk_{data['action']}", User._meta.label_lower,
+            [result['id'] for result in results if result['status'] == 'updated'],
+            **({'role': data['role'].id} if 'role' in data else {})
+        )
+        return Response({
+            'message': f'{updated} user(s) updated.',
+            'updated': updated,
+            'results': results
+        }, status=status.HTTP_200_OK)
+
+
 class ListRolesView(APIView):
     """List all available roles"""
     permission_classes = [IsAuthenticated]
@@ -313,6 +370,14 @@ class GetUserStatsView(APIView):
     permission_classes = [IsAuthenticated]
     
     @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter(
+                'weeks',
+                openapi.IN_QUERY,
+                description=f"Number of weeks of signup trends (default 12, max {MAX_TREND_WEEKS})",
+                type=openapi.TYPE_INTEGER
+            )
+        ],
         responses={
             200: openapi.Response(
                 description="User statistics",
@@ -325,10 +390,19 @@ class GetUserStatsView(APIView):
                             "Student": 70,
                             "Teacher": 25,
                             "Administrator": 5
-                        }
+                        },
+                        "signups_by_week": [
+                            {
+                                "week": "2025-09-01",
+                                "total": 12,
+                                "by_role": {"Student": 11, "Teacher": 1}
+                            }
+                        ],
+                        "generated_at": "2025-09-03T10:00:00+00:00"
                     }
                 }
             ),
+            400: 'Bad Request',
             403: 'Forbidden'
         }
     )
@@ -338,23 +412,86 @@ class GetUserStatsView(APIView):
             return Response({
                 'error': 'Only administrators can view statistics.'
             }, status=status.HTTP_403_FORBIDDEN)
+
+        try:
+            weeks = int(request.query_params.get('weeks', 12))
+        except (TypeError, ValueError):
+            return Response({
+                'error': 'weeks must be an integer.'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        weeks = max(1, min(weeks, MAX_TREND_WEEKS))
+
+        # One cache read per load; the snapshot is rebuilt when users change
+        stats = dict(get_user_stats())
+        cutoff = (timezone.now() - timedelta(weeks=weeks)).date().isoformat()
+        stats['signups_by_week'] = [
+            week for week in stats['signups_by_week'] if week['week'] >= cutoff
+        ]
         
-        total_users = User.objects.count()
-        active_users = User.objects.filter(is_active=True).count()
-        inactive_users = User.objects.filter(is_active=False).count()
-        
-        # Users by role
-        users_by_role = {}
-        roles = Role.objects.all()
-        for role in roles:
-            count = User.objects.filter(role=role).count()
-            users_by_role[role.name] = count
-        
-        stats = {
-            'total_users': total_users,
-            'active_users': active_users,
-            'inactive_users': inactive_users,
-            'users_by_role': users_by_role
+        return Response(stats, status=status.HTTP_200_OK)
+
+
+class AuditLogView(APIView):
+    """Query the audit log of administrator actions"""
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter('actor', openapi.IN_QUERY, description="Actor user ID", type=openapi.TYPE_INTEGER),
+            openapi.Parameter('action', openapi.IN_QUERY, description="Action, e.g. user.deactivate", type=openapi.TYPE_STRING),
+            openapi.Parameter('target_type', openapi.IN_QUERY, description="Target model, e.g. internship.internship", type=openapi.TYPE_STRING),
+            openapi.Parameter('target_id', openapi.IN_QUERY, description="Target ID", type=openapi.TYPE_STRING),
+            openapi.Parameter('since', openapi.IN_QUERY, description="Earliest time (ISO 8601)", type=openapi.TYPE_STRING),
+            openapi.Parameter('until', openapi.IN_QUERY, description="Latest time, exclusive (ISO 8601)", type=openapi.TYPE_STRING),
+            openapi.Parameter('page_size', openapi.IN_QUERY, description="Events per page (max 200)", type=openapi.TYPE_INTEGER),
+            openapi.Parameter('cursor', openapi.IN_QUERY, description="next_cursor of the previous page", type=openapi.TYPE_STRING),
+        ],
+        responses={
+            200: AuditEventSerializer(many=True),
+            400: 'Bad Request',
+            403: 'Forbidden'
         }
-        
-        return Response(stats, status=status.HTTP_200_OK)
\ No newline at end of file
+    )
+    def get(self, request):
+        # Check if user is an administrator
+        if not request.user.role or request.user.role.name != 'Administrator':
+            return Response({
+                'error': 'Only administrators can view the audit log.'
+            }, status=status.HTTP_403_FORBIDDEN)
+
+        events, error = audit.filter_events(request.query_params)
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            page_size = min(max(int(request.query_params.get('page_size', 50)), 1), 200)
+        except ValueError:
+            return Response({'error': 'page_size must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        # One extra row tells whether another page follows
+        page = list(events[:page_size + 1])
+        next_cursor = audit.encode_cursor(page[page_size - 1]) if len(page) > page_size else None
+        return Response({
+            'results': AuditEventSerializer(page[:page_size], many=True).data,
+            'next_cursor': next_cursor
+        }, status=status.HTTP_200_OK)
+
+
+class DatabaseMetricsView(APIView):
+    """Connection and pool metrics of the server process answering the request"""
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        responses={
+            200: 'Per-database connection metrics of this process',
+            403: 'Forbidden'
+        }
+    )
+    def get(self, request):
+        # Check if user is an administrator
+        if not request.user.role or request.user.role.name != 'Administrator':
+            return Response({
+                'error': 'Only administrators can view database metrics.'
+            }, status=status.HTTP_403_FORBIDDEN)
+
+        return Response(database_metrics(), status=status.HTTP_200_OK)
@@ -0,0 +1,57 @@
+"""
+Personal data export.
+
+An account's data is everything an account purge would delete: the user
+row and the rows of every relation in PURGE_STEPS, written as JSON files,
+plus the files the user uploaded. The audit trail of the user's own actions,
+which the purge keeps, is exported as well since it records their IP
+addresses. personal_data_entries() yields them as
+archive entries for PfeManagement.zipstream.stream_zip; JSON is encoded row
+by row, so large histories are never held in memory.
+"""
+import json
+import posixpath
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from PfeManagement.zipstream import file_chunks
+from .purge import PURGE_STEPS
+
+PROFILE_EXCLUDED_FIELDS = {'password'}
+
+# Relations whose files the user uploaded, with the file field to export
+FILE_RELATIONS = {
+    'internships': 'cahier_de_charges',
+    'reports': 'file_path',
+}
+
+# Relations kept by the purge (their actor is set to NULL) but still about the user
+RETAINED_RELATIONS = ['audit_events']
+
+ROW_CHUNK_SIZE = 500
+
+
+def _json_array(rows):
+    yield b'['
+    for index, row in enumerate(rows):
+        yield (b',\n' if index else b'\n') + json.dumps(row, cls=DjangoJSONEncoder).encode()
+    yield b'\n]\n'
+
+
+def personal_data_entries(user):
+    """Yield (name, chunks) archive entries with all the data of `user`"""
+    fields = [field.attname for field in user._meta.concrete_fields if field.name not in PROFILE_EXCLUDED_FIELDS]
+    profile = type(user).objects.filter(pk=user.pk).values(*fields).get()
+    yield 'data/profile.json', [json.dumps(profile, cls=DjangoJSONEncoder, indent=2).encode()]
+
+    for relation in PURGE_STEPS + RETAINED_RELATIONS:
+        rows = getattr(user, relation).order_by('pk').values()
+        yield f'data/{relation}.json', _json_array(rows.iterator(chunk_size=ROW_CHUNK_SIZE))
+
+    if user.profile_picture:
+        yield f'files/profile/{posixpath.basename(user.profile_picture.name)}', file_chunks(user.profile_picture)
+    for relation, field_name in FILE_RELATIONS.items():
+        objects = getattr(user, relation).exclude(**{field_name: ''}).only('id', field_name).order_by('pk')
+        for obj in objects.iterator(chunk_size=ROW_CHUNK_SIZE):
+            field_file = getattr(obj, field_name)
+            yield f'files/{relation}/{obj.id}-{posixpath.basename(field_file.name)}', file_chunks(field_file)
@@ -0,0 +1,64 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import django
+from django.core.management.base import BaseCommand
+from PIL import Image
+
+from authentication.models import User
+from authentication.thumbnails import render_variants, stale_variant_user_ids, store_variants
+
+
+class Command(BaseCommand):
+    help = 'Render missing profile picture variants with a pool of worker processes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help='Re-render the variants of every profile picture')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Number of worker processes (default: one per CPU)')
+
+    def handle(self, *args, **options):
+        if options['all']:
+            users = User.objects.exclude(profile_picture='').exclude(profile_picture__isnull=True)
+            user_ids = list(users.values_list('id', flat=True))
+        else:
+            user_ids = stale_variant_user_ids()
+        workers = max(options['workers'], 1)
+        self.counts = {'rendered': 0, 'failed': 0, 'missing': 0}
+
+        # Workers only decode and resize; files and rows are read and written here
+        with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as pool:
+            pending = {}
+            for user_id in user_ids:
+                user = User.objects.filter(id=user_id).only('profile_picture').first()
+                if user is None or not user.profile_picture:
+                    continue
+                try:
+                    with user.profile_picture.open('rb') as handle:
+                        data = handle.read()
+                except FileNotFoundError:
+                    self.counts['missing'] += 1
+                    continue
+                pending[pool.submit(render_variants, data)] = (user.id, user.profile_picture.name)
+                # Bound the images held in memory at once
+                if len(pending) >= workers * 2:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self._store(future, *pending.pop(future))
+            for future in list(pending):
+                self._store(future, *pending.pop(future))
+
+        self.stdout.write(
+            f"Rendered variants for {self.counts['rendered']} user(s); "
+            f"{self.counts['failed']} unreadable, {self.counts['missing']} missing"
+        )
+
+    def _store(self, future, user_id, source):
+        try:
+            rendered = future.result()
+        except (OSError, Image.DecompressionBombError):
+            self.counts['failed'] += 1
+            return
+        if store_variants(user_id, source, rendered):
+            self.counts['rendered'] += 1
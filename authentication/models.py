@@ -13,7 +13,13 @@ class Role(models.Model):
 class User(AbstractUser):
     phone= models.CharField(max_length=15, blank=True, null=True)
     profile_picture = models.ImageField(upload_to='profile_pics/', blank=True, null=True)
+    # Resized copies of profile_picture, see authentication/thumbnails.py
+    profile_picture_variants = models.JSONField(default=dict, blank=True)
     role = models.ForeignKey(Role, on_delete=models.SET_NULL, null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True, null=True)
+    # Set when the user deletes their account; the account is removed in the background
+    # and cannot be reactivated meanwhile
+    pending_purge_at = models.DateTimeField(null=True, blank=True)
 
     def __str__(self):
         return self.username
@@ -24,4 +30,31 @@ class User(AbstractUser):
         token['email'] = self.email
         token['role_id'] = self.role.id
         token['role_name'] = self.role.name
-        return token
\ No newline at end of file
+        return token
+
+
+class AccountPurge(models.Model):
+    """Progress of the background removal of a deleted account"""
+    STATUS_CHOICES = [
+        (0, 'Pending'),
+        (1, 'Running'),
+        (2, 'Completed'),
+        # The account was reactivated before the purge reached it
+        (3, 'Cancelled'),
+    ]
+    # Plain id: the user row is the last thing the purge deletes
+    user_id = models.BigIntegerField(db_index=True)
+    username = models.CharField(max_length=150)
+    status = models.IntegerField(choices=STATUS_CHOICES, default=0)
+    current_step = models.CharField(max_length=50, blank=True)
+    deleted_objects = models.PositiveIntegerField(default=0)
+    deleted_files = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Purge of {self.username} ({self.get_status_display()})"
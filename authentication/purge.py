@@ -0,0 +1,144 @@
+"""
+Background removal of self-deleted accounts.
+
+Deleting an account only deactivates it and queues a purge. The purge job
+deletes the user's dependents relation by relation in batches of
+ACCOUNT_PURGE_BATCH_SIZE rows, each batch in its own short transaction, and
+removes their uploaded files once that transaction has committed. After
+ACCOUNT_PURGE_BATCHES_PER_JOB batches it queues a continuation, so one large
+account never holds a worker or a lock for long. The user row goes last.
+
+Reactivation is refused while pending_purge_at is set; should the account be
+active again anyway, the purge stops before its next step and is marked
+cancelled.
+"""
+import logging
+
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from jobs.queue import enqueue
+from .models import AccountPurge, User
+from .thumbnails import variant_names
+
+logger = logging.getLogger(__name__)
+
+# Reverse relations of User, in deletion order; each cascades to rows owned by the deleted objects
+PURGE_STEPS = [
+    'received_invitations',
+    'sent_invitations',
+    'jury_memberships',
+    'assigned_internships',
+    'internships',
+    'reports',
+]
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def request_purge(user):
+    """Deactivate the account and queue its purge; returns the AccountPurge"""
+    with transaction.atomic():
+        User.objects.filter(id=user.id).update(
+            is_active=False, pending_purge_at=timezone.now(), updated_at=timezone.now()
+        )
+        purge = AccountPurge.objects.create(user_id=user.id, username=user.username)
+        enqueue('authentication.purge_account', {'purge_id': purge.id})
+    return purge
+
+
+def _file_names(objects):
+    names = []
+    for obj in objects:
+        for field in obj._meta.concrete_fields:
+            if isinstance(field, models.FileField):
+                value = getattr(obj, field.attname)
+                if value:
+                    names.append((field, value.name))
+        if isinstance(obj, User):
+            # Resized copies of the profile picture go with it
+            picture_field = obj._meta.get_field('profile_picture')
+            names.extend((picture_field, name) for name in variant_names(obj))
+    return names
+
+
+def _delete_files(files):
+    deleted = 0
+    for field, name in files:
+        try:
+            field.storage.delete(name)
+            deleted += 1
+        except OSError:
+            logger.warning("Could not delete purged file %s", name, exc_info=True)
+    return deleted
+
+
+def _delete_batch(purge, queryset):
+    """Delete one batch of a queryset and its files; returns the number of rows deleted"""
+    batch_size = _setting('ACCOUNT_PURGE_BATCH_SIZE', 200)
+    with transaction.atomic():
+        batch = list(queryset.order_by('pk')[:batch_size])
+        if not batch:
+            return 0
+        files = _file_names(batch)
+        deleted, _ = queryset.model.objects.filter(pk__in=[obj.pk for obj in batch]).delete()
+        AccountPurge.objects.filter(id=purge.id).update(
+            deleted_objects=F('deleted_objects') + deleted, updated_at=timezone.now()
+        )
+
+    # Files go once their rows are gone for good; a failure here only leaves an orphan
+    removed = _delete_files(files)
+    if removed:
+        AccountPurge.objects.filter(id=purge.id).update(deleted_files=F('deleted_files') + removed)
+    return deleted
+
+
+PURGE_REACTIVATED_ERROR = 'This account is being deleted and cannot be reactivated.'
+
+
+def _cancel_if_reactivated(purge):
+    """Stop a purge whose user is active again; True when it was cancelled"""
+    if not User.objects.filter(id=purge.user_id, is_active=True).exists():
+        return False
+    with transaction.atomic():
+        AccountPurge.objects.filter(id=purge.id).update(status=3, current_step='', updated_at=timezone.now())
+        User.objects.filter(id=purge.user_id).update(pending_purge_at=None, updated_at=timezone.now())
+    logger.warning("Purge %s cancelled: user %s was reactivated", purge.id, purge.user_id)
+    return True
+
+
+def run_purge(purge_id):
+    """Advance a purge by at most ACCOUNT_PURGE_BATCHES_PER_JOB batches; True once it is complete"""
+    purge = AccountPurge.objects.filter(id=purge_id).first()
+    if purge is None or purge.status in (2, 3):
+        return True
+    AccountPurge.objects.filter(id=purge.id).update(status=1, updated_at=timezone.now())
+
+    user = User.objects.filter(id=purge.user_id).first()
+    budget = _setting('ACCOUNT_PURGE_BATCHES_PER_JOB', 20)
+    if user is not None:
+        for step in PURGE_STEPS:
+            if _cancel_if_reactivated(purge):
+                return True
+            AccountPurge.objects.filter(id=purge.id).update(current_step=step)
+            queryset = getattr(user, step).all()
+            while _delete_batch(purge, queryset):
+                budget -= 1
+                if budget <= 0:
+                    # Out of batches for this run; carry on in a fresh job
+                    enqueue('authentication.purge_account', {'purge_id': purge.id})
+                    return False
+
+        if _cancel_if_reactivated(purge):
+            return True
+        AccountPurge.objects.filter(id=purge.id).update(current_step='user')
+        _delete_batch(purge, User.objects.filter(id=user.id))
+
+    AccountPurge.objects.filter(id=purge.id).update(
+        status=2, current_step='', completed_at=timezone.now(), updated_at=timezone.now()
+    )
+    return True
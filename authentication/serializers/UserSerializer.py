@@ -1,6 +1,9 @@
 from rest_framework import serializers
 from authentication.models import User, Role
+from PfeManagement.directuploads import DirectUploadImageField
 class UserSerializer(serializers.ModelSerializer):
+    profile_picture = DirectUploadImageField(upload_target='profile_picture', required=False, allow_null=True)
+
     class Meta:
         model = User
         fields = ['id', 'username', 'email', 'password', 'role', 'first_name', 'last_name', 'phone','profile_picture']
@@ -1,6 +1,8 @@
-from django.db.models.signals import post_migrate
+from django.db import transaction
+from django.db.models.signals import post_init, post_migrate, post_save
 from django.dispatch import receiver
 from authentication.models import Role, User
+from jobs.queue import enqueue
 from faker import Faker
 import random
 fake = Faker()
@@ -48,4 +50,23 @@ def create_fake_users(sender, **kwargs):
             user.set_password("12345678")
             user.save()
 
-        print("Created 20 fake users!")
\ No newline at end of file
+        print("Created 20 fake users!")
+
+
+@receiver(post_init, sender=User)
+def remember_loaded_picture(sender, instance, **kwargs):
+    instance._loaded_picture = instance.__dict__.get('profile_picture')
+
+
+@receiver(post_save, sender=User)
+def render_picture_variants(sender, instance, created, **kwargs):
+    # Variants are rendered in a worker; only a new, replaced or removed picture needs it
+    if 'profile_picture' not in instance.__dict__:
+        return
+    picture = instance.profile_picture.name or ''
+    # A new row's picture came from its constructor, not the database
+    loaded = '' if created else str(instance._loaded_picture or '')
+    if picture != loaded:
+        if picture or instance.profile_picture_variants:
+            transaction.on_commit(lambda: enqueue('authentication.profile_picture_variants', {'user_id': instance.id}))
+    instance._loaded_picture = picture
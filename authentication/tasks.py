@@ -0,0 +1,15 @@
+from jobs.queue import task
+from .purge import run_purge
+from .thumbnails import generate_variants
+
+
+@task('authentication.purge_account')
+def purge_account(purge_id):
+    """Delete a self-deleted account and its dependents in bounded batches"""
+    run_purge(purge_id)
+
+
+@task('authentication.profile_picture_variants')
+def profile_picture_variants(user_id, force=False):
+    """Render the resized variants of a user's profile picture"""
+    generate_variants(user_id, force=force)
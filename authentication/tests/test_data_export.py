@@ -0,0 +1,62 @@
+import io
+import json
+import zipfile
+from datetime import date
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from rest_framework.test import APIClient
+
+from administrator.models import AuditEvent
+from authentication.models import Role
+from internship.models import Internship
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestPersonalDataExport:
+    """Test cases for the personal data export archive"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, settings, tmp_path):
+        settings.MEDIA_ROOT = str(tmp_path)
+        self.student = User.objects.create_user(
+            username='exportstudent', password='pass12345', email='export@example.com',
+            role=Role.objects.get(name='Student')
+        )
+        self.internship = Internship.objects.create(
+            student_id=self.student, type='PFE', company_name='Acme', title='Exported',
+            cahier_de_charges=default_storage.save('cahiers_de_charges/mine.pdf', ContentFile(b'%PDF-1.4 mine')),
+            start_date=date(2025, 2, 1), end_date=date(2025, 6, 30)
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def test_export_contains_rows_and_files(self):
+        """Test that the archive holds the user's rows as JSON and their uploads, but no password"""
+        response = self.client.get('/auth/profile/export/')
+        assert response.status_code == 200
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+
+        profile = json.loads(archive.read('data/profile.json'))
+        assert profile['email'] == 'export@example.com'
+        assert 'password' not in profile
+        internships = json.loads(archive.read('data/internships.json'))
+        assert [row['title'] for row in internships] == ['Exported']
+        assert json.loads(archive.read('data/reports.json')) == []
+        assert archive.read(f'files/internships/{self.internship.id}-mine.pdf') == b'%PDF-1.4 mine'
+
+    def test_export_contains_the_users_audit_trail(self):
+        """Test that the user's own audited actions, with their IP address, are exported"""
+        AuditEvent.objects.create(
+            actor=self.student, actor_username='exportstudent', action='internship.create',
+            target_type='internship', target_id=str(self.internship.id), ip_address='203.0.113.7'
+        )
+        AuditEvent.objects.create(actor_username='someone', action='user.update', target_type='user', target_id='1')
+        response = self.client.get('/auth/profile/export/')
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        events = json.loads(archive.read('data/audit_events.json'))
+        assert [(event['action'], event['ip_address']) for event in events] == [('internship.create', '203.0.113.7')]
@@ -0,0 +1,100 @@
+from datetime import date
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from rest_framework.test import APIClient
+
+from authentication.models import AccountPurge, Role
+from internship.models import Internship, TeacherInvitation
+from jobs.models import Job
+from jobs.queue import run_pending
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestAccountPurge:
+    """Test cases for self-service account deletion"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, settings, tmp_path):
+        settings.MEDIA_ROOT = str(tmp_path)
+        self.teacher = User.objects.create_user(
+            username='purgeteacher', password='pass12345', role=Role.objects.get(name='Teacher')
+        )
+        self.student = User.objects.create_user(
+            username='purgestudent', password='pass12345', role=Role.objects.get(name='Student')
+        )
+        self.files = []
+        for i in range(5):
+            name = default_storage.save(f'cahiers_de_charges/purge{i}.pdf', ContentFile(b'%PDF-1.4'))
+            self.files.append(name)
+            internship = Internship.objects.create(
+                student_id=self.student, type='PFE', company_name='Acme', cahier_de_charges=name,
+                start_date=date(2025, 2, 1), end_date=date(2025, 6, 30), title=f'Purge {i}'
+            )
+            TeacherInvitation.objects.create(internship=internship, student=self.student, teacher=self.teacher)
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def test_delete_returns_immediately_and_deactivates(self):
+        """Test that deleting an account only marks it and queues the purge"""
+        response = self.client.delete('/auth/profile/delete/')
+        assert response.status_code == 202
+        self.student.refresh_from_db()
+        assert not self.student.is_active
+        assert self.student.pending_purge_at is not None
+        assert Internship.objects.filter(student_id=self.student).count() == 5
+        assert Job.objects.filter(task='authentication.purge_account').count() == 1
+
+    def test_purge_runs_in_bounded_batches(self, settings):
+        """Test that the purge removes dependents and files across several jobs"""
+        settings.ACCOUNT_PURGE_BATCH_SIZE = 2
+        settings.ACCOUNT_PURGE_BATCHES_PER_JOB = 2
+        purge_id = self.client.delete('/auth/profile/delete/').data['purge_id']
+
+        run_pending()
+
+        purge = AccountPurge.objects.get(id=purge_id)
+        assert purge.status == 2
+        assert purge.completed_at is not None
+        assert not User.objects.filter(id=self.student.id).exists()
+        assert not Internship.objects.exists()
+        assert not TeacherInvitation.objects.exists()
+        assert purge.deleted_files == 5
+        assert not any(default_storage.exists(name) for name in self.files)
+        # The teacher is untouched
+        assert User.objects.filter(id=self.teacher.id, is_active=True).exists()
+
+    def test_accounts_being_purged_cannot_be_reactivated(self):
+        """Test that administrators cannot reactivate an account whose purge is queued"""
+        self.client.delete('/auth/profile/delete/')
+        admin = User.objects.create_user(
+            username='purgeadmin', password='pass12345', role=Role.objects.get(name='Administrator')
+        )
+        self.client.force_authenticate(admin)
+
+        response = self.client.patch(f'/administrator/users/{self.student.id}/update/', {'is_active': True}, format='multipart')
+        assert response.status_code == 400
+        assert 'is_active' in response.data
+        response = self.client.post('/administrator/users/bulk/', {
+            'action': 'reactivate', 'ids': [self.student.id]
+        }, format='json')
+        assert response.data['results'] == [
+            {'id': self.student.id, 'status': 'error', 'error': 'This account is being deleted and cannot be reactivated.'}
+        ]
+        assert not User.objects.get(id=self.student.id).is_active
+
+    def test_purge_stops_when_the_account_is_active_again(self):
+        """Test that a purge finding its user reactivated is cancelled and deletes nothing"""
+        purge_id = self.client.delete('/auth/profile/delete/').data['purge_id']
+        User.objects.filter(id=self.student.id).update(is_active=True)
+
+        run_pending()
+
+        assert AccountPurge.objects.get(id=purge_id).status == 3
+        self.student.refresh_from_db()
+        assert self.student.pending_purge_at is None
+        assert Internship.objects.filter(student_id=self.student).count() == 5
@@ -0,0 +1,114 @@
+import io
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from PIL import Image
+from rest_framework.test import APIClient
+
+from authentication.models import Role
+from jobs.queue import run_pending
+
+User = get_user_model()
+
+
+def photo(width=400, height=200):
+    """Landscape JPEG, red left half and blue right half, stored rotated with an EXIF orientation"""
+    image = Image.new('RGB', (width, height), 'blue')
+    image.paste('red', (0, 0, width // 2, height))
+    exif = Image.Exif()
+    exif[0x0112] = 6  # Orientation: rotate 90 degrees clockwise to display
+    exif[0x010F] = 'PhoneMaker'  # Make
+    output = io.BytesIO()
+    image.save(output, 'JPEG', exif=exif)
+    return output.getvalue()
+
+
+@pytest.mark.django_db
+class TestProfilePictureVariants:
+    """Test cases for the profile picture thumbnail pipeline"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, settings, tmp_path, django_capture_on_commit_callbacks):
+        settings.MEDIA_ROOT = str(tmp_path)
+        self.capture_on_commit = django_capture_on_commit_callbacks
+        self.teacher = User.objects.create_user(
+            username='picteacher', password='pass12345', role=Role.objects.get(name='Teacher')
+        )
+        self.student = User.objects.create_user(
+            username='picstudent', password='pass12345', role=Role.objects.get(name='Student')
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def _set_picture(self, user, data):
+        with self.capture_on_commit(execute=True):
+            user.profile_picture.save('me.jpg', ContentFile(data))
+
+    def test_variants_are_rendered_off_the_request(self):
+        """Test that an upload queues a job storing oriented, metadata-free square variants"""
+        self._set_picture(self.teacher, photo())
+        self.teacher.refresh_from_db()
+        assert self.teacher.profile_picture_variants == {}
+
+        run_pending()
+        self.teacher.refresh_from_db()
+        variants = self.teacher.profile_picture_variants
+        assert variants['source'] == self.teacher.profile_picture.name
+        with default_storage.open(variants['thumb']) as handle:
+            thumb = Image.open(handle)
+            thumb.load()
+        assert thumb.size == (96, 96)
+        assert len(thumb.getexif()) == 0
+        # Rotated upright, the red half of the photo is on top
+        top, bottom = thumb.convert('RGB').getpixel((48, 5)), thumb.convert('RGB').getpixel((48, 90))
+        assert top[0] > 200 and top[2] < 60
+        assert bottom[2] > 200 and bottom[0] < 60
+
+    def test_serializers_return_the_endpoint_variant(self):
+        """Test that the teacher picker gets the thumbnail, and the original until it exists"""
+        self._set_picture(self.teacher, photo())
+        response = self.client.get('/internship/teachers/')
+        assert response.data[0]['profile_picture'].endswith(self.teacher.profile_picture.name)
+
+        run_pending()
+        self.teacher.refresh_from_db()
+        response = self.client.get('/internship/teachers/')
+        assert response.data[0]['profile_picture'].endswith(self.teacher.profile_picture_variants['thumb'])
+
+    def test_replaced_picture_drops_old_variants(self):
+        """Test that variants follow the current picture and old ones are deleted"""
+        self._set_picture(self.teacher, photo())
+        run_pending()
+        self.teacher.refresh_from_db()
+        old_thumb = self.teacher.profile_picture_variants['thumb']
+
+        self._set_picture(self.teacher, photo(300, 300))
+        run_pending()
+        self.teacher.refresh_from_db()
+        assert self.teacher.profile_picture_variants['source'] == self.teacher.profile_picture.name
+        assert not default_storage.exists(old_thumb)
+
+    def test_users_created_with_a_picture_get_variants(self):
+        """Test that a picture set in the constructor queues the variants job"""
+        name = default_storage.save('profile_pics/new.jpg', ContentFile(photo()))
+        with self.capture_on_commit(execute=True):
+            user = User.objects.create_user(
+                username='picnew', password='pass12345', role=Role.objects.get(name='Student'), profile_picture=name
+            )
+        run_pending()
+        user.refresh_from_db()
+        assert user.profile_picture_variants['source'] == name
+
+    def test_backfill_renders_existing_pictures(self):
+        """Test that the backfill command renders pictures that predate the pipeline"""
+        name = default_storage.save('profile_pics/old.jpg', ContentFile(photo()))
+        User.objects.filter(id=self.teacher.id).update(profile_picture=name)
+
+        out = io.StringIO()
+        call_command('backfill_profile_variants', '--workers', '2', stdout=out)
+        assert 'Rendered variants for 1 user(s)' in out.getvalue()
+        self.teacher.refresh_from_db()
+        assert set(self.teacher.profile_picture_variants) == {'source', 'thumb', 'small', 'medium'}
@@ -0,0 +1,24 @@
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestGetUserView:
+    """Test cases for the current user endpoint"""
+
+    def test_get_user_supports_conditional_get(self):
+        """Test that an unchanged profile is answered with 304"""
+        user = User.objects.create_user(username='etaguser', password='pass12345')
+        client = APIClient()
+        client.force_authenticate(user)
+        etag = client.get('/auth/get-user/')['ETag']
+        assert client.get('/auth/get-user/', HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+        user.first_name = 'Changed'
+        user.save()
+        client.force_authenticate(User.objects.get(id=user.id))
+        response = client.get('/auth/get-user/', HTTP_IF_NONE_MATCH=etag)
+        assert response.data['first_name'] == 'Changed'
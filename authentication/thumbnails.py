@@ -0,0 +1,155 @@
+"""
+Profile picture variants.
+
+Uploading a profile picture queues a job that renders square variants of it
+with Pillow: EXIF orientation applied, metadata dropped, saved as WebP (JPEG
+where Pillow lacks WebP support). Their storage names are kept in
+User.profile_picture_variants together with the name of the picture they
+were made from, so a replaced picture is never served through stale
+variants. Serializers use ProfilePictureField to return the variant sized
+for their endpoint, falling back to the original until the job has run.
+"""
+import io
+import posixpath
+
+from django.core.files.base import ContentFile
+from django.utils import timezone
+from PIL import Image, ImageOps, features
+from rest_framework import serializers
+
+from .models import User
+
+# Variant name -> edge length in pixels
+PROFILE_PICTURE_VARIANTS = {
+    'thumb': 96,
+    'small': 192,
+    'medium': 512,
+}
+
+VARIANT_DIRECTORY = 'profile_pics/variants'
+QUALITY = 80
+
+
+def _output_format():
+    return ('WEBP', 'webp') if features.check('webp') else ('JPEG', 'jpg')
+
+
+def render_variants(data):
+    """
+    Render every variant of an image given as bytes; returns {name: (bytes, extension)}.
+    Pure computation, so it can run in a worker process.
+    """
+    image_format, extension = _output_format()
+    with Image.open(io.BytesIO(data)) as image:
+        # JPEG decoders can scale down while decoding, which makes large photos cheap
+        largest = max(PROFILE_PICTURE_VARIANTS.values())
+        image.draft('RGB', (largest, largest))
+        image = ImageOps.exif_transpose(image)
+        has_alpha = image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info
+        # Transparency is kept in WebP only
+        image = image.convert('RGBA' if has_alpha and image_format == 'WEBP' else 'RGB')
+
+        rendered = {}
+        for name, size in PROFILE_PICTURE_VARIANTS.items():
+            variant = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+            output = io.BytesIO()
+            # A fresh image carries no EXIF, GPS or ICC data over from the upload
+            variant.save(output, image_format, quality=QUALITY)
+            rendered[name] = (output.getvalue(), extension)
+    return rendered
+
+
+def _names(variants):
+    return [name for key, name in (variants or {}).items() if key != 'source']
+
+
+def variant_names(user):
+    """Storage names of the stored variants of a user's picture"""
+    return _names(user.profile_picture_variants)
+
+
+def store_variants(user_id, source, rendered):
+    """
+    Save rendered variants of the picture named `source` and record them on
+    the user, unless the picture changed meanwhile. Returns True when stored.
+    """
+    storage = User._meta.get_field('profile_picture').storage
+    stem = posixpath.splitext(posixpath.basename(source))[0]
+    variants = {'source': source}
+    for name, (data, extension) in rendered.items():
+        variants[name] = storage.save(f'{VARIANT_DIRECTORY}/{user_id}/{stem}-{name}.{extension}', ContentFile(data))
+
+    previous = User.objects.filter(id=user_id).values_list('profile_picture_variants', flat=True).first()
+    # Conditional on the source: a newer upload has its own job coming
+    stored = User.objects.filter(id=user_id, profile_picture=source).update(
+        profile_picture_variants=variants, updated_at=timezone.now()
+    )
+    for name in _names(previous if stored else variants):
+        storage.delete(name)
+    return bool(stored)
+
+
+def generate_variants(user_id, force=False):
+    """Render and store the variants of a user's current picture; False when there was nothing to do"""
+    user = User.objects.filter(id=user_id).only('profile_picture', 'profile_picture_variants').first()
+    if user is None:
+        return False
+    if not user.profile_picture:
+        if user.profile_picture_variants:
+            clear_variants(user)
+        return False
+    if user.profile_picture_variants.get('source') == user.profile_picture.name and not force:
+        return False
+
+    with user.profile_picture.open('rb') as handle:
+        data = handle.read()
+    try:
+        rendered = render_variants(data)
+    except (OSError, Image.DecompressionBombError):
+        # Not an image Pillow can read; the original stays the only version
+        return False
+    return store_variants(user.id, user.profile_picture.name, rendered)
+
+
+def clear_variants(user):
+    names = variant_names(user)
+    User.objects.filter(id=user.id).update(profile_picture_variants={}, updated_at=timezone.now())
+    storage = User._meta.get_field('profile_picture').storage
+    for name in names:
+        storage.delete(name)
+
+
+def stale_variant_user_ids():
+    """Users whose picture has no variants, or variants of another picture"""
+    users = User.objects.exclude(profile_picture='').exclude(profile_picture__isnull=True)
+    return [
+        user_id for user_id, picture, variants in users.values_list('id', 'profile_picture', 'profile_picture_variants')
+        if (variants or {}).get('source') != picture
+    ]
+
+
+def variant_url(user, variant):
+    """URL of a picture variant; the original picture until variants exist for it"""
+    if not user.profile_picture:
+        return None
+    variants = user.profile_picture_variants or {}
+    if variants.get('source') == user.profile_picture.name and variants.get(variant):
+        return user.profile_picture.storage.url(variants[variant])
+    return user.profile_picture.url
+
+
+class ProfilePictureField(serializers.Field):
+    """Read-only URL of the profile picture variant that fits an endpoint"""
+
+    def __init__(self, variant, **kwargs):
+        self.variant = variant
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, user):
+        url = variant_url(user, self.variant)
+        request = self.context.get('request')
+        if url and request is not None:
+            return request.build_absolute_uri(url)
+        return url
@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import LoginView,AddUserView,GetUserView,UpdateUserView, DeleteAccountView,ChangePasswordView
+from .views import LoginView,AddUserView,GetUserView,UpdateUserView, DeleteAccountView, ExportPersonalDataView,ChangePasswordView
 
 
 urlpatterns = [
@@ -7,6 +7,7 @@ urlpatterns = [
         path('add-user/', AddUserView.as_view(), name='add-user'),
         path('get-user/', GetUserView.as_view(), name='get-user'),
         path('profile/update/', UpdateUserView.as_view(), name='update-profile'),
+        path('profile/export/', ExportPersonalDataView.as_view(), name='export-personal-data'),
         path('profile/delete/', DeleteAccountView.as_view(), name='delete-account'),
         path('password/change/', ChangePasswordView.as_view(), name='change-password'),
 ]
\ No newline at end of file
@@ -10,7 +10,13 @@ from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.permissions import AllowAny
 from rest_framework import status
 from drf_yasg.utils import swagger_auto_schema
-from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.parsers import FormParser
+from PfeManagement.conditional import ConditionalGetMixin
+from PfeManagement.uploads import IMAGE_UPLOAD, LimitedMultiPartParser
+from authentication.purge import request_purge
+from authentication.data_export import personal_data_entries
+from PfeManagement.zipstream import stream_zip
+from django.http import StreamingHttpResponse
 
 class LoginView(APIView):
     permission_classes = [AllowAny] 
@@ -34,11 +40,12 @@ class LoginView(APIView):
         })
     
 class AddUserView(APIView):
-    parser_classes = [MultiPartParser, FormParser]
+    parser_classes = [LimitedMultiPartParser, FormParser]
+    upload_limits = {'profile_picture': IMAGE_UPLOAD}
     permission_classes = [AllowAny]
     @swagger_auto_schema(request_body=UserSerializer)
     def post(self, request):
-        serializer = UserSerializer(data=request.data)
+        serializer = UserSerializer(data=request.data, context={'request': request})
         if serializer.is_valid():
             user = serializer.save()
             return Response({
@@ -49,11 +56,13 @@ class AddUserView(APIView):
             }, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
-class GetUserView(APIView):
+class GetUserView(ConditionalGetMixin, APIView):
     permission_classes = [IsAuthenticated]
     def get(self, request):
         user = request.user
-        serializer = UserSerializer(user)
+        not_modified = self.not_modified(request, user.updated_at, user.role_id)
+        if not_modified:
+            return not_modified
         return Response({
                 'first_name': user.first_name,
                 'last_name': user.last_name,
@@ -68,7 +77,8 @@ class GetUserView(APIView):
 class UpdateUserView(APIView):
     """Update authenticated user's profile information"""
     permission_classes = [IsAuthenticated]
-    parser_classes = [MultiPartParser, FormParser]
+    parser_classes = [LimitedMultiPartParser, FormParser]
+    upload_limits = {'profile_picture': IMAGE_UPLOAD}
     
     @swagger_auto_schema(request_body=UserSerializer)
     def put(self, request):
@@ -78,7 +88,7 @@ class UpdateUserView(APIView):
         if 'password' in data:
             data.pop('password')
         
-        serializer = UserSerializer(user, data=data, partial=True)
+        serializer = UserSerializer(user, data=data, partial=True, context={'request': request})
         if serializer.is_valid():
             serializer.save()
             return Response({
@@ -102,7 +112,7 @@ class UpdateUserView(APIView):
         if 'password' in data:
             data.pop('password')
         
-        serializer = UserSerializer(user, data=data, partial=True)
+        serializer = UserSerializer(user, data=data, partial=True, context={'request': request})
         if serializer.is_valid():
             serializer.save()
             return Response({
@@ -118,20 +128,36 @@ class UpdateUserView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class ExportPersonalDataView(APIView):
+    """Download all data of the authenticated user as one ZIP archive"""
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(responses={200: 'ZIP archive'})
+    def get(self, request):
+        response = StreamingHttpResponse(
+            stream_zip(personal_data_entries(request.user)),
+            content_type='application/zip'
+        )
+        response['Content-Disposition'] = f'attachment; filename="{request.user.username}-data.zip"'
+        return response
+
+
 class DeleteAccountView(APIView):
     """Delete authenticated user's account"""
     permission_classes = [IsAuthenticated]
     
+    @swagger_auto_schema(responses={202: 'Account deactivated, deletion in progress'})
     def delete(self, request):
         user = request.user
         username = user.username
         
-        # Hard delete the user account
-        user.delete()
+        # Deactivate now; internships, invitations, reports and files are purged in the background
+        purge = request_purge(user)
         
         return Response({
-            'message': f'Account {username} has been successfully deleted.'
-        }, status=status.HTTP_204_NO_CONTENT)
+            'message': f'Account {username} has been deactivated and will be deleted shortly.',
+            'purge_id': purge.id
+        }, status=status.HTTP_202_ACCEPTED)
 
 
 class ChangePasswordView(APIView):
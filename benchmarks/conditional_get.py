@@ -0,0 +1,73 @@
+"""
+Compare the CPU cost of repeat polls with and without conditional GET.
+
+Creates a throwaway test database seeded with users, then polls the admin
+user list and the teacher list, first as a client that ignores ETags and
+then as one that sends If-None-Match.
+
+    DATABASE_URL=sqlite:///db.sqlite3 python benchmarks/conditional_get.py --users 2000 --requests 200
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'PfeManagement.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+
+from authentication.models import User, Role  # noqa: E402
+
+
+def poll(client, url, requests, conditional):
+    etag = client.get(url)['ETag']
+    headers = {'HTTP_IF_NONE_MATCH': etag} if conditional else {}
+    started_cpu, started_wall = time.process_time(), time.perf_counter()
+    for _ in range(requests):
+        response = client.get(url, **headers)
+        assert response.status_code == (304 if conditional else 200), response.status_code
+    return time.process_time() - started_cpu, time.perf_counter() - started_wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--requests', type=int, default=100)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        admin = User.objects.create_user(
+            username='bench_admin', password='bench_admin', role=Role.objects.get(name='Administrator')
+        )
+        roles = list(Role.objects.all())
+        User.objects.bulk_create([
+            User(
+                username=f'bench_user_{i}', email=f'bench_user_{i}@example.com', first_name='Bench',
+                last_name=str(i), role=roles[i % len(roles)], password='!'
+            )
+            for i in range(args.users)
+        ], batch_size=1000)
+        client = APIClient()
+        client.force_authenticate(admin)
+        print(f"{User.objects.count()} users, {args.requests} requests per run\n")
+        print(f"{'endpoint':<32}{'mode':<14}{'cpu s':>10}{'wall s':>10}{'ms/req':>10}")
+        for url in ('/administrator/users/', '/internship/teachers/'):
+            for conditional in (False, True):
+                cpu, wall = poll(client, url, args.requests, conditional)
+                mode = 'If-None-Match' if conditional else 'full'
+                print(f"{url:<32}{mode:<14}{cpu:>10.3f}{wall:>10.3f}{wall / args.requests * 1000:>10.2f}")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,26 +1,55 @@
 #!/bin/sh
-
-echo "Waiting for Postgres..."
-while ! nc -z $DATABASE_HOST $DATABASE_PORT; do
-  sleep 0.5
-done
-
-echo "Postgres is up!"
-
-echo "Running Django makemigrations..."
-python manage.py makemigrations
-
-echo "running migrations for auth app..."
-python manage.py makemigrations authentication
-
-echo "running migrations for student app..."
-python manage.py makemigrations student
-
-echo "running migrations for internship app..."
-python manage.py makemigrations internship
-
-echo "Running Django migrate..."
-python manage.py migrate
-
-echo "Starting Django server..."
-python manage.py runserver 0.0.0.0:8000
\ No newline at end of file
+# Usage: entrypoint.sh [serve|migrate|worker|dev]
+#   serve    gunicorn with preloaded, pre-warmed workers (gunicorn.conf.py); no migrations
+#   migrate  one-shot schema migration, run once per deployment before serve
+#   worker   background job worker
+#   dev      migrate, then the Django development server
+set -e
+
+MODE="${1:-serve}"
+
+wait_for_database() {
+  echo "Waiting for Postgres..."
+  while ! nc -z $DATABASE_HOST $DATABASE_PORT; do
+    sleep 0.5
+  done
+  echo "Postgres is up!"
+}
+
+migrate() {
+  echo "Running Django makemigrations..."
+  python manage.py makemigrations authentication student internship jobs administrator
+
+  echo "Running Django migrate..."
+  python manage.py migrate
+
+  echo "Moving uploads saved outside MEDIA_ROOT..."
+  python manage.py move_media
+}
+
+case "$MODE" in
+  serve)
+    wait_for_database
+    echo "Starting gunicorn..."
+    exec gunicorn -c gunicorn.conf.py
+    ;;
+  migrate)
+    wait_for_database
+    migrate
+    ;;
+  worker)
+    wait_for_database
+    echo "Starting job worker..."
+    exec python manage.py runworker
+    ;;
+  dev)
+    wait_for_database
+    migrate
+    echo "Starting Django server..."
+    exec python manage.py runserver 0.0.0.0:8000
+    ;;
+  *)
+    echo "Unknown mode '$MODE'; use serve, migrate, worker or dev" >&2
+    exit 1
+    ;;
+esac
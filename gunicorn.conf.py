@@ -0,0 +1,68 @@
+"""
+Gunicorn settings for `entrypoint.sh serve`.
+
+The application is preloaded in the master and the workers are forked
+from it, so imports and warm-up work are shared copy-on-write. WSGI is
+served by threaded workers. Set SERVER_INTERFACE=asgi to serve
+PfeManagement/asgi.py with uvicorn workers instead; the server-sent
+events endpoint (internship/events/) needs it. A WSGI server reads a
+streamed response to its end before sending anything, so under WSGI that
+endpoint answers 501 rather than holding a thread forever. Sync views run
+one at a time per ASGI worker, which is why WSGI stays the default.
+
+Environment: PORT, SERVER_INTERFACE (wsgi|asgi), WEB_CONCURRENCY (workers),
+GUNICORN_THREADS, GUNICORN_TIMEOUT, GUNICORN_MAX_REQUESTS.
+"""
+import os
+
+
+def _cores():
+    # Honours container CPU sets, unlike os.cpu_count()
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+interface = os.environ.get('SERVER_INTERFACE', 'wsgi')
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+preload_app = True
+
+if interface == 'asgi':
+    wsgi_app = 'PfeManagement.asgi:application'
+    worker_class = 'uvicorn_worker.UvicornWorker'
+    # One event loop per core
+    workers = int(os.environ.get('WEB_CONCURRENCY', _cores()))
+else:
+    wsgi_app = 'PfeManagement.wsgi:application'
+    worker_class = 'gthread'
+    workers = int(os.environ.get('WEB_CONCURRENCY', 2 * _cores() + 1))
+    # Threads keep streamed downloads and storage round-trips from holding a whole worker
+    threads = int(os.environ.get('GUNICORN_THREADS', '4'))
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '60'))
+graceful_timeout = 30
+keepalive = 5
+# Recycle workers now and then so a slow leak cannot grow without bound
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', '2000'))
+max_requests_jitter = max_requests // 10
+
+accesslog = '-'
+errorlog = '-'
+
+
+def when_ready(server):
+    # Master, after the preloaded application was imported and before any worker is forked
+    from PfeManagement.warmup import warm_up_application
+    warm_up_application()
+    if interface == 'asgi':
+        # Events published by one worker must reach the streams held by the others
+        from internship.events import check_broker
+        check_broker(server.cfg.workers)
+
+
+def post_worker_init(worker):
+    # Each worker, before it accepts connections
+    from PfeManagement.warmup import warm_up_worker
+    warm_up_worker()
@@ -4,3 +4,5 @@ from django.apps import AppConfig
 class InternshipConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'internship'
+    def ready(self):
+        import internship.signals
@@ -0,0 +1,192 @@
+"""
+Live update events pushed to clients over server-sent events.
+
+Views and signals publish small messages addressed to user ids; the event
+stream endpoint subscribes one asyncio queue per open connection. The broker
+class is set by the EVENTS_BROKER setting: the in-process broker only reaches
+connections served by the same process, the PostgreSQL broker fans out across
+processes and nodes through LISTEN/NOTIFY.
+"""
+import asyncio
+import json
+import logging
+import secrets
+import threading
+from collections import defaultdict
+
+import psycopg
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, connections, transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+SUBSCRIBER_QUEUE_SIZE = 100
+
+# Browsers' EventSource cannot send headers, so streams are opened with a ticket
+# in the URL: random, valid for STREAM_TICKET_SECONDS and redeemable once, so the
+# URLs written to access logs hold no usable credential
+STREAM_TICKET_SECONDS = 30
+
+
+class Subscription:
+    """Queue of pending events for one open stream"""
+
+    def __init__(self, user_id, loop):
+        self.user_id = user_id
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def put(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # A client this far behind will resync on reconnect
+            logger.warning("Dropping event for slow subscriber of user %s", self.user_id)
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class InProcessBroker:
+    """Fan out events to the streams open in this process"""
+    # Whether events reach the streams of other processes
+    shared = False
+
+    def __init__(self):
+        self._subscriptions = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id):
+        """Open a subscription; must be called from the event loop serving the stream"""
+        subscription = Subscription(user_id, asyncio.get_running_loop())
+        with self._lock:
+            self._subscriptions[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.user_id]
+
+    def subscriber_count(self):
+        with self._lock:
+            return sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+
+    def publish(self, user_ids, event, data):
+        self.deliver(user_ids, {'event': event, 'data': data})
+
+    def deliver(self, user_ids, message):
+        """Hand a message to local subscribers; safe to call from any thread"""
+        with self._lock:
+            targets = [
+                subscription
+                for user_id in set(user_ids) if user_id
+                for subscription in self._subscriptions.get(user_id, ())
+            ]
+        for subscription in targets:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.put, message)
+            except RuntimeError:
+                # The loop of a stream being torn down is already closed
+                pass
+
+
+class PostgresNotifyBroker(InProcessBroker):
+    """
+    Share events between processes and nodes with PostgreSQL LISTEN/NOTIFY.
+    Each process runs one listener thread that delivers notifications to its
+    local subscribers; publishing is a single pg_notify call.
+    """
+    channel = 'internflow_events'
+    shared = True
+
+    def __init__(self):
+        super().__init__()
+        self._listener = None
+
+    def subscribe(self, user_id):
+        self._ensure_listener()
+        return super().subscribe(user_id)
+
+    def publish(self, user_ids, event, data):
+        payload = json.dumps({'users': sorted(set(u for u in user_ids if u)), 'event': event, 'data': data})
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [self.channel, payload])
+
+    def _ensure_listener(self):
+        with self._lock:
+            if self._listener is None or not self._listener.is_alive():
+                self._listener = threading.Thread(target=self._listen, name='events-listener', daemon=True)
+                self._listener.start()
+
+    def _listen(self):
+        # A connection of its own rather than one from Django or its pool: it
+        # stays in LISTEN for the life of the process
+        params = connections.create_connection('default').get_connection_params()
+        try:
+            with psycopg.connect(**params, autocommit=True) as conn:
+                conn.execute(f'LISTEN {self.channel}')
+                for notify in conn.notifies():
+                    try:
+                        message = json.loads(notify.payload)
+                    except ValueError:
+                        continue
+                    self.deliver(message['users'], {'event': message['event'], 'data': message['data']})
+        except Exception:
+            logger.exception("Event listener stopped")
+
+
+_broker = None
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        _broker = import_string(getattr(settings, 'EVENTS_BROKER', 'internship.events.InProcessBroker'))()
+    return _broker
+
+
+def _ticket_key(ticket):
+    return f'events:ticket:{ticket}'
+
+
+def issue_stream_ticket(user):
+    ticket = secrets.token_urlsafe(32)
+    cache.set(_ticket_key(ticket), user.id, STREAM_TICKET_SECONDS)
+    return ticket
+
+
+async def redeem_stream_ticket(ticket):
+    """User id of a stream ticket, or None; a ticket is only accepted once"""
+    key = _ticket_key(ticket)
+    user_id = await cache.aget(key)
+    # Only the request whose delete removed the ticket may use it
+    if user_id is None or not await cache.adelete(key):
+        return None
+    return user_id
+
+
+def check_broker(processes):
+    """Refuse a broker that cannot reach every one of `processes` server processes"""
+    broker = get_broker()
+    if processes > 1 and not broker.shared:
+        raise ImproperlyConfigured(
+            f'{type(broker).__name__} only reaches the streams of its own process; '
+            f'set EVENTS_BROKER to internship.events.PostgresNotifyBroker to serve events from {processes} workers.'
+        )
+
+
+def publish_on_commit(user_ids, event, data):
+    """Publish once the surrounding transaction commits, so clients never see rolled-back changes"""
+    user_ids = [user_id for user_id in user_ids if user_id]
+    transaction.on_commit(lambda: get_broker().publish(user_ids, event, data))
+
+
+def format_sse(message):
+    return f"event: {message['event']}\ndata: {json.dumps(message['data'])}\n\n"
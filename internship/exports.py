@@ -0,0 +1,196 @@
+import csv
+import posixpath
+from datetime import date
+
+from PfeManagement.zipstream import file_chunks
+from student.models import Report
+from .models import Internship, TeacherInvitation
+
+# Rows fetched per round-trip while streaming. On PostgreSQL this is the
+# server-side cursor fetch size, so memory stays flat whatever the export size.
+EXPORT_CHUNK_SIZE = 2000
+
+
+class Echo:
+    """File-like object that hands back what is written instead of buffering it"""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(header, rows):
+    """Yield a CSV document line by line, header first"""
+    writer = csv.writer(Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def parse_export_filters(params):
+    """
+    Parse the status, type and date filters shared by the export endpoints.
+    Returns a (filters, error) tuple; error is a message when a value is invalid.
+    """
+    filters = {}
+
+    status_value = params.get('status')
+    if status_value not in (None, ''):
+        try:
+            filters['status'] = int(status_value)
+        except (TypeError, ValueError):
+            return None, 'Invalid status. Use an integer status code.'
+
+    type_value = params.get('type')
+    if type_value:
+        filters['type'] = type_value
+
+    for key in ('date_from', 'date_to'):
+        value = params.get(key)
+        if value:
+            try:
+                filters[key] = date.fromisoformat(value)
+            except ValueError:
+                return None, f'Invalid {key}. Use the YYYY-MM-DD format.'
+
+    return filters, None
+
+
+def _full_name(first_name, last_name, username):
+    if username is None:
+        return ''
+    return f"{first_name or ''} {last_name or ''}".strip() or username
+
+
+INTERNSHIP_EXPORT_HEADER = [
+    'id', 'title', 'type', 'status', 'company_name',
+    'student_username', 'student_name', 'student_email',
+    'teacher_username', 'teacher_name', 'teacher_email',
+    'start_date', 'end_date', 'created_at',
+]
+
+INTERNSHIP_EXPORT_VALUES = [
+    'id', 'title', 'type', 'status', 'company_name',
+    'student_id__username', 'student_id__first_name', 'student_id__last_name', 'student_id__email',
+    'teacher_id__username', 'teacher_id__first_name', 'teacher_id__last_name', 'teacher_id__email',
+    'start_date', 'end_date', 'created_at',
+]
+
+
+def filter_internships(queryset, filters):
+    """Apply parse_export_filters() filters to an internship queryset"""
+    if 'status' in filters:
+        queryset = queryset.filter(status=filters['status'])
+    if 'type' in filters:
+        queryset = queryset.filter(type=filters['type'])
+    if 'date_from' in filters:
+        queryset = queryset.filter(start_date__gte=filters['date_from'])
+    if 'date_to' in filters:
+        queryset = queryset.filter(start_date__lte=filters['date_to'])
+    return queryset
+
+
+def internship_export_rows(filters):
+    """Yield one CSV row per internship matching the filters"""
+    queryset = filter_internships(Internship.objects.all(), filters)
+
+    status_labels = dict(Internship.STATUS_CHOICES)
+    rows = queryset.order_by('id').values(*INTERNSHIP_EXPORT_VALUES)
+    for row in rows.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield [
+            row['id'],
+            row['title'],
+            row['type'],
+            status_labels.get(row['status'], row['status']),
+            row['company_name'],
+            row['student_id__username'],
+            _full_name(row['student_id__first_name'], row['student_id__last_name'], row['student_id__username']),
+            row['student_id__email'],
+            row['teacher_id__username'] or '',
+            _full_name(row['teacher_id__first_name'], row['teacher_id__last_name'], row['teacher_id__username']),
+            row['teacher_id__email'] or '',
+            row['start_date'].isoformat(),
+            row['end_date'].isoformat(),
+            row['created_at'].isoformat() if row['created_at'] else '',
+        ]
+
+
+INVITATION_EXPORT_HEADER = [
+    'id', 'internship_id', 'internship_title', 'internship_type', 'company_name', 'status',
+    'student_username', 'student_name', 'student_email',
+    'teacher_username', 'teacher_name', 'teacher_email',
+    'message', 'created_at', 'updated_at',
+]
+
+INVITATION_EXPORT_VALUES = [
+    'id', 'internship_id', 'internship__title', 'internship__type', 'internship__company_name', 'status',
+    'student__username', 'student__first_name', 'student__last_name', 'student__email',
+    'teacher__username', 'teacher__first_name', 'teacher__last_name', 'teacher__email',
+    'message', 'created_at', 'updated_at',
+]
+
+
+def invitation_export_rows(filters):
+    """Yield one CSV row per teacher invitation matching the filters"""
+    queryset = TeacherInvitation.objects.all()
+    if 'status' in filters:
+        queryset = queryset.filter(status=filters['status'])
+    if 'type' in filters:
+        queryset = queryset.filter(internship__type=filters['type'])
+    if 'date_from' in filters:
+        queryset = queryset.filter(created_at__date__gte=filters['date_from'])
+    if 'date_to' in filters:
+        queryset = queryset.filter(created_at__date__lte=filters['date_to'])
+
+    status_labels = dict(TeacherInvitation.STATUS_CHOICES)
+    rows = queryset.order_by('id').values(*INVITATION_EXPORT_VALUES)
+    for row in rows.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield [
+            row['id'],
+            row['internship_id'],
+            row['internship__title'],
+            row['internship__type'],
+            row['internship__company_name'],
+            status_labels.get(row['status'], row['status']),
+            row['student__username'],
+            _full_name(row['student__first_name'], row['student__last_name'], row['student__username']),
+            row['student__email'],
+            row['teacher__username'],
+            _full_name(row['teacher__first_name'], row['teacher__last_name'], row['teacher__username']),
+            row['teacher__email'],
+            row['message'],
+            row['created_at'].isoformat() if row['created_at'] else '',
+            row['updated_at'].isoformat() if row['updated_at'] else '',
+        ]
+
+
+def _document_entries(internships):
+    """(name, chunks) archive entries for the cahiers de charges of an internship queryset"""
+    rows = (
+        internships.exclude(cahier_de_charges='')
+        .select_related('student_id').only('id', 'cahier_de_charges', 'student_id__username')
+        .order_by('student_id__username', 'id')
+    )
+    for internship in rows.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        file_name = posixpath.basename(internship.cahier_de_charges.name)
+        name = f'{internship.student_id.username}/cahier-de-charges/{internship.id}-{file_name}'
+        yield name, file_chunks(internship.cahier_de_charges)
+
+
+def cohort_document_entries(filters):
+    """Archive entries for every cahier de charges of the internships matching the filters"""
+    return _document_entries(filter_internships(Internship.objects.all(), filters))
+
+
+def supervisor_document_entries(teacher):
+    """Archive entries for the documents of a teacher's students: cahiers de charges and reports"""
+    yield from _document_entries(Internship.objects.filter(teacher_id=teacher))
+
+    student_ids = Internship.objects.filter(teacher_id=teacher).values('student_id')
+    reports = (
+        Report.objects.filter(added_by__in=student_ids).exclude(file_path='')
+        .select_related('added_by').only('id', 'file_path', 'added_by__username')
+        .order_by('added_by__username', 'id')
+    )
+    for report in reports.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        file_name = posixpath.basename(report.file_path.name)
+        yield f'{report.added_by.username}/reports/{report.id}-{file_name}', file_chunks(report.file_path)
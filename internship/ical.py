@@ -0,0 +1,155 @@
+import hashlib
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Soutenance
+
+FEED_TOKEN_SALT = 'internship.calendar-feed'
+FEED_CACHE_KEY = 'internship:calendar-feed:{user_id}'
+SOUTENANCE_DURATION = timedelta(hours=1)
+
+
+def feed_cache_timeout():
+    return getattr(settings, 'CALENDAR_FEED_CACHE_TIMEOUT', 60 * 60 * 24)
+
+
+def make_feed_token(user):
+    """Signed token identifying the owner of a calendar feed"""
+    return signing.Signer(salt=FEED_TOKEN_SALT).sign(str(user.pk))
+
+
+def read_feed_token(token):
+    """Return the user id carried by a feed token, or None if it was tampered with"""
+    try:
+        return int(signing.Signer(salt=FEED_TOKEN_SALT).unsign(token))
+    except (signing.BadSignature, ValueError):
+        return None
+
+
+def invalidate_feeds(user_ids):
+    """Drop the cached feeds of the given users"""
+    keys = [FEED_CACHE_KEY.format(user_id=user_id) for user_id in set(user_ids) if user_id]
+    if keys:
+        cache.delete_many(keys)
+
+
+def _escape(value):
+    return (
+        str(value)
+        .replace('\\', '\\\\')
+        .replace(';', '\\;')
+        .replace(',', '\\,')
+        .replace('\r\n', '\\n')
+        .replace('\n', '\\n')
+    )
+
+
+def _fold(line):
+    """Fold content lines longer than 75 octets as required by RFC 5545"""
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line
+    parts = []
+    while len(encoded) > 75:
+        cut = 75 if not parts else 74
+        # Never split a multi-byte UTF-8 sequence
+        while cut > 0 and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode())
+        encoded = encoded[cut:]
+    parts.append(encoded.decode())
+    return '\r\n '.join(parts)
+
+
+def _ical_datetime(value):
+    return value.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def _display_name(first_name, last_name, username):
+    if username is None:
+        return None
+    return f"{first_name} {last_name}".strip() or username
+
+
+def render_feed(user_id):
+    """Render the soutenances of a user as an iCalendar document"""
+    soutenances = (
+        Soutenance.objects
+        .filter(
+            Q(internship__student_id=user_id)
+            | Q(internship__teacher_id=user_id)
+            | Q(juries__member=user_id)
+        )
+        .distinct()
+        .order_by('date', 'time', 'id')
+        .values(
+            'id', 'date', 'time', 'room', 'internship__title', 'internship__company_name',
+            'internship__student_id__username',
+            'internship__student_id__first_name', 'internship__student_id__last_name',
+            'internship__teacher_id__username', 'internship__teacher_id__first_name',
+            'internship__teacher_id__last_name',
+        )
+    )
+
+    now = timezone.now()
+    lines = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:-//InternFlow//Soutenances//EN',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        'X-WR-CALNAME:Soutenances',
+    ]
+    for row in soutenances:
+        start = timezone.make_aware(datetime.combine(row['date'], row['time']))
+        student = _display_name(
+            row['internship__student_id__first_name'],
+            row['internship__student_id__last_name'],
+            row['internship__student_id__username'],
+        )
+        teacher = _display_name(
+            row['internship__teacher_id__first_name'],
+            row['internship__teacher_id__last_name'],
+            row['internship__teacher_id__username'],
+        )
+        description = f"Student: {student}\nCompany: {row['internship__company_name']}"
+        if teacher:
+            description += f"\nSupervisor: {teacher}"
+        lines.extend([
+            'BEGIN:VEVENT',
+            f"UID:soutenance-{row['id']}@internflow",
+            f'DTSTAMP:{_ical_datetime(now)}',
+            f'DTSTART:{_ical_datetime(start)}',
+            f'DTEND:{_ical_datetime(start + SOUTENANCE_DURATION)}',
+            f"SUMMARY:{_escape('Soutenance: ' + row['internship__title'])}",
+            f"LOCATION:{_escape(row['room'])}",
+            f'DESCRIPTION:{_escape(description)}',
+            'END:VEVENT',
+        ])
+    lines.append('END:VCALENDAR')
+    body = '\r\n'.join(_fold(line) for line in lines) + '\r\n'
+
+    # DTSTAMP changes on every render, so hash the events only
+    digest = hashlib.sha1('\r\n'.join(
+        line for line in lines if not line.startswith('DTSTAMP:')
+    ).encode()).hexdigest()
+    return {
+        'body': body,
+        'etag': f'"{digest}"',
+        'last_modified': now.timestamp(),
+    }
+
+
+def get_feed(user_id):
+    """Return the cached feed of a user, rendering it on a cache miss"""
+    key = FEED_CACHE_KEY.format(user_id=user_id)
+    feed = cache.get(key)
+    if feed is None:
+        feed = render_feed(user_id)
+        cache.set(key, feed, feed_cache_timeout())
+    return feed
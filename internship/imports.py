@@ -0,0 +1,213 @@
+import csv
+import io
+import os
+import zipfile
+from datetime import date
+from itertools import islice
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
+
+from authentication.models import User
+from .models import Internship
+
+# Rows validated and inserted per transaction, so large imports never hold
+# long-running locks on the internship table.
+IMPORT_BATCH_SIZE = 500
+
+MAX_DOCUMENT_SIZE = 10 * 1024 * 1024
+ALLOWED_DOCUMENT_EXTENSIONS = ['.pdf', '.doc', '.docx']
+REQUIRED_COLUMNS = ['student', 'type', 'company_name', 'start_date', 'end_date']
+
+
+class InternshipImportError(Exception):
+    """Raised when the uploaded spreadsheet or archive cannot be read at all"""
+
+
+def _parse_date(value):
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value.strip())
+    except ValueError:
+        return None
+
+
+def _resolve_users(keys):
+    """Map usernames and e-mails to users with a single IN query"""
+    if not keys:
+        return {}
+    lowered = {key.lower() for key in keys}
+    # Compared on lowercased stored e-mails too, so Jane@X.com matches jane@x.com
+    users = User.objects.alias(email_lower=Lower('email')).filter(
+        Q(username__in=keys) | Q(email_lower__in=lowered)
+    ).select_related('role')
+    resolved = {}
+    for user in users:
+        resolved[user.username] = user
+        if user.email:
+            resolved.setdefault(user.email.lower(), user)
+    return resolved
+
+
+def _lookup(resolved, key):
+    return resolved.get(key) or resolved.get(key.lower())
+
+
+class InternshipImporter:
+    """
+    Import internships from a CSV spreadsheet, optionally with a ZIP archive
+    holding the cahier de charges documents referenced by file name.
+    """
+
+    def __init__(self, csv_file, archive=None, batch_size=IMPORT_BATCH_SIZE):
+        self.csv_file = csv_file
+        self.batch_size = batch_size
+        self.archive = None
+        if archive is not None:
+            try:
+                self.archive = zipfile.ZipFile(archive)
+            except zipfile.BadZipFile:
+                raise InternshipImportError('Documents archive is not a valid ZIP file.')
+            self.archive_members = {
+                os.path.basename(info.filename): info
+                for info in self.archive.infolist() if not info.is_dir()
+            }
+
+    def run(self):
+        """Import every row and return the per-row report"""
+        text = io.TextIOWrapper(self.csv_file, encoding='utf-8-sig', newline='')
+        reader = csv.DictReader(text)
+        try:
+            columns = reader.fieldnames or []
+        except UnicodeDecodeError:
+            raise InternshipImportError('File must be a UTF-8 encoded CSV file.')
+        missing = [column for column in REQUIRED_COLUMNS if column not in columns]
+        if missing:
+            raise InternshipImportError(f"Missing required columns: {', '.join(missing)}.")
+
+        report = []
+        row_number = 1
+        try:
+            while True:
+                batch = list(islice(reader, self.batch_size))
+                if not batch:
+                    break
+                report.extend(self._import_batch(batch, first_row=row_number + 1))
+                row_number += len(batch)
+        except (UnicodeDecodeError, csv.Error):
+            raise InternshipImportError(f'Could not read the CSV file after row {row_number}.')
+        return report
+
+    def _import_batch(self, batch, first_row):
+        keys = set()
+        for row in batch:
+            for column in ('student', 'teacher'):
+                value = (row.get(column) or '').strip()
+                if value:
+                    keys.add(value)
+        users = _resolve_users(keys)
+
+        # Parse each date column in a single pass over the batch
+        start_dates = [_parse_date(row.get('start_date')) for row in batch]
+        end_dates = [_parse_date(row.get('end_date')) for row in batch]
+
+        results = []
+        pending = []
+        for offset, row in enumerate(batch):
+            result = {'row': first_row + offset}
+            errors = self._validate_row(row, users, start_dates[offset], end_dates[offset])
+            if errors:
+                result.update({'status': 'error', 'errors': errors})
+            else:
+                teacher_key = (row.get('teacher') or '').strip()
+                internship = Internship(
+                    student_id=_lookup(users, row['student'].strip()),
+                    teacher_id=_lookup(users, teacher_key) if teacher_key else None,
+                    type=row['type'].strip(),
+                    company_name=row['company_name'].strip(),
+                    title=(row.get('title') or '').strip() or 'Untitled',
+                    description=(row.get('description') or '').strip() or None,
+                    start_date=start_dates[offset],
+                    end_date=end_dates[offset],
+                    status=0,
+                )
+                document = (row.get('cahier_de_charges') or '').strip()
+                if document:
+                    document_error = self._attach_document(internship, document)
+                    if document_error:
+                        result.update({'status': 'error', 'errors': {'cahier_de_charges': document_error}})
+                        results.append(result)
+                        continue
+                pending.append((result, internship))
+            results.append(result)
+
+        stored = [internship.cahier_de_charges.name for _, internship in pending if internship.cahier_de_charges]
+        try:
+            with transaction.atomic():
+                created = Internship.objects.bulk_create([internship for _, internship in pending])
+        except Exception:
+            # The documents were stored before the insert; nothing refers to them now
+            for name in stored:
+                default_storage.delete(name)
+            raise
+        for (result, _), internship in zip(pending, created):
+            result.update({'status': 'created', 'id': internship.pk})
+        return results
+
+    def _validate_row(self, row, users, start_date, end_date):
+        errors = {}
+        for column in REQUIRED_COLUMNS:
+            if not (row.get(column) or '').strip():
+                errors[column] = 'This field is required.'
+
+        student_key = (row.get('student') or '').strip()
+        if student_key:
+            student = _lookup(users, student_key)
+            if student is None:
+                errors['student'] = 'No user with this username or email.'
+            elif not student.role or student.role.name != 'Student':
+                errors['student'] = 'Selected user is not a student.'
+
+        teacher_key = (row.get('teacher') or '').strip()
+        if teacher_key:
+            teacher = _lookup(users, teacher_key)
+            if teacher is None:
+                errors['teacher'] = 'No user with this username or email.'
+            elif not teacher.role or teacher.role.name != 'Teacher':
+                errors['teacher'] = 'Selected user is not a teacher.'
+
+        if row.get('start_date') and start_date is None:
+            errors['start_date'] = 'Invalid date. Use the YYYY-MM-DD format.'
+        if row.get('end_date') and end_date is None:
+            errors['end_date'] = 'Invalid date. Use the YYYY-MM-DD format.'
+        if start_date and end_date and start_date >= end_date:
+            errors['end_date'] = 'End date must be after start date.'
+
+        for column, field_name in (('type', 'type'), ('company_name', 'company_name'), ('title', 'title')):
+            max_length = Internship._meta.get_field(field_name).max_length
+            if len((row.get(column) or '').strip()) > max_length:
+                errors[column] = f'Ensure this field has no more than {max_length} characters.'
+        return errors
+
+    def _attach_document(self, internship, name):
+        """Store the archived document and attach it; returns an error message on failure"""
+        if self.archive is None:
+            return 'No documents archive was uploaded.'
+        info = self.archive_members.get(os.path.basename(name))
+        if info is None:
+            return 'File not found in the documents archive.'
+        if os.path.splitext(info.filename)[1].lower() not in ALLOWED_DOCUMENT_EXTENSIONS:
+            return 'Only PDF, DOC, and DOCX files are allowed.'
+        if info.file_size > MAX_DOCUMENT_SIZE:
+            return 'File size must be less than 10MB.'
+        with self.archive.open(info) as member:
+            content = ContentFile(member.read())
+        stored_name = default_storage.save(
+            f'cahiers_de_charges/{os.path.basename(info.filename)}', content
+        )
+        internship.cahier_de_charges.name = stored_name
+        return None
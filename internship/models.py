@@ -2,6 +2,43 @@ from django.db import models
 from django.conf import settings
 from django.utils import timezone
 
+
+class InternshipQuerySet(models.QuerySet):
+    """Access rules expressed as filters, so forbidden rows are never loaded"""
+
+    def visible_to(self, user):
+        """Internships the user follows as student or supervising teacher"""
+        return self.filter(models.Q(student_id=user) | models.Q(teacher_id=user))
+
+    def owned_by(self, student):
+        return self.filter(student_id=student)
+
+    def supervised_by(self, teacher):
+        return self.filter(teacher_id=teacher)
+
+    def with_people(self):
+        """Join the student and teacher rows used by the serializers"""
+        return self.select_related('student_id', 'teacher_id')
+
+
+class TeacherInvitationQuerySet(models.QuerySet):
+    """Access rules expressed as filters, so forbidden rows are never loaded"""
+
+    def visible_to(self, user):
+        return self.filter(models.Q(student=user) | models.Q(teacher=user))
+
+    def owned_by(self, student):
+        """Invitations sent by the student"""
+        return self.filter(student=student)
+
+    def addressed_to(self, teacher):
+        """Invitations received by the teacher"""
+        return self.filter(teacher=teacher)
+
+    def with_people(self):
+        return self.select_related('student', 'teacher', 'internship')
+
+
 # Create your models here.
 class Internship(models.Model):
     STATUS_CHOICES = [
@@ -39,11 +76,18 @@ class Internship(models.Model):
     created_at = models.DateTimeField(auto_now_add=True,null=True)
     updated_at = models.DateTimeField(auto_now=True,null=True)
 
+    objects = InternshipQuerySet.as_manager()
+
     def __str__(self):
         return self.title
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Delta sync reads the rows a student or teacher changed since a cursor
+            models.Index(fields=['student_id', 'updated_at'], name='internship_student_sync_idx'),
+            models.Index(fields=['teacher_id', 'updated_at'], name='internship_teacher_sync_idx'),
+        ]
     
 class TeacherInvitation(models.Model):
     STATUS_CHOICES = [
@@ -72,9 +116,15 @@ class TeacherInvitation(models.Model):
     created_at = models.DateTimeField(auto_now_add=True,null=True)
     updated_at = models.DateTimeField(auto_now=True,null=True)
 
+    objects = TeacherInvitationQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
         unique_together = ['internship', 'teacher']  # Prevent duplicate invitations
+        indexes = [
+            models.Index(fields=['student', 'updated_at'], name='invitation_student_sync_idx'),
+            models.Index(fields=['teacher', 'updated_at'], name='invitation_teacher_sync_idx'),
+        ]
 
     def __str__(self):
         return f"Invitation from {self.student.username} to {self.teacher.username}"
@@ -107,3 +157,24 @@ class Jury(models.Model):
 
     def __str__(self):
         return f"Jury member {self.member} for {self.soutenance}"
+
+
+class SyncTombstone(models.Model):
+    """Records a deleted row for each user that could see it, so delta sync can report deletions"""
+    MODEL_CHOICES = [
+        ('internship', 'Internship'),
+        ('invitation', 'Teacher Invitation'),
+    ]
+    # Plain ids: the user or the row may be gone by the time a client syncs
+    user_id = models.BigIntegerField()
+    model = models.CharField(max_length=20, choices=MODEL_CHOICES)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user_id', 'deleted_at'], name='sync_tombstone_user_idx'),
+        ]
+
+    def __str__(self):
+        return f"Deleted {self.model} {self.object_id} for user {self.user_id}"
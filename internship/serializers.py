@@ -1,14 +1,35 @@
 from rest_framework import serializers
 from .models import Internship, TeacherInvitation
 from authentication.models import User
+from PfeManagement.fieldsets import SparseFieldsetMixin
+from PfeManagement.directuploads import DirectUploadFileField
+from authentication.thumbnails import ProfilePictureField
 import os
 
-class InternshipSerializer(serializers.ModelSerializer):
+
+class UserSummarySerializer(serializers.ModelSerializer):
+    """Compact user representation nested by ?expand="""
+
+    class Meta:
+        model = User
+        fields = ['id', 'username', 'email', 'first_name', 'last_name']
+
+
+class InternshipSummarySerializer(serializers.ModelSerializer):
+    """Compact internship representation nested by ?expand="""
+
+    class Meta:
+        model = Internship
+        fields = ['id', 'title', 'company_name', 'status', 'start_date', 'end_date']
+
+
+class InternshipSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     student_name = serializers.SerializerMethodField(read_only=True)
     teacher_name = serializers.SerializerMethodField(read_only=True)
     status_display = serializers.CharField(source='get_status_display', read_only=True)
     type_display = serializers.CharField(source='get_type_display', read_only=True)
-    
+    cahier_de_charges = DirectUploadFileField(upload_target='cahier_de_charges')
+
     class Meta:
         model = Internship
         fields = [
@@ -18,6 +39,16 @@ class InternshipSerializer(serializers.ModelSerializer):
             'description', 'title', 'created_at', 'updated_at'
         ]
         read_only_fields = ['student_id', 'created_at', 'updated_at']
+        field_sources = {
+            'student_name': ['student_id__first_name', 'student_id__last_name', 'student_id__username'],
+            'teacher_name': ['teacher_id__first_name', 'teacher_id__last_name', 'teacher_id__username'],
+            'status_display': ['status'],
+            'type_display': ['type'],
+        }
+        expandable_fields = {
+            'student_id': UserSummarySerializer,
+            'teacher_id': UserSummarySerializer,
+        }
 
     def get_student_name(self, obj):
         """Get full name of student"""
@@ -42,7 +73,8 @@ class InternshipSerializer(serializers.ModelSerializer):
 
     def validate_cahier_de_charges(self, value):
         """Validate file size and type"""
-        if value:
+        # Direct uploads were checked when confirmed
+        if value and not isinstance(value, str):
             # Max file size: 10MB
             if value.size > 10 * 1024 * 1024:
                 raise serializers.ValidationError('File size must be less than 10MB.')
@@ -72,7 +104,7 @@ class InternshipSerializer(serializers.ModelSerializer):
         return value
 
 
-class TeacherInvitationSerializer(serializers.ModelSerializer):
+class TeacherInvitationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     student_name = serializers.SerializerMethodField(read_only=True)
     teacher_name = serializers.SerializerMethodField(read_only=True)
     status_display = serializers.CharField(source='get_status_display', read_only=True)
@@ -86,6 +118,17 @@ class TeacherInvitationSerializer(serializers.ModelSerializer):
             'message', 'created_at', 'updated_at'
         ]
         read_only_fields = ['student', 'created_at', 'updated_at']
+        field_sources = {
+            'internship_title': ['internship__title'],
+            'student_name': ['student__first_name', 'student__last_name', 'student__username'],
+            'teacher_name': ['teacher__first_name', 'teacher__last_name', 'teacher__username'],
+            'status_display': ['status'],
+        }
+        expandable_fields = {
+            'internship': InternshipSummarySerializer,
+            'student': UserSummarySerializer,
+            'teacher': UserSummarySerializer,
+        }
 
     def get_student_name(self, obj):
         """Get full name of student"""
@@ -130,7 +173,8 @@ class TeacherListSerializer(serializers.ModelSerializer):
     """Simplified serializer for listing teachers"""
     role_name = serializers.SerializerMethodField(read_only=True)
     full_name = serializers.SerializerMethodField(read_only=True)
-    
+    profile_picture = ProfilePictureField('thumb')
+
     class Meta:
         model = User
         fields = ['id', 'username', 'email', 'first_name', 'last_name', 'full_name', 'role_name', 'profile_picture']
@@ -0,0 +1,122 @@
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+
+from internship.models import Internship, TeacherInvitation, Soutenance, Jury
+from internship.ical import invalidate_feeds
+from internship.sync import record_tombstones
+from internship.events import publish_on_commit
+
+
+def _soutenance_audience(internship_id, soutenance_id=None):
+    """Users whose calendar feed shows the soutenances of an internship"""
+    user_ids = set()
+    internship = Internship.objects.filter(id=internship_id).values('student_id', 'teacher_id').first()
+    if internship:
+        user_ids.update([internship['student_id'], internship['teacher_id']])
+    if soutenance_id is not None:
+        juries = Jury.objects.filter(soutenance_id=soutenance_id)
+    else:
+        juries = Jury.objects.filter(soutenance__internship_id=internship_id)
+    user_ids.update(juries.values_list('member_id', flat=True))
+    return user_ids
+
+
+@receiver(post_save, sender=Soutenance)
+@receiver(post_delete, sender=Soutenance)
+def invalidate_soutenance_feeds(sender, instance, **kwargs):
+    invalidate_feeds(_soutenance_audience(instance.internship_id, instance.id))
+
+
+@receiver(post_init, sender=Jury)
+def remember_loaded_member(sender, instance, **kwargs):
+    instance._loaded_member_id = instance.__dict__.get('member_id')
+
+
+@receiver(post_save, sender=Jury)
+@receiver(post_delete, sender=Jury)
+def invalidate_jury_feeds(sender, instance, **kwargs):
+    # The removed or replaced member no longer shows up in the jury table
+    user_ids = {instance.member_id, getattr(instance, '_loaded_member_id', None)}
+    instance._loaded_member_id = instance.member_id
+    soutenance = Soutenance.objects.filter(id=instance.soutenance_id).values('internship_id').first()
+    if soutenance:
+        user_ids.update(_soutenance_audience(soutenance['internship_id'], instance.soutenance_id))
+    invalidate_feeds(user_ids)
+
+
+@receiver(post_init, sender=Internship)
+def remember_loaded_participants(sender, instance, **kwargs):
+    instance._loaded_participants = {instance.__dict__.get('student_id_id'), instance.__dict__.get('teacher_id_id')}
+
+
+# Connected before invalidate_internship_feeds, which moves _loaded_participants on
+@receiver(post_save, sender=Internship)
+def record_removed_participant_tombstones(sender, instance, created, **kwargs):
+    # A replaced student or teacher no longer sees the internship: their offline copy must drop it
+    if created:
+        return
+    removed = getattr(instance, '_loaded_participants', set()) - {instance.student_id_id, instance.teacher_id_id}
+    record_tombstones('internship', instance.id, removed)
+
+
+@receiver(post_save, sender=Internship)
+def invalidate_internship_feeds(sender, instance, created, **kwargs):
+    participants = {instance.student_id_id, instance.teacher_id_id}
+    previous = getattr(instance, '_loaded_participants', set())
+    instance._loaded_participants = participants
+    # A new internship has no soutenance yet
+    if created:
+        return
+    # A reassigned student or teacher loses the soutenances from their feed
+    user_ids = participants | previous
+    user_ids.update(
+        Jury.objects.filter(soutenance__internship=instance).values_list('member_id', flat=True)
+    )
+    invalidate_feeds(user_ids)
+
+
+@receiver(post_delete, sender=Internship)
+def record_internship_tombstones(sender, instance, **kwargs):
+    record_tombstones('internship', instance.id, [instance.student_id_id, instance.teacher_id_id])
+
+
+@receiver(post_delete, sender=TeacherInvitation)
+def record_invitation_tombstones(sender, instance, **kwargs):
+    record_tombstones('invitation', instance.id, [instance.student_id, instance.teacher_id])
+
+
+@receiver(post_init, sender=Internship)
+@receiver(post_init, sender=TeacherInvitation)
+def remember_loaded_status(sender, instance, **kwargs):
+    # Read from __dict__ so a deferred status field is not fetched
+    instance._loaded_status = instance.__dict__.get('status')
+
+
+@receiver(post_save, sender=Internship)
+def publish_internship_status(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_loaded_status', None)
+    instance._loaded_status = instance.status
+    if created or previous is None or previous == instance.status:
+        return
+    publish_on_commit([instance.student_id_id, instance.teacher_id_id], 'internship.status_changed', {
+        'internship_id': instance.id,
+        'status': instance.status,
+        'previous_status': previous,
+    })
+
+
+@receiver(post_save, sender=TeacherInvitation)
+def publish_invitation_change(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_loaded_status', None)
+    instance._loaded_status = instance.status
+    if created:
+        event = 'invitation.created'
+    elif previous is not None and previous != instance.status:
+        event = 'invitation.answered'
+    else:
+        return
+    publish_on_commit([instance.student_id, instance.teacher_id], event, {
+        'invitation_id': instance.id,
+        'internship_id': instance.internship_id,
+        'status': instance.status,
+    })
@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Internship, TeacherInvitation, SyncTombstone
+
+
+def sync_overlap():
+    """
+    Rows written by transactions that commit just after a poll can carry an
+    updated_at slightly older than the poll itself. Cursors trail the clock by
+    this window, so such rows are sent again on the next poll instead of lost.
+    """
+    return timedelta(seconds=getattr(settings, 'SYNC_OVERLAP_SECONDS', 5))
+
+
+def tombstone_retention():
+    return timedelta(days=getattr(settings, 'SYNC_TOMBSTONE_RETENTION_DAYS', 30))
+
+
+def format_cursor(value):
+    """UTC timestamp ending in Z: nothing in it needs escaping in a query string"""
+    return value.astimezone(dt_timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+
+def parse_cursor(value):
+    """Return the datetime of a cursor, or None for an initial sync; raises ValueError when invalid"""
+    if not value:
+        return None
+    # Older cursors carried a +00:00 offset, which an unencoded query string turns into a space
+    cursor = datetime.fromisoformat(value.replace(' ', '+'))
+    if timezone.is_naive(cursor):
+        raise ValueError('Cursor must include a timezone.')
+    return cursor
+
+
+def changes_since(user, since):
+    """
+    Collect the internships and invitations visible to a user that changed after
+    `since`, plus the ids of the ones deleted since then.
+    """
+    now = timezone.now()
+    reset = since is None or since < now - tombstone_retention()
+    if reset:
+        since = None
+
+    internships = Internship.objects.visible_to(user).with_people()
+    invitations = TeacherInvitation.objects.visible_to(user).with_people()
+    deleted = {'internships': [], 'invitations': []}
+
+    if since is not None:
+        internships = internships.filter(updated_at__gt=since)
+        invitations = invitations.filter(updated_at__gt=since)
+        tombstones = SyncTombstone.objects.filter(
+            user_id=user.id, deleted_at__gt=since
+        ).values_list('model', 'object_id')
+        for model, object_id in tombstones:
+            key = 'internships' if model == 'internship' else 'invitations'
+            deleted[key].append(object_id)
+
+    cursor = now - sync_overlap()
+    if since is not None and cursor < since:
+        cursor = since
+    return {
+        'reset': reset,
+        'cursor': format_cursor(cursor),
+        'internships': internships.order_by('updated_at', 'id'),
+        'invitations': invitations.order_by('updated_at', 'id'),
+        'deleted': deleted,
+    }
+
+
+def record_tombstones(model, object_id, user_ids):
+    SyncTombstone.objects.bulk_create([
+        SyncTombstone(user_id=user_id, model=model, object_id=object_id)
+        for user_id in set(user_ids) if user_id
+    ])
+
+
+def prune_tombstones():
+    """Delete tombstones older than the retention window; returns how many were removed"""
+    deleted, _ = SyncTombstone.objects.filter(
+        deleted_at__lt=timezone.now() - tombstone_retention()
+    ).delete()
+    return deleted
@@ -0,0 +1,67 @@
+from django.conf import settings
+from django.core.mail import send_mail
+
+from jobs.queue import task
+from .models import Internship, TeacherInvitation
+
+
+def _full_name(user):
+    return f"{user.first_name} {user.last_name}".strip() or user.username
+
+
+def _notify(user, subject, message):
+    if not user.email:
+        return
+    send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, [user.email])
+
+
+@task('internship.notify_invitation_sent')
+def notify_invitation_sent(invitation_id):
+    """Tell a teacher they were invited to supervise an internship"""
+    invitation = (
+        TeacherInvitation.objects
+        .select_related('internship', 'student', 'teacher')
+        .filter(id=invitation_id)
+        .first()
+    )
+    if invitation is None:
+        return
+    message = (
+        f"{_full_name(invitation.student)} invited you to supervise "
+        f"\"{invitation.internship.title}\" at {invitation.internship.company_name}."
+    )
+    if invitation.message:
+        message += f"\n\n{invitation.message}"
+    _notify(invitation.teacher, 'New supervision invitation', message)
+
+
+@task('internship.notify_invitation_answered')
+def notify_invitation_answered(invitation_id):
+    """Tell a student how a teacher answered their invitation"""
+    invitation = (
+        TeacherInvitation.objects
+        .select_related('internship', 'student', 'teacher')
+        .filter(id=invitation_id)
+        .first()
+    )
+    if invitation is None or invitation.status == 0:
+        return
+    answer = invitation.get_status_display().lower()
+    _notify(
+        invitation.student,
+        f'Supervision invitation {answer}',
+        f"{_full_name(invitation.teacher)} {answer} your invitation for \"{invitation.internship.title}\"."
+    )
+
+
+@task('internship.notify_internship_reviewed')
+def notify_internship_reviewed(internship_id, reason=''):
+    """Tell a student their internship was approved or rejected"""
+    internship = Internship.objects.select_related('student_id').filter(id=internship_id).first()
+    if internship is None:
+        return
+    decision = internship.get_status_display().lower()
+    message = f"Your internship \"{internship.title}\" at {internship.company_name} was {decision}."
+    if reason:
+        message += f"\n\nReason: {reason}"
+    _notify(internship.student_id, f'Internship {decision}', message)
@@ -0,0 +1,68 @@
+from datetime import date
+
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from authentication.models import Role
+from internship.models import Internship, TeacherInvitation
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestAccessQuerySets:
+    """Test cases for the visible_to / owned_by / addressed_to querysets"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.student = User.objects.create_user(
+            username='accessstudent', password='pass12345', role=Role.objects.get(name='Student')
+        )
+        self.teacher = User.objects.create_user(
+            username='accessteacher', password='pass12345', role=Role.objects.get(name='Teacher')
+        )
+        self.stranger = User.objects.create_user(
+            username='accessstranger', password='pass12345', role=Role.objects.get(name='Teacher')
+        )
+        self.internship = Internship.objects.create(
+            student_id=self.student, teacher_id=self.teacher, type='PFE', company_name='Acme',
+            cahier_de_charges='cahiers_de_charges/a.pdf',
+            start_date=date(2025, 2, 1), end_date=date(2025, 6, 30), title='Pipeline'
+        )
+        self.invitation = TeacherInvitation.objects.create(
+            internship=self.internship, student=self.student, teacher=self.stranger
+        )
+        self.client = APIClient()
+
+    def test_querysets_filter_by_participant(self):
+        """Test that each queryset only returns the rows of the given user"""
+        assert list(Internship.objects.visible_to(self.teacher)) == [self.internship]
+        assert list(Internship.objects.visible_to(self.stranger)) == []
+        assert list(Internship.objects.owned_by(self.teacher)) == []
+        assert list(TeacherInvitation.objects.addressed_to(self.stranger)) == [self.invitation]
+        assert list(TeacherInvitation.objects.owned_by(self.student)) == [self.invitation]
+        assert list(TeacherInvitation.objects.visible_to(self.teacher)) == []
+
+    def test_detail_is_a_single_query(self, django_assert_num_queries):
+        """Test that the detail endpoint loads and serializes from one joined query"""
+        self.client.force_authenticate(self.teacher)
+        with django_assert_num_queries(1):
+            response = self.client.get(f'/internship/{self.internship.id}/')
+        assert response.status_code == 200
+        assert response.data['teacher_name'] == 'accessteacher'
+
+    def test_detail_forbidden_and_missing(self):
+        """Test that forbidden rows answer 403 and unknown ids 404"""
+        self.client.force_authenticate(self.stranger)
+        assert self.client.get(f'/internship/{self.internship.id}/').status_code == 403
+        assert self.client.get('/internship/999999/').status_code == 404
+
+    def test_respond_only_to_own_invitations(self):
+        """Test that a teacher cannot answer an invitation addressed to someone else"""
+        self.client.force_authenticate(self.teacher)
+        response = self.client.patch(f'/internship/invitation/{self.invitation.id}/respond/', {'status': 1})
+        assert response.status_code == 403
+        self.client.force_authenticate(self.stranger)
+        response = self.client.patch(f'/internship/invitation/{self.invitation.id}/respond/', {'status': 2})
+        assert response.status_code == 200
@@ -0,0 +1,105 @@
+from datetime import date
+
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from authentication.models import Role
+from internship.models import Internship, TeacherInvitation
+from jobs.models import Job
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestBatchInvitations:
+    """Test cases for inviting several teachers in one request"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        teacher_role = Role.objects.get(name='Teacher')
+        self.student = User.objects.create_user(
+            username='batchstudent', password='pass12345', role=Role.objects.get(name='Student')
+        )
+        self.teachers = [
+            User.objects.create_user(username=f'batchteacher{i}', password='pass12345', role=teacher_role)
+            for i in range(3)
+        ]
+        self.internship = Internship.objects.create(
+            student_id=self.student, type='PFE', company_name='Acme',
+            cahier_de_charges='cahiers_de_charges/a.pdf',
+            start_date=date(2025, 2, 1), end_date=date(2025, 6, 30), title='Pipeline'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def _invite(self, teacher_ids):
+        return self.client.post('/internship/invite/batch/', {
+            'internship': self.internship.id, 'teachers': teacher_ids, 'message': 'Hello'
+        }, format='json')
+
+    def test_batch_reports_per_teacher_outcomes(self, django_assert_max_num_queries):
+        """Test that new, duplicate, missing and non-teacher ids each get an outcome"""
+        existing = TeacherInvitation.objects.create(
+            internship=self.internship, student=self.student, teacher=self.teachers[0]
+        )
+        ids = [teacher.id for teacher in self.teachers] + [self.student.id, 999999]
+        with django_assert_max_num_queries(12):
+            response = self._invite(ids)
+        assert response.status_code == 201
+        outcomes = [(result['teacher'], result['status']) for result in response.data['results']]
+        assert outcomes == [
+            (self.teachers[0].id, 'already_invited'),
+            (self.teachers[1].id, 'invited'),
+            (self.teachers[2].id, 'invited'),
+            (self.student.id, 'not_a_teacher'),
+            (999999, 'not_found'),
+        ]
+        assert response.data['results'][0]['invitation'] == existing.id
+        assert TeacherInvitation.objects.filter(internship=self.internship).count() == 3
+        assert Job.objects.filter(task='internship.notify_invitation_sent').count() == 2
+
+    def test_concurrent_invitations_are_not_reported_twice(self, monkeypatch):
+        """Test that a row a concurrent request inserted is reported as already invited"""
+        raced = TeacherInvitation.objects.create(
+            internship=self.internship, student=self.student, teacher=self.teachers[0]
+        )
+        filter_invitations = TeacherInvitation.objects.filter
+        calls = []
+
+        def stale_filter(*args, **kwargs):
+            calls.append(kwargs)
+            queryset = filter_invitations(*args, **kwargs)
+            # The first lookup ran before the concurrent request committed
+            return queryset.exclude(id=raced.id) if len(calls) == 1 else queryset
+        monkeypatch.setattr(TeacherInvitation.objects, 'filter', stale_filter)
+
+        response = self._invite([teacher.id for teacher in self.teachers])
+        results = {result['teacher']: result for result in response.data['results']}
+        assert results[self.teachers[0].id] == {
+            'teacher': self.teachers[0].id, 'status': 'already_invited', 'invitation': raced.id
+        }
+        assert results[self.teachers[1].id]['status'] == 'invited'
+        assert results[self.teachers[2].id]['status'] == 'invited'
+        assert Job.objects.filter(task='internship.notify_invitation_sent').count() == 2
+
+    def test_repeated_batch_creates_nothing(self):
+        """Test that resending the same batch is a no-op"""
+        ids = [teacher.id for teacher in self.teachers]
+        self._invite(ids)
+        response = self._invite(ids)
+        assert response.status_code == 200
+        assert {result['status'] for result in response.data['results']} == {'already_invited'}
+
+    def test_batch_requires_own_internship(self):
+        """Test that students cannot invite for someone else's internship"""
+        other = User.objects.create_user(
+            username='batchother', password='pass12345', role=Role.objects.get(name='Student')
+        )
+        self.client.force_authenticate(other)
+        assert self._invite([self.teachers[0].id]).status_code == 403
+
+    def test_batch_validates_teacher_list(self):
+        """Test that the teachers field must be a non-empty list of ids"""
+        assert self._invite([]).status_code == 400
+        assert self._invite(['abc']).status_code == 400
@@ -0,0 +1,103 @@
+import io
+import zipfile
+from datetime import date
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from rest_framework.test import APIClient
+
+from authentication.models import Role
+from internship.models import Internship
+from PfeManagement.zipstream import stream_zip
+from student.models import Report
+
+User = get_user_model()
+
+PNG = b'\x89PNG\r\n\x1a\n' + b'\x00' * 4000
+
+
+@pytest.mark.django_db
+class TestDocumentBundles:
+    """Test cases for the streamed ZIP bundles of internship documents"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, settings, tmp_path):
+        settings.MEDIA_ROOT = str(tmp_path)
+        self.admin = User.objects.create_user(
+            username='bundleadmin', password='pass12345', role=Role.objects.get(name='Administrator')
+        )
+        self.teacher = User.objects.create_user(
+            username='bundleteacher', password='pass12345', role=Role.objects.get(name='Teacher')
+        )
+        self.student = User.objects.create_user(
+            username='bundlestudent', password='pass12345', role=Role.objects.get(name='Student')
+        )
+        self.other = User.objects.create_user(
+            username='otherstudent', password='pass12345', role=Role.objects.get(name='Student')
+        )
+        self.supervised = self._internship(self.student, b'%PDF-1.4 ' + b'spec ' * 2000, status=1, teacher=self.teacher)
+        self.unsupervised = self._internship(self.other, PNG, status=0)
+        self.report = Report.objects.create(
+            name='Final', description='Report', added_by=self.student,
+            file_path=default_storage.save('reports/final.pdf', ContentFile(b'%PDF-1.4 report'))
+        )
+        self.client = APIClient()
+
+    def _internship(self, student, content, status, teacher=None):
+        name = default_storage.save(f'cahiers_de_charges/{student.username}.pdf', ContentFile(content))
+        return Internship.objects.create(
+            student_id=student, teacher_id=teacher, type='PFE', company_name='Acme', cahier_de_charges=name,
+            status=status, start_date=date(2025, 2, 1), end_date=date(2025, 6, 30)
+        )
+
+    def _archive(self, response):
+        assert response.status_code == 200
+        assert response.streaming
+        assert response['Content-Type'] == 'application/zip'
+        return zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+
+    def test_cohort_bundle_follows_the_export_filters(self):
+        """Test that admins get the cahiers de charges matching the filters"""
+        self.client.force_authenticate(self.admin)
+        archive = self._archive(self.client.get('/internship/admin/export/documents/'))
+        assert sorted(archive.namelist()) == [
+            f'bundlestudent/cahier-de-charges/{self.supervised.id}-bundlestudent.pdf',
+            f'otherstudent/cahier-de-charges/{self.unsupervised.id}-otherstudent.pdf',
+        ]
+        assert archive.testzip() is None
+
+        archive = self._archive(self.client.get('/internship/admin/export/documents/', {'status': 1}))
+        assert archive.namelist() == [f'bundlestudent/cahier-de-charges/{self.supervised.id}-bundlestudent.pdf']
+
+        self.client.force_authenticate(self.student)
+        assert self.client.get('/internship/admin/export/documents/').status_code == 403
+
+    def test_supervisor_bundle_holds_only_their_students(self):
+        """Test that teachers get the cahiers de charges and reports of their students"""
+        self.client.force_authenticate(self.teacher)
+        archive = self._archive(self.client.get('/internship/teacher/documents/'))
+        assert archive.namelist() == [
+            f'bundlestudent/cahier-de-charges/{self.supervised.id}-bundlestudent.pdf',
+            f'bundlestudent/reports/{self.report.id}-final.pdf',
+        ]
+        assert archive.read(archive.namelist()[1]) == b'%PDF-1.4 report'
+
+    def test_compressed_files_are_stored(self):
+        """Test that already compressed content is stored and the rest deflated"""
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(stream_zip([
+            ('image.png', [PNG]), ('spec.pdf', [b'%PDF-1.4 ', b'spec ' * 2000]),
+        ]))))
+        assert archive.getinfo('image.png').compress_type == zipfile.ZIP_STORED
+        assert archive.getinfo('spec.pdf').compress_type == zipfile.ZIP_DEFLATED
+        assert archive.read('image.png') == PNG
+
+    def test_missing_files_are_listed(self):
+        """Test that a file gone from storage does not break the archive"""
+        default_storage.delete(self.unsupervised.cahier_de_charges.name)
+        self.client.force_authenticate(self.admin)
+        archive = self._archive(self.client.get('/internship/admin/export/documents/'))
+        missing = f'otherstudent/cahier-de-charges/{self.unsupervised.id}-otherstudent.pdf'
+        assert missing not in archive.namelist()
+        assert archive.read('missing-files.txt').decode() == missing + '\n'
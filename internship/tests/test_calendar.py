@@ -0,0 +1,105 @@
+from datetime import date, time
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from authentication.models import Role
+from internship.ical import make_feed_token
+from internship.models import Internship, Soutenance, Jury
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestCalendarFeed:
+    """Test cases for the per-user soutenance calendar feeds"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        cache.clear()
+        self.student = User.objects.create_user(
+            username='calstudent', password='pass12345', role=Role.objects.get(name='Student')
+        )
+        self.teacher = User.objects.create_user(
+            username='calteacher', password='pass12345', role=Role.objects.get(name='Teacher')
+        )
+        self.juror = User.objects.create_user(
+            username='caljuror', password='pass12345', role=Role.objects.get(name='Teacher')
+        )
+        self.internship = Internship.objects.create(
+            student_id=self.student, teacher_id=self.teacher, type='PFE', company_name='Acme, Inc',
+            cahier_de_charges='cahiers_de_charges/a.pdf', status=1,
+            start_date=date(2025, 2, 1), end_date=date(2025, 6, 30), title='Pipeline'
+        )
+        self.soutenance = Soutenance.objects.create(
+            internship=self.internship, date=date(2025, 7, 10), time=time(9, 30), room='A12'
+        )
+        Jury.objects.create(soutenance=self.soutenance, member=self.juror)
+        self.client = APIClient()
+
+    def _feed_url(self, user):
+        return f'/internship/calendar/{make_feed_token(user)}.ics'
+
+    def test_feed_lists_soutenances_of_every_participant(self):
+        """Test that students, supervisors and jury members all see the defense"""
+        for user in (self.student, self.teacher, self.juror):
+            response = self.client.get(self._feed_url(user))
+            assert response.status_code == 200
+            assert response['Content-Type'].startswith('text/calendar')
+            body = response.content.decode()
+            assert body.count('BEGIN:VEVENT') == 1
+            assert 'DTSTART:20250710T093000Z' in body
+            assert 'Acme\\, Inc' in body
+
+    def test_link_endpoint_returns_feed_url(self):
+        """Test that the authenticated link endpoint hands out the tokenized URL"""
+        self.client.force_authenticate(self.student)
+        response = self.client.get('/internship/calendar/')
+        assert response.data['url'].endswith(self._feed_url(self.student))
+
+    def test_tampered_token_is_rejected(self):
+        """Test that a forged token does not expose another user's feed"""
+        response = self.client.get(f'/internship/calendar/{self.student.pk}:forged.ics')
+        assert response.status_code == 404
+
+    def test_unchanged_feed_returns_304_without_rendering(self, django_assert_num_queries):
+        """Test that a matching ETag gets a 304 from the cached feed"""
+        first = self.client.get(self._feed_url(self.teacher))
+        # The active-user check and the read of the shared database cache
+        with django_assert_num_queries(2):
+            response = self.client.get(self._feed_url(self.teacher), HTTP_IF_NONE_MATCH=first['ETag'])
+        assert response.status_code == 304
+
+    def test_feed_is_invalidated_when_soutenance_changes(self):
+        """Test that moving a soutenance refreshes the cached feeds"""
+        first = self.client.get(self._feed_url(self.juror))
+        self.soutenance.room = 'B7'
+        self.soutenance.save()
+        response = self.client.get(self._feed_url(self.juror), HTTP_IF_NONE_MATCH=first['ETag'])
+        assert response.status_code == 200
+        assert 'LOCATION:B7' in response.content.decode()
+
+    def test_feed_is_invalidated_when_jury_changes(self):
+        """Test that a new jury member sees the soutenance right away"""
+        other = User.objects.create_user(username='caljuror2', password='pass12345')
+        assert 'BEGIN:VEVENT' not in self.client.get(self._feed_url(other)).content.decode()
+        Jury.objects.create(soutenance=self.soutenance, member=other)
+        assert 'BEGIN:VEVENT' in self.client.get(self._feed_url(other)).content.decode()
+
+    def test_previous_participants_lose_the_soutenance(self):
+        """Test that reassigning the teacher or a jury member refreshes the previous user's feed"""
+        for user in (self.teacher, self.juror):
+            assert 'BEGIN:VEVENT' in self.client.get(self._feed_url(user)).content.decode()
+        replacement = User.objects.create_user(
+            username='calteacher2', password='pass12345', role=Role.objects.get(name='Teacher')
+        )
+        internship = Internship.objects.get(id=self.internship.id)
+        internship.teacher_id = replacement
+        internship.save()
+        jury = Jury.objects.get(soutenance=self.soutenance, member=self.juror)
+        jury.member = replacement
+        jury.save()
+        for user in (self.teacher, self.juror):
+            assert 'BEGIN:VEVENT' not in self.client.get(self._feed_url(user)).content.decode()
@@ -0,0 +1,87 @@
+from datetime import date
+
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from authentication.models import Role
+from internship.models import Internship
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+    """Test cases for ETag / Last-Modified handling on internship endpoints"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.student = User.objects.create_user(
+            username='etagstudent', password='pass12345', role=Role.objects.get(name='Student')
+        )
+        self.internship = Internship.objects.create(
+            student_id=self.student, type='PFE', company_name='Acme',
+            cahier_de_charges='cahiers_de_charges/a.pdf',
+            start_date=date(2025, 2, 1), end_date=date(2025, 6, 30), title='Pipeline'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def test_detail_returns_validators(self):
+        """Test that a detail response carries ETag and Last-Modified"""
+        response = self.client.get(f'/internship/{self.internship.id}/')
+        assert response.status_code == 200
+        assert response['ETag'].startswith('"')
+        assert 'Last-Modified' in response
+        assert 'Authorization' in response['Vary']
+
+    def test_detail_not_modified_skips_serialization(self, django_assert_num_queries):
+        """Test that a matching ETag gets a 304 from a single cheap query"""
+        etag = self.client.get(f'/internship/{self.internship.id}/')['ETag']
+        with django_assert_num_queries(1):
+            response = self.client.get(f'/internship/{self.internship.id}/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert response['ETag'] == etag
+
+    def test_detail_changes_etag_after_update(self):
+        """Test that an update invalidates the client's copy"""
+        etag = self.client.get(f'/internship/{self.internship.id}/')['ETag']
+        self.internship.title = 'Renamed'
+        self.internship.save()
+        response = self.client.get(f'/internship/{self.internship.id}/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.data['title'] == 'Renamed'
+
+    def test_detail_access_is_checked_before_validators(self):
+        """Test that another user's ETag probe is still forbidden"""
+        other = User.objects.create_user(username='etagother', password='pass12345')
+        self.client.force_authenticate(other)
+        assert self.client.get(f'/internship/{self.internship.id}/').status_code == 403
+
+    def test_list_etag_tracks_deletions(self):
+        """Test that removing a row changes the collection ETag"""
+        second = Internship.objects.create(
+            student_id=self.student, type='Stage', company_name='Globex',
+            cahier_de_charges='cahiers_de_charges/b.pdf',
+            start_date=date(2025, 7, 1), end_date=date(2025, 8, 31), title='Summer'
+        )
+        etag = self.client.get('/internship/my-internships/')['ETag']
+        assert self.client.get('/internship/my-internships/', HTTP_IF_NONE_MATCH=etag).status_code == 304
+        second.delete()
+        response = self.client.get('/internship/my-internships/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert len(response.data) == 1
+
+    def test_list_is_not_validated_by_date(self):
+        """Test that a list sends no Last-Modified, so If-Modified-Since cannot hide a deletion"""
+        second = Internship.objects.create(
+            student_id=self.student, type='Stage', company_name='Globex',
+            cahier_de_charges='cahiers_de_charges/b.pdf',
+            start_date=date(2025, 7, 1), end_date=date(2025, 8, 31), title='Summer'
+        )
+        first = self.client.get('/internship/my-internships/')
+        assert 'Last-Modified' not in first
+        second.delete()
+        response = self.client.get('/internship/my-internships/', HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT')
+        assert response.status_code == 200
+        assert len(response.data) == 1
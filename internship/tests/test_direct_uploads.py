@@ -0,0 +1,252 @@
+import datetime
+import io
+import threading
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from urllib.parse import parse_qs, unquote, urlsplit
+from urllib.request import Request, urlopen
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from authentication.models import Role
+from internship.models import Internship
+from jobs.models import Job
+from jobs.queue import run_pending
+from PfeManagement.objectstorage import ObjectStorage, presign
+from PfeManagement.zipstream import file_chunks, stream_zip
+from student.indexing import random_access
+
+User = get_user_model()
+
+
+class BucketHandler(BaseHTTPRequestHandler):
+    """Minimal S3 stand-in: objects in a dict, presigned query required"""
+    objects = {}
+
+    def log_message(self, *args):
+        pass
+
+    def _key(self):
+        """Object key of a correctly presigned request, else answer 403 and return None"""
+        parts = urlsplit(self.path)
+        query = {name: values[0] for name, values in parse_qs(parts.query).items()}
+        key = unquote(parts.path).split('/', 2)[2]
+        # Recompute the signature from what was actually sent, signed headers included
+        signed = [name for name in query.get('X-Amz-SignedHeaders', '').split(';') if name != 'host']
+        headers = {name: self.headers[name] for name in signed}
+        if 'X-Amz-Date' in query and None not in headers.values():
+            moment = datetime.datetime.strptime(query['X-Amz-Date'], '%Y%m%dT%H%M%SZ')
+            expected = presign(
+                self.command, key, headers=headers, expires=int(query['X-Amz-Expires']),
+                now=moment.replace(tzinfo=datetime.timezone.utc)
+            )
+            if expected == f'http://{self.headers["Host"]}{self.path}':
+                return key
+        self.send_response(403)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+        return None
+
+    def do_PUT(self):
+        key = self._key()
+        if key is None:
+            return
+        self.objects[key] = self.rfile.read(int(self.headers['Content-Length']))
+        self.send_response(200)
+        self.end_headers()
+
+    def do_HEAD(self):
+        key = self._key()
+        if key is None:
+            return
+        if key not in self.objects:
+            self.send_response(404)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(self.objects[key])))
+        self.end_headers()
+
+    def do_GET(self):
+        key = self._key()
+        if key is None:
+            return
+        body = self.objects.get(key)
+        if body is None:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        if self.headers.get('Range'):
+            start, end = self.headers['Range'].split('=')[1].split('-')
+            body = body[int(start):int(end) + 1]
+            self.send_response(206)
+        else:
+            self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_DELETE(self):
+        key = self._key()
+        if key is None:
+            return
+        self.objects.pop(key, None)
+        self.send_response(204)
+        self.end_headers()
+
+
+@pytest.fixture
+def bucket(settings):
+    BucketHandler.objects = {}
+    server = ThreadingHTTPServer(('127.0.0.1', 0), BucketHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    settings.OBJECT_STORAGE_ENDPOINT = f'http://127.0.0.1:{server.server_port}'
+    settings.OBJECT_STORAGE_BUCKET = 'test-bucket'
+    settings.OBJECT_STORAGE_ACCESS_KEY = 'access'
+    settings.OBJECT_STORAGE_SECRET_KEY = 'secret'
+    settings.STORAGES = {
+        **settings.STORAGES, 'default': {'BACKEND': 'PfeManagement.objectstorage.ObjectStorage'}
+    }
+    yield BucketHandler.objects
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.django_db
+class TestDirectUploads:
+    """Test cases for presigned uploads straight to object storage"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, bucket):
+        self.bucket = bucket
+        self.student = User.objects.create_user(
+            username='directstudent', password='pass12345', role=Role.objects.get(name='Student')
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def _upload(self, content, file_name='cahier.pdf', target='cahier_de_charges'):
+        response = self.client.post('/uploads/presign/', {
+            'target': target, 'file_name': file_name, 'size': len(content)
+        }, format='json')
+        assert response.status_code == 201
+        with urlopen(Request(response.data['url'], data=content, method='PUT', headers=response.data['headers'])):
+            pass
+        return self.client.post('/uploads/confirm/', {'upload_id': response.data['upload_id']}, format='json')
+
+    def test_confirmed_upload_is_attached_without_proxying(self):
+        """Test that an internship is created from an upload id instead of a file"""
+        content = b'%PDF-1.4\n' + b'0' * 5000
+        confirmed = self._upload(content)
+        assert confirmed.status_code == 200
+        key = confirmed.data['name']
+        assert key.startswith('cahiers_de_charges/') and key.endswith('/cahier.pdf')
+        assert self.bucket[key] == content
+
+        response = self.client.post('/internship/create/', {
+            'type': 'PFE', 'company_name': 'Acme', 'title': 'Pipeline',
+            'start_date': '2025-02-01', 'end_date': '2025-06-30',
+            'cahier_de_charges': confirmed.data['upload_id'],
+        }, format='multipart')
+        assert response.status_code == 201
+        internship = Internship.objects.get(student_id=self.student)
+        assert internship.cahier_de_charges.name == key
+        with internship.cahier_de_charges.open('rb') as handle:
+            assert handle.read() == content
+        assert 'X-Amz-Signature=' in internship.cahier_de_charges.url
+
+        # The same object cannot be attached to a second row
+        again = self.client.post('/internship/create/', {
+            'type': 'PFE', 'company_name': 'Acme', 'title': 'Again',
+            'start_date': '2025-02-01', 'end_date': '2025-06-30',
+            'cahier_de_charges': confirmed.data['upload_id'],
+        }, format='multipart')
+        assert again.status_code == 400
+
+    def test_disguised_upload_is_deleted_on_confirm(self):
+        """Test that the stored bytes are sniffed and rejected objects removed"""
+        confirmed = self._upload(b'MZ\x90\x00' + b'\x00' * 200)
+        assert confirmed.status_code == 415
+        assert self.bucket == {}
+
+    def test_presign_checks_declared_size_and_type(self):
+        """Test that limits are enforced before any URL is issued"""
+        too_large = self.client.post('/uploads/presign/', {
+            'target': 'report', 'file_name': 'r.pdf', 'size': 11 * 1024 * 1024
+        }, format='json')
+        assert too_large.status_code == 413
+        wrong_type = self.client.post('/uploads/presign/', {
+            'target': 'profile_picture', 'file_name': 'me.pdf', 'size': 100
+        }, format='json')
+        assert wrong_type.status_code == 415
+
+    def test_upload_ids_are_bound_to_the_uploader(self):
+        """Test that another user cannot confirm or attach someone else's upload"""
+        response = self.client.post('/uploads/presign/', {
+            'target': 'report', 'file_name': 'r.pdf', 'size': 10
+        }, format='json')
+        other = User.objects.create_user(
+            username='directother', password='pass12345', role=Role.objects.get(name='Student')
+        )
+        self.client.force_authenticate(other)
+        confirmed = self.client.post('/uploads/confirm/', {'upload_id': response.data['upload_id']}, format='json')
+        assert confirmed.status_code == 400
+
+    def test_upload_ids_need_an_authenticated_user(self):
+        """Test that an anonymous sign-up cannot attach a confirmed upload"""
+        confirmed = self._upload(b'\x89PNG\r\n\x1a\n' + b'0' * 100, file_name='me.png', target='profile_picture')
+        assert confirmed.status_code == 200
+        response = APIClient().post('/auth/add-user/', {
+            'username': 'anonymous', 'email': 'anonymous@example.com', 'password': 'pass12345',
+            'first_name': 'Anon', 'last_name': 'Ymous', 'profile_picture': confirmed.data['upload_id'],
+        }, format='multipart')
+        assert response.status_code == 400
+        assert 'profile_picture' in response.data
+
+    def test_unattached_uploads_are_discarded(self):
+        """Test that objects no row attached are deleted once their ids have expired"""
+        abandoned = self._upload(b'%PDF-1.4 abandoned')
+        attached = self._upload(b'%PDF-1.4 attached')
+        response = self.client.post('/internship/create/', {
+            'type': 'PFE', 'company_name': 'Acme', 'title': 'Pipeline',
+            'start_date': '2025-02-01', 'end_date': '2025-06-30',
+            'cahier_de_charges': attached.data['upload_id'],
+        }, format='multipart')
+        assert response.status_code == 201
+
+        jobs = Job.objects.filter(task='administrator.discard_unattached_upload')
+        assert jobs.count() == 2
+        assert run_pending() == 0
+        jobs.update(run_at=timezone.now())
+        run_pending()
+        assert list(self.bucket) == [attached.data['name']]
+
+    def test_missing_objects_are_left_out_of_archives(self):
+        """Test that a 404 from the bucket is a missing file, not a truncated archive"""
+        self.bucket['reports/kept.pdf'] = b'%PDF-1.4 kept'
+        storage = ObjectStorage()
+        with pytest.raises(FileNotFoundError):
+            storage.open('reports/gone.pdf')
+        # Read from the response as it arrives, not downloaded to a temporary file first
+        with storage.open('reports/kept.pdf') as handle:
+            assert not handle.seekable()
+            assert handle.size == len(b'%PDF-1.4 kept')
+            assert handle.read(4) == b'%PDF'
+        # Parsers that seek get a copy
+        with storage.open('reports/kept.pdf') as handle, random_access(handle) as readable:
+            readable.seek(9)
+            assert readable.read() == b'kept'
+
+        entries = [
+            (name, file_chunks(SimpleNamespace(storage=storage, name=f'reports/{name}')))
+            for name in ('gone.pdf', 'kept.pdf')
+        ]
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(stream_zip(entries))))
+        assert archive.read('kept.pdf') == b'%PDF-1.4 kept'
+        assert archive.read('missing-files.txt').decode().split() == ['gone.pdf']
@@ -0,0 +1,249 @@
+import asyncio
+import threading
+from datetime import date
+from urllib.parse import parse_qs, urlsplit
+
+import psycopg
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, connections
+from django.test import AsyncRequestFactory, RequestFactory
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from authentication.models import Role
+from internship import events
+from internship.models import Internship, TeacherInvitation
+from internship.views import event_stream
+
+User = get_user_model()
+
+
+@pytest.fixture
+def broker(monkeypatch):
+    broker = events.InProcessBroker()
+    monkeypatch.setattr(events, '_broker', broker)
+    return broker
+
+
+class TestInProcessBroker:
+    """Test cases for the in-process event fan-out"""
+
+    def test_publish_from_another_thread_reaches_subscriber(self, broker):
+        """Test that events published by a worker thread land on the stream's loop"""
+        async def scenario():
+            subscription = broker.subscribe(7)
+            other = broker.subscribe(8)
+            thread = threading.Thread(target=broker.publish, args=([7], 'invitation.created', {'invitation_id': 1}))
+            thread.start()
+            message = await asyncio.wait_for(subscription.get(), timeout=1)
+            thread.join()
+            assert other.queue.empty()
+            broker.unsubscribe(subscription)
+            broker.unsubscribe(other)
+            return message
+
+        message = asyncio.run(scenario())
+        assert message == {'event': 'invitation.created', 'data': {'invitation_id': 1}}
+        assert broker.subscriber_count() == 0
+
+    def test_refused_with_several_server_processes(self, broker, monkeypatch):
+        """Test that only a shared broker may serve events from several workers"""
+        events.check_broker(1)
+        with pytest.raises(ImproperlyConfigured):
+            events.check_broker(4)
+        monkeypatch.setattr(events, '_broker', events.PostgresNotifyBroker())
+        events.check_broker(4)
+
+
+class ListeningConnection:
+    """What the listener needs of a psycopg connection, for databases that are not PostgreSQL"""
+
+    def __init__(self, notifies):
+        self.executed = []
+        self._notifies = notifies
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def execute(self, query):
+        self.executed.append(query)
+
+    def notifies(self):
+        yield from self._notifies
+
+
+class TestPostgresNotifyBroker:
+    """Test cases for the LISTEN/NOTIFY fan-out across processes"""
+
+    def test_listener_delivers_notifications(self, monkeypatch):
+        """Test that the listener reads psycopg notifications on a dedicated autocommit connection"""
+        broker = events.PostgresNotifyBroker()
+        delivered = []
+        monkeypatch.setattr(broker, 'deliver', lambda user_ids, message: delivered.append((user_ids, message)))
+        listening = ListeningConnection([
+            psycopg.Notify(broker.channel, 'not json', 1),
+            psycopg.Notify(broker.channel, '{"users": [7], "event": "invitation.created", "data": {"id": 1}}', 1),
+        ])
+        opened = []
+
+        def connect(**params):
+            opened.append(params)
+            return listening
+        monkeypatch.setattr(events.psycopg, 'connect', connect)
+
+        broker._listen()
+        assert opened[0]['autocommit'] is True
+        assert 'pool' not in opened[0]
+        assert listening.executed == [f'LISTEN {broker.channel}']
+        assert delivered == [([7], {'event': 'invitation.created', 'data': {'id': 1}})]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_notifications_reach_subscribers_through_the_server(self):
+        """Test a publish and listen round trip through PostgreSQL"""
+        if connection.vendor != 'postgresql':
+            pytest.skip('LISTEN/NOTIFY needs PostgreSQL')
+        broker = events.PostgresNotifyBroker()
+
+        def publish():
+            broker.publish([7], 'invitation.created', {'id': 1})
+            connections.close_all()
+
+        async def scenario():
+            subscription = broker.subscribe(7)
+            # The listener thread starts listening a little after the subscription
+            for _ in range(50):
+                await asyncio.to_thread(publish)
+                try:
+                    return await asyncio.wait_for(subscription.get(), timeout=0.2)
+                except asyncio.TimeoutError:
+                    continue
+
+        try:
+            assert asyncio.run(scenario()) == {'event': 'invitation.created', 'data': {'id': 1}}
+        finally:
+            # The listener's connection would keep the test database from being dropped
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT pg_terminate_backend(pid) FROM pg_stat_activity WHERE query = %s",
+                    [f'LISTEN {broker.channel}']
+                )
+            broker._listener.join(timeout=5)
+
+
+@pytest.mark.django_db
+class TestEventPublishing:
+    """Test cases for the events published on invitation and internship changes"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, broker, monkeypatch):
+        self.published = []
+        monkeypatch.setattr(broker, 'publish', lambda users, event, data: self.published.append((set(users), event)))
+        self.student = User.objects.create_user(
+            username='eventstudent', password='pass12345', role=Role.objects.get(name='Student')
+        )
+        self.teacher = User.objects.create_user(
+            username='eventteacher', password='pass12345', role=Role.objects.get(name='Teacher')
+        )
+        self.internship = Internship.objects.create(
+            student_id=self.student, type='PFE', company_name='Acme',
+            cahier_de_charges='cahiers_de_charges/a.pdf',
+            start_date=date(2025, 2, 1), end_date=date(2025, 6, 30), title='Pipeline'
+        )
+
+    def test_invitation_lifecycle_events(self, django_capture_on_commit_callbacks):
+        """Test that creating and answering an invitation notify both parties"""
+        with django_capture_on_commit_callbacks(execute=True):
+            invitation = TeacherInvitation.objects.create(
+                internship=self.internship, student=self.student, teacher=self.teacher
+            )
+        with django_capture_on_commit_callbacks(execute=True):
+            invitation = TeacherInvitation.objects.get(id=invitation.id)
+            invitation.message = 'edited'
+            invitation.save()
+            invitation.status = 1
+            invitation.save()
+        users = {self.student.id, self.teacher.id}
+        assert self.published == [(users, 'invitation.created'), (users, 'invitation.answered')]
+
+    def test_internship_status_change_event(self, django_capture_on_commit_callbacks):
+        """Test that only status changes of an internship are published"""
+        with django_capture_on_commit_callbacks(execute=True):
+            self.internship.title = 'Renamed'
+            self.internship.save()
+            self.internship.status = 1
+            self.internship.save()
+        assert self.published == [({self.student.id}, 'internship.status_changed')]
+
+    def test_rolled_back_change_is_not_published(self, django_capture_on_commit_callbacks):
+        """Test that events wait for the transaction to commit"""
+        with django_capture_on_commit_callbacks(execute=False) as callbacks:
+            self.internship.status = 2
+            self.internship.save()
+        assert len(callbacks) == 1
+        assert self.published == []
+
+
+@pytest.mark.django_db
+class TestEventStreamView:
+    """Test cases for the server-sent events endpoint"""
+
+    def _ticket(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.post('/internship/events/ticket/')
+        assert response.status_code == 201
+        return parse_qs(urlsplit(response.data['url']).query)['ticket'][0]
+
+    def test_stream_requires_a_valid_ticket(self):
+        """Test that anonymous streams, and access tokens in the URL, are refused"""
+        user = User.objects.create_user(username='ticketviewer', password='pass12345')
+        for query in ({'ticket': 'garbage'}, {'token': str(AccessToken.for_user(user))}):
+            request = AsyncRequestFactory().get('/internship/events/', query)
+            assert async_to_sync(event_stream)(request).status_code == 401
+
+    def test_tickets_are_single_use(self, broker):
+        """Test that a logged stream URL cannot be replayed"""
+        user = User.objects.create_user(username='replayviewer', password='pass12345')
+        ticket = self._ticket(user)
+        first = async_to_sync(event_stream)(AsyncRequestFactory().get('/internship/events/', {'ticket': ticket}))
+        assert first.status_code == 200
+        again = async_to_sync(event_stream)(AsyncRequestFactory().get('/internship/events/', {'ticket': ticket}))
+        assert again.status_code == 401
+
+    def test_stream_is_refused_under_wsgi(self):
+        """Test that a WSGI request gets 501 instead of a stream that would never be sent"""
+        request = RequestFactory().get('/internship/events/', {'ticket': 'any'})
+        response = async_to_sync(event_stream)(request)
+        assert response.status_code == 501
+
+    def test_stream_delivers_published_events(self, broker):
+        """Test that the stream opens immediately and forwards events as SSE frames"""
+        user = User.objects.create_user(username='eventviewer', password='pass12345')
+        request = AsyncRequestFactory().get('/internship/events/', {'ticket': self._ticket(user)})
+
+        async def scenario():
+            response = await event_stream(request)
+            assert response['Content-Type'] == 'text/event-stream'
+            content = response.streaming_content.__aiter__()
+            opening = await content.__anext__()
+            broker.publish([user.id], 'internship.status_changed', {'internship_id': 3, 'status': 1})
+            frame = await asyncio.wait_for(content.__anext__(), timeout=1)
+            return opening, frame
+
+        opening, frame = async_to_sync(scenario)()
+        assert opening == b'retry: 5000\n\n'
+        assert frame == b'event: internship.status_changed\ndata: {"internship_id": 3, "status": 1}\n\n'
+
+    def test_stream_accepts_the_authorization_header(self):
+        """Test that clients able to send headers authenticate as on the rest of the API"""
+        user = User.objects.create_user(username='headerviewer', password='pass12345')
+        request = AsyncRequestFactory().get(
+            '/internship/events/', headers={'Authorization': f'Bearer {AccessToken.for_user(user)}'}
+        )
+        assert async_to_sync(event_stream)(request).status_code == 200
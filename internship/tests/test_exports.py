@@ -0,0 +1,92 @@
+import csv
+import io
+from datetime import date
+
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from authentication.models import Role
+from internship.models import Internship, TeacherInvitation
+
+User = get_user_model()
+
+
+def _read_csv(response):
+    content = b''.join(response.streaming_content).decode()
+    return list(csv.reader(io.StringIO(content)))
+
+
+@pytest.mark.django_db
+class TestExportViews:
+    """Test cases for the CSV export endpoints"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.admin = User.objects.create_user(
+            username='exportadmin', password='pass12345', role=Role.objects.get(name='Administrator')
+        )
+        self.student = User.objects.create_user(
+            username='exportstudent', password='pass12345', first_name='Amal', last_name='Ben',
+            role=Role.objects.get(name='Student')
+        )
+        self.teacher = User.objects.create_user(
+            username='exportteacher', password='pass12345', role=Role.objects.get(name='Teacher')
+        )
+        self.pfe = Internship.objects.create(
+            student_id=self.student, teacher_id=self.teacher, type='PFE', company_name='Acme',
+            cahier_de_charges='cahiers_de_charges/a.pdf', status=1,
+            start_date=date(2025, 2, 1), end_date=date(2025, 6, 30), title='Pipeline'
+        )
+        self.stage = Internship.objects.create(
+            student_id=self.student, type='Stage', company_name='Globex',
+            cahier_de_charges='cahiers_de_charges/b.pdf', status=0,
+            start_date=date(2025, 7, 1), end_date=date(2025, 8, 31), title='Summer'
+        )
+        TeacherInvitation.objects.create(internship=self.stage, student=self.student, teacher=self.teacher)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_export_internships_streams_all_rows(self):
+        """Test that every internship is exported with student and teacher columns"""
+        response = self.client.get('/internship/admin/export/internships/')
+        assert response.status_code == 200
+        assert response.streaming
+        rows = _read_csv(response)
+        header, body = rows[0], rows[1:]
+        assert header[0] == 'id'
+        by_title = {row[header.index('title')]: row for row in body}
+        assert by_title['Pipeline'][header.index('student_name')] == 'Amal Ben'
+        assert by_title['Pipeline'][header.index('teacher_username')] == 'exportteacher'
+        assert by_title['Summer'][header.index('teacher_username')] == ''
+
+    def test_export_internships_filters(self):
+        """Test that status, type and date filters narrow the export"""
+        response = self.client.get('/internship/admin/export/internships/', {'type': 'PFE'})
+        assert [row[1] for row in _read_csv(response)[1:]] == ['Pipeline']
+
+        response = self.client.get('/internship/admin/export/internships/', {'date_from': '2025-06-01'})
+        assert [row[1] for row in _read_csv(response)[1:]] == ['Summer']
+
+        response = self.client.get('/internship/admin/export/internships/', {'status': 1})
+        assert [row[1] for row in _read_csv(response)[1:]] == ['Pipeline']
+
+    def test_export_rejects_invalid_filter(self):
+        """Test that an invalid date is refused before streaming starts"""
+        response = self.client.get('/internship/admin/export/internships/', {'date_to': '31/12/2025'})
+        assert response.status_code == 400
+
+    def test_export_invitations(self):
+        """Test that invitations are exported with internship and company columns"""
+        response = self.client.get('/internship/admin/export/invitations/')
+        rows = _read_csv(response)
+        header = rows[0]
+        assert len(rows) == 2
+        assert rows[1][header.index('company_name')] == 'Globex'
+        assert rows[1][header.index('status')] == 'Pending'
+
+    def test_export_requires_administrator(self):
+        """Test that non-administrators cannot export"""
+        self.client.force_authenticate(self.student)
+        response = self.client.get('/internship/admin/export/internships/')
+        assert response.status_code == 403
@@ -0,0 +1,80 @@
+from datetime import date
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from authentication.models import Role
+from internship.models import Internship, TeacherInvitation
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestSparseFieldsets:
+    """Test cases for ?fields= and ?expand= on internship endpoints"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.student = User.objects.create_user(
+            username='sparsestudent', password='pass12345', first_name='Sara', last_name='Lee',
+            role=Role.objects.get(name='Student')
+        )
+        self.teacher = User.objects.create_user(
+            username='sparseteacher', password='pass12345', role=Role.objects.get(name='Teacher')
+        )
+        self.internship = Internship.objects.create(
+            student_id=self.student, teacher_id=self.teacher, type='PFE', company_name='Acme',
+            cahier_de_charges='cahiers_de_charges/a.pdf',
+            start_date=date(2025, 2, 1), end_date=date(2025, 6, 30), title='Pipeline'
+        )
+        TeacherInvitation.objects.create(internship=self.internship, student=self.student, teacher=self.teacher)
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def _get(self, url, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        return response, [query['sql'] for query in queries.captured_queries]
+
+    def test_fields_prune_the_response_and_the_query(self):
+        """Test that only the requested fields are returned and their columns loaded"""
+        response, queries = self._get('/internship/my-internships/', fields='id,title,status_display')
+        assert response.status_code == 200
+        assert response.data == [{'id': self.internship.id, 'title': 'Pipeline', 'status_display': 'Pending'}]
+        listing = queries[-1]
+        assert 'JOIN' not in listing
+        assert '"description"' not in listing
+
+    def test_computed_names_join_only_the_needed_user(self):
+        """Test that student_name joins the student row and reads just its name columns"""
+        response, queries = self._get('/internship/my-internships/', fields='id,student_name')
+        assert response.data[0]['student_name'] == 'Sara Lee'
+        listing = queries[-1]
+        assert listing.count('JOIN') == 1
+        assert '"password"' not in listing
+
+    def test_default_response_is_unchanged(self):
+        """Test that every field is returned without parameters"""
+        response, _ = self._get('/internship/my-internships/')
+        assert set(response.data[0]) >= {'student_name', 'teacher_name', 'status_display', 'description'}
+
+    def test_expand_nests_related_objects(self):
+        """Test that expanded relations are returned as objects"""
+        response, _ = self._get(f'/internship/{self.internship.id}/', fields='id', expand='teacher_id')
+        assert response.status_code == 200
+        assert response.data['teacher_id']['username'] == 'sparseteacher'
+        assert set(response.data) == {'id', 'teacher_id'}
+
+        response, _ = self._get('/internship/invitations/', fields='status', expand='internship')
+        assert response.data[0]['internship']['title'] == 'Pipeline'
+
+    def test_unknown_fields_are_rejected(self):
+        """Test that misspelled or non-expandable fields return 400"""
+        response, _ = self._get('/internship/my-internships/', fields='id,titel')
+        assert response.status_code == 400
+        assert 'titel' in response.data['error']
+        response, _ = self._get('/internship/my-internships/', expand='title')
+        assert response.status_code == 400
@@ -0,0 +1,126 @@
+import io
+import zipfile
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import DatabaseError
+from rest_framework.test import APIClient
+
+from authentication.models import Role
+from internship.imports import InternshipImporter
+from internship.models import Internship
+
+User = get_user_model()
+
+HEADER = 'student,teacher,type,company_name,title,start_date,end_date,cahier_de_charges\n'
+
+
+def _csv(*lines):
+    return SimpleUploadedFile('import.csv', (HEADER + '\n'.join(lines) + '\n').encode(), content_type='text/csv')
+
+
+@pytest.mark.django_db
+class TestInternshipImport:
+    """Test cases for the bulk internship import"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, settings, tmp_path):
+        settings.MEDIA_ROOT = str(tmp_path)
+        self.admin = User.objects.create_user(
+            username='importadmin', password='pass12345', role=Role.objects.get(name='Administrator')
+        )
+        self.student = User.objects.create_user(
+            username='importstudent', email='student@uni.tn', password='pass12345',
+            role=Role.objects.get(name='Student')
+        )
+        self.teacher = User.objects.create_user(
+            username='importteacher', email='teacher@uni.tn', password='pass12345',
+            role=Role.objects.get(name='Teacher')
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_import_reports_each_row(self):
+        """Test that valid rows are created and invalid rows are reported"""
+        upload = _csv(
+            'importstudent,TEACHER@uni.tn,PFE,Acme,Pipeline,2025-02-01,2025-06-30,',
+            'student@uni.tn,,Stage,Globex,Summer,2025-07-01,2025-06-01,',
+            'unknown,,Stage,Globex,Summer,2025-07-01,2025-08-01,',
+            'importteacher,,Stage,Globex,Summer,not-a-date,2025-08-01,',
+        )
+        response = self.client.post('/internship/admin/import/', {'file': upload}, format='multipart')
+        assert response.status_code == 200
+        assert response.data['created'] == 1
+        rows = response.data['rows']
+        assert rows[0]['status'] == 'created'
+        internship = Internship.objects.get(id=rows[0]['id'])
+        assert internship.student_id == self.student
+        assert internship.teacher_id == self.teacher
+        assert internship.status == 0
+        assert rows[1]['errors'] == {'end_date': 'End date must be after start date.'}
+        assert 'student' in rows[2]['errors']
+        assert rows[3]['errors']['student'] == 'Selected user is not a student.'
+        assert 'start_date' in rows[3]['errors']
+
+    def test_import_attaches_archived_documents(self):
+        """Test that documents referenced by name are taken from the ZIP archive"""
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, 'w') as zf:
+            zf.writestr('docs/spec.pdf', b'%PDF-1.4 test')
+        upload = _csv(
+            'importstudent,,PFE,Acme,Pipeline,2025-02-01,2025-06-30,spec.pdf',
+            'importstudent,,PFE,Acme,Other,2025-02-01,2025-06-30,missing.pdf',
+        )
+        documents = SimpleUploadedFile('docs.zip', archive.getvalue(), content_type='application/zip')
+        response = self.client.post(
+            '/internship/admin/import/', {'file': upload, 'documents': documents}, format='multipart'
+        )
+        rows = response.data['rows']
+        internship = Internship.objects.get(id=rows[0]['id'])
+        assert internship.cahier_de_charges.name.startswith('cahiers_de_charges/spec')
+        assert internship.cahier_de_charges.read() == b'%PDF-1.4 test'
+        assert rows[1]['status'] == 'error'
+
+    def test_failed_batch_removes_its_documents(self, monkeypatch, tmp_path):
+        """Test that documents stored for a batch are deleted when its insert fails"""
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, 'w') as zf:
+            zf.writestr('spec.pdf', b'%PDF-1.4 test')
+
+        def failing_bulk_create(objs, *args, **kwargs):
+            raise DatabaseError('insert failed')
+        monkeypatch.setattr(Internship.objects, 'bulk_create', failing_bulk_create)
+        importer = InternshipImporter(
+            _csv('importstudent,,PFE,Acme,Pipeline,2025-02-01,2025-06-30,spec.pdf'), archive=archive
+        )
+        with pytest.raises(DatabaseError):
+            importer.run()
+        assert not list((tmp_path / 'cahiers_de_charges').iterdir())
+
+    def test_import_matches_emails_regardless_of_case(self):
+        """Test that users stored with a mixed-case e-mail are found by that e-mail"""
+        self.student.email = 'Jane@X.com'
+        self.student.save(update_fields=['email'])
+        upload = _csv(
+            'Jane@X.com,,PFE,Acme,Pipeline,2025-02-01,2025-06-30,',
+            'jane@x.com,,Stage,Globex,Summer,2025-07-01,2025-08-01,',
+        )
+        rows = InternshipImporter(upload).run()
+        assert [row['status'] for row in rows] == ['created', 'created']
+        assert Internship.objects.filter(student_id=self.student).count() == 2
+
+    def test_import_is_batched(self, django_assert_max_num_queries):
+        """Test that each batch resolves users and inserts in a constant number of queries"""
+        upload = _csv(*[
+            f'importstudent,importteacher,PFE,Acme,Row {i},2025-02-01,2025-06-30,' for i in range(20)
+        ])
+        with django_assert_max_num_queries(12):
+            rows = InternshipImporter(upload, batch_size=10).run()
+        assert [row['status'] for row in rows] == ['created'] * 20
+
+    def test_import_rejects_missing_columns(self):
+        """Test that a spreadsheet without the required columns is refused"""
+        upload = SimpleUploadedFile('import.csv', b'student,title\nfoo,bar\n', content_type='text/csv')
+        response = self.client.post('/internship/admin/import/', {'file': upload}, format='multipart')
+        assert response.status_code == 400
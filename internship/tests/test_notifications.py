@@ -0,0 +1,71 @@
+from datetime import date
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core import mail
+from rest_framework.test import APIClient
+
+from authentication.models import Role
+from internship.models import Internship, TeacherInvitation
+from jobs.models import Job
+from jobs.queue import run_pending
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestNotifications:
+    """Test cases for the e-mails queued by invitation and review actions"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.admin = User.objects.create_user(
+            username='notifyadmin', password='pass12345', role=Role.objects.get(name='Administrator')
+        )
+        self.student = User.objects.create_user(
+            username='notifystudent', email='student@uni.tn', password='pass12345',
+            role=Role.objects.get(name='Student')
+        )
+        self.teacher = User.objects.create_user(
+            username='notifyteacher', email='teacher@uni.tn', password='pass12345',
+            role=Role.objects.get(name='Teacher')
+        )
+        self.internship = Internship.objects.create(
+            student_id=self.student, type='PFE', company_name='Acme',
+            cahier_de_charges='cahiers_de_charges/a.pdf',
+            start_date=date(2025, 2, 1), end_date=date(2025, 6, 30), title='Pipeline'
+        )
+        self.client = APIClient()
+
+    def test_invitation_is_notified_off_the_request_path(self):
+        """Test that inviting a teacher queues an e-mail instead of sending it"""
+        self.client.force_authenticate(self.student)
+        response = self.client.post('/internship/invite/', {
+            'internship': self.internship.id, 'teacher': self.teacher.id
+        })
+        assert response.status_code == 201
+        assert len(mail.outbox) == 0
+        assert Job.objects.filter(task='internship.notify_invitation_sent').count() == 1
+
+        run_pending()
+        assert len(mail.outbox) == 1
+        assert mail.outbox[0].to == ['teacher@uni.tn']
+
+    def test_invitation_answer_is_notified(self):
+        """Test that the student hears back when the teacher answers"""
+        invitation = TeacherInvitation.objects.create(
+            internship=self.internship, student=self.student, teacher=self.teacher
+        )
+        self.client.force_authenticate(self.teacher)
+        self.client.patch(f'/internship/invitation/{invitation.id}/respond/', {'status': 1})
+        run_pending()
+        assert mail.outbox[0].to == ['student@uni.tn']
+        assert 'accepted' in mail.outbox[0].subject.lower()
+
+    def test_rejection_reason_is_notified(self):
+        """Test that the rejection reason reaches the student"""
+        self.client.force_authenticate(self.admin)
+        self.client.patch(f'/internship/admin/{self.internship.id}/reject/', {'reason': 'Missing agreement'})
+        run_pending()
+        assert mail.outbox[0].subject == 'Internship rejected'
+        assert 'Missing agreement' in mail.outbox[0].body
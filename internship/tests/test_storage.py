@@ -0,0 +1,75 @@
+import os
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+from PfeManagement.storage import ContentAddressedStorage
+
+
+class TestContentAddressedStorage:
+    """Test cases for the deduplicating upload storage"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, settings, tmp_path):
+        settings.MEDIA_ROOT = str(tmp_path)
+        self.storage = ContentAddressedStorage()
+
+    def _blobs(self):
+        return [
+            os.path.join(root, name)
+            for root, _, files in os.walk(self.storage.blob_root) for name in files
+        ]
+
+    def test_identical_uploads_share_one_blob(self):
+        """Test that the same content is stored once under distinct names"""
+        first = self.storage.save('cahiers_de_charges/spec.pdf', ContentFile(b'%PDF same content'))
+        second = self.storage.save('cahiers_de_charges/spec.pdf', ContentFile(b'%PDF same content'))
+        other = self.storage.save('reports/other.pdf', ContentFile(b'%PDF other content'))
+
+        assert first != second
+        assert os.path.samefile(self.storage.path(first), self.storage.path(second))
+        assert len(self._blobs()) == 2
+        assert self.storage.references(first) == 2
+        assert self.storage.references(other) == 1
+        with self.storage.open(second) as handle:
+            assert handle.read() == b'%PDF same content'
+
+    def test_blob_is_removed_with_its_last_name(self):
+        """Test that deleting names decrements the reference count down to the blob"""
+        first = self.storage.save('reports/a.pdf', ContentFile(b'report'))
+        second = self.storage.save('reports/b.pdf', ContentFile(b'report'))
+
+        self.storage.delete(first)
+        assert not self.storage.exists(first)
+        with self.storage.open(second) as handle:
+            assert handle.read() == b'report'
+        assert len(self._blobs()) == 1
+
+        self.storage.delete(second)
+        assert self._blobs() == []
+
+    def test_delete_does_not_hash_the_file(self, monkeypatch):
+        """Test that deletes find the blob through the link count and the stored digest"""
+        first = self.storage.save('reports/a.pdf', ContentFile(b'report'))
+        second = self.storage.save('reports/b.pdf', ContentFile(b'report'))
+
+        def hash_file(path):
+            raise AssertionError('hashed on delete')
+        monkeypatch.setattr(self.storage, '_digest', hash_file)
+        assert self.storage.references(first) == 2
+        self.storage.delete(first)
+        self.storage.delete(second)
+        assert self._blobs() == []
+
+    def test_media_root_must_be_dedicated(self, settings):
+        """Test that an unset MEDIA_ROOT, or one holding the project, is refused"""
+        for location in ('', str(settings.BASE_DIR), os.path.dirname(str(settings.BASE_DIR))):
+            settings.MEDIA_ROOT = location
+            with pytest.raises(ImproperlyConfigured):
+                ContentAddressedStorage().save('reports/a.pdf', ContentFile(b'report'))
+
+    def test_is_the_default_storage(self):
+        """Test that model file fields go through the deduplicating storage"""
+        assert isinstance(default_storage, ContentAddressedStorage)
@@ -0,0 +1,127 @@
+from datetime import date, timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from authentication.models import Role
+from internship.models import Internship, TeacherInvitation
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestSyncView:
+    """Test cases for the delta-sync endpoint"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, settings):
+        settings.SYNC_OVERLAP_SECONDS = 0
+        self.student = User.objects.create_user(
+            username='syncstudent', password='pass12345', role=Role.objects.get(name='Student')
+        )
+        self.teacher = User.objects.create_user(
+            username='syncteacher', password='pass12345', role=Role.objects.get(name='Teacher')
+        )
+        self.other = User.objects.create_user(
+            username='syncother', password='pass12345', role=Role.objects.get(name='Student')
+        )
+        self.internship = self._internship(self.student, 'Pipeline')
+        self.invitation = TeacherInvitation.objects.create(
+            internship=self.internship, student=self.student, teacher=self.teacher
+        )
+        self._internship(self.other, 'Not mine')
+        self.client = APIClient()
+
+    def _internship(self, student, title):
+        return Internship.objects.create(
+            student_id=student, type='PFE', company_name='Acme',
+            cahier_de_charges='cahiers_de_charges/a.pdf',
+            start_date=date(2025, 2, 1), end_date=date(2025, 6, 30), title=title
+        )
+
+    def _sync(self, user, cursor=None):
+        self.client.force_authenticate(user)
+        params = {'cursor': cursor} if cursor else {}
+        response = self.client.get('/internship/sync/', params)
+        assert response.status_code == 200
+        return response.data
+
+    def test_initial_sync_returns_visible_rows(self):
+        """Test that a sync without cursor returns everything the user can see"""
+        data = self._sync(self.student)
+        assert data['reset'] is True
+        assert [row['title'] for row in data['internships']] == ['Pipeline']
+        assert [row['id'] for row in data['invitations']] == [self.invitation.id]
+
+        data = self._sync(self.teacher)
+        assert data['internships'] == []
+        assert [row['id'] for row in data['invitations']] == [self.invitation.id]
+
+    def test_cursor_survives_an_unencoded_query_string(self):
+        """Test that a cursor pasted into a URL as is still parses"""
+        cursor = self._sync(self.student)['cursor']
+        assert cursor.endswith('Z') and '+' not in cursor
+        self.client.force_authenticate(self.student)
+        response = self.client.get(f'/internship/sync/?cursor={cursor}')
+        assert response.status_code == 200
+        assert response.data['reset'] is False
+
+    def test_steady_state_poll_is_empty(self):
+        """Test that polling again without changes returns nothing"""
+        cursor = self._sync(self.student)['cursor']
+        data = self._sync(self.student, cursor)
+        assert data['reset'] is False
+        assert data['internships'] == []
+        assert data['invitations'] == []
+        assert data['deleted'] == {'internships': [], 'invitations': []}
+
+    def test_changed_rows_are_returned(self):
+        """Test that only rows updated after the cursor come back"""
+        cursor = self._sync(self.teacher)['cursor']
+        self.invitation.status = 1
+        self.invitation.save()
+        self.internship.teacher_id = self.teacher
+        self.internship.save()
+        data = self._sync(self.teacher, cursor)
+        assert [row['status'] for row in data['invitations']] == [1]
+        assert [row['title'] for row in data['internships']] == ['Pipeline']
+
+    def test_deletions_are_reported_as_tombstones(self):
+        """Test that deleted internships and their invitations are listed"""
+        cursor = self._sync(self.student)['cursor']
+        internship_id = self.internship.id
+        self.internship.delete()
+        data = self._sync(self.student, cursor)
+        assert data['deleted'] == {'internships': [internship_id], 'invitations': [self.invitation.id]}
+        assert self._sync(self.teacher, cursor)['deleted']['invitations'] == [self.invitation.id]
+        assert self._sync(self.other, cursor)['deleted'] == {'internships': [], 'invitations': []}
+
+    def test_expired_cursor_forces_full_sync(self):
+        """Test that a cursor older than the tombstone retention triggers a reset"""
+        stale = (timezone.now() - timedelta(days=365)).isoformat()
+        data = self._sync(self.student, stale)
+        assert data['reset'] is True
+        assert len(data['internships']) == 1
+
+    def test_invalid_cursor(self):
+        """Test that a malformed cursor is rejected"""
+        self.client.force_authenticate(self.student)
+        assert self.client.get('/internship/sync/', {'cursor': 'yesterday'}).status_code == 400
+
+    def test_replaced_teacher_gets_a_tombstone(self):
+        """Test that a participant who loses sight of an internship is told to drop it"""
+        newcomer = User.objects.create_user(
+            username='syncnewcomer', password='pass12345', role=Role.objects.get(name='Teacher')
+        )
+        self.internship.teacher_id = self.teacher
+        self.internship.save()
+        cursor = self._sync(self.teacher)['cursor']
+
+        internship = Internship.objects.get(id=self.internship.id)
+        internship.teacher_id = newcomer
+        internship.save()
+        assert self._sync(self.teacher, cursor)['deleted']['internships'] == [self.internship.id]
+        assert self._sync(self.student, cursor)['deleted']['internships'] == []
+        assert [row['id'] for row in self._sync(newcomer, cursor)['internships']] == [self.internship.id]
@@ -0,0 +1,57 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from rest_framework.test import APIClient
+
+from authentication.models import Role
+from internship.models import Internship
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestLimitedUploads:
+    """Test cases for upload checks made while the body is received"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, settings, tmp_path):
+        settings.MEDIA_ROOT = str(tmp_path)
+        self.student = User.objects.create_user(
+            username='uploadstudent', password='pass12345', role=Role.objects.get(name='Student')
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def _create(self, content, name='cahier.pdf'):
+        return self.client.post('/internship/create/', {
+            'type': 'PFE', 'company_name': 'Acme', 'title': 'Pipeline',
+            'start_date': '2025-02-01', 'end_date': '2025-06-30',
+            'cahier_de_charges': SimpleUploadedFile(name, content, content_type='application/pdf'),
+        }, format='multipart')
+
+    def test_valid_document_is_accepted(self):
+        """Test that a real PDF goes through to the serializer"""
+        response = self._create(b'%PDF-1.4\n' + b'0' * 1000)
+        assert response.status_code == 201
+        assert Internship.objects.filter(student_id=self.student).count() == 1
+
+    def test_oversized_document_is_rejected(self):
+        """Test that a file over its limit gets 413 and creates nothing"""
+        response = self._create(b'%PDF-1.4\n' + b'0' * (10 * 1024 * 1024))
+        assert response.status_code == 413
+        assert 'exceeds the 10MB limit' in response.data['error']
+        assert not Internship.objects.exists()
+
+    def test_disguised_document_is_rejected(self):
+        """Test that the file kind comes from its bytes, not its name or content type"""
+        response = self._create(b'MZ\x90\x00' + b'\x00' * 200)
+        assert response.status_code == 415
+        assert not Internship.objects.exists()
+
+    def test_unexpected_file_field_is_rejected(self):
+        """Test that files outside upload_limits are refused"""
+        response = self.client.post('/internship/create/', {
+            'attachment': SimpleUploadedFile('a.pdf', b'%PDF-1.4 ....'),
+        }, format='multipart')
+        assert response.status_code == 400
+        assert "Unexpected file field 'attachment'" in response.data['error']
@@ -5,13 +5,23 @@ from .views import (
     GetInternshipDetailView,
     ListTeachersView,
     SendTeacherInvitationView,
+    SendTeacherInvitationsBatchView,
     GetStudentInvitationsView,
     RespondToInvitationView,
     GetPendingInternshipsView,
     ApproveInternshipView,
     RejectInternshipView,
     GetTeacherInvitationsView,
-
+    ExportInternshipsView,
+    ExportInvitationsView,
+    ExportDocumentsView,
+    SupervisorDocumentsView,
+    ImportInternshipsView,
+    CalendarFeedLinkView,
+    CalendarFeedView,
+    SyncView,
+    EventStreamTicketView,
+    event_stream,
 )
 
 urlpatterns = [
@@ -20,11 +30,22 @@ urlpatterns = [
     path('<int:id>/', GetInternshipDetailView.as_view(), name='internship-detail'),
     path('teachers/', ListTeachersView.as_view(), name='list-teachers'),
     path('invite/', SendTeacherInvitationView.as_view(), name='send-invitation'),
+    path('invite/batch/', SendTeacherInvitationsBatchView.as_view(), name='send-invitations-batch'),
     path('invitations/', GetStudentInvitationsView.as_view(), name='my-invitations'),
     path('invitation/<int:id>/respond/', RespondToInvitationView.as_view(), name='respond-invitation'),
     path('admin/pending/', GetPendingInternshipsView.as_view(), name='pending-internships'),
     path('admin/<int:id>/approve/', ApproveInternshipView.as_view(), name='approve-internship'),
     path('admin/<int:id>/reject/', RejectInternshipView.as_view(), name='reject-internship'),
     path('teacher/invitations/', GetTeacherInvitationsView.as_view(), name='teacher-invitations'),
+    path('teacher/documents/', SupervisorDocumentsView.as_view(), name='teacher-documents'),
+    path('admin/export/internships/', ExportInternshipsView.as_view(), name='export-internships'),
+    path('admin/export/invitations/', ExportInvitationsView.as_view(), name='export-invitations'),
+    path('admin/export/documents/', ExportDocumentsView.as_view(), name='export-documents'),
+    path('admin/import/', ImportInternshipsView.as_view(), name='import-internships'),
+    path('calendar/', CalendarFeedLinkView.as_view(), name='calendar-feed-link'),
+    path('calendar/<str:token>.ics', CalendarFeedView.as_view(), name='calendar-feed'),
+    path('sync/', SyncView.as_view(), name='sync'),
+    path('events/', event_stream, name='event-stream'),
+    path('events/ticket/', EventStreamTicketView.as_view(), name='event-stream-ticket'),
 
 ]
\ No newline at end of file
@@ -1,25 +1,62 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
 from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from django.shortcuts import get_object_or_404
+from django.http import Http404
+from django.db import IntegrityError, transaction
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 
 from .models import Internship, TeacherInvitation
+from .exports import (
+    INTERNSHIP_EXPORT_HEADER,
+    INVITATION_EXPORT_HEADER,
+    cohort_document_entries,
+    internship_export_rows,
+    invitation_export_rows,
+    parse_export_filters,
+    stream_csv,
+    supervisor_document_entries
+)
+from .imports import InternshipImporter, InternshipImportError
+from .ical import get_feed, make_feed_token, read_feed_token
+from .sync import changes_since, parse_cursor
+from .events import (
+    STREAM_TICKET_SECONDS, format_sse, get_broker, issue_stream_ticket, publish_on_commit, redeem_stream_ticket
+)
 from .serializers import (
     InternshipSerializer,
     TeacherInvitationSerializer,
     TeacherListSerializer
 )
 from authentication.models import User, Role
+from PfeManagement.conditional import ConditionalGetMixin, collection_state
+from PfeManagement.fieldsets import FIELDSET_PARAMETERS, parse_fieldset
+from PfeManagement.uploads import DOCUMENT_UPLOAD, LimitedMultiPartParser
+from PfeManagement.zipstream import stream_zip
+from jobs.queue import enqueue, enqueue_many
+from administrator import audit
 
 
 class CreateInternshipView(APIView):
     """Create a new internship"""
     permission_classes = [IsAuthenticated]
-    parser_classes = [MultiPartParser, FormParser]
+    parser_classes = [LimitedMultiPartParser, FormParser]
+    upload_limits = {'cahier_de_charges': DOCUMENT_UPLOAD}
 
     @swagger_auto_schema(
         request_body=InternshipSerializer,
@@ -36,24 +73,34 @@ class CreateInternshipView(APIView):
                 'error': 'Only students can create internships.'
             }, status=status.HTTP_403_FORBIDDEN)
 
-        serializer = InternshipSerializer(data=request.data)
+        serializer = InternshipSerializer(data=request.data, context={'request': request})
         if serializer.is_valid():
             serializer.save(student_id=request.user, status=0)  # Pending status
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class GetStudentInternshipsView(APIView):
+class GetStudentInternshipsView(ConditionalGetMixin, APIView):
     """Get all internships for the authenticated student"""
     permission_classes = [IsAuthenticated]
 
+    @swagger_auto_schema(manual_parameters=FIELDSET_PARAMETERS)
     def get(self, request):
-        internships = Internship.objects.filter(student_id=request.user)
-        serializer = InternshipSerializer(internships, many=True)
+        fieldset, error = parse_fieldset(request, InternshipSerializer)
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+
+        internships = Internship.objects.owned_by(request.user)
+        last_modified, count = collection_state(internships, 'updated_at', 'teacher_id__updated_at')
+        not_modified = self.collection_not_modified(request, last_modified, count, request.user.updated_at)
+        if not_modified:
+            return not_modified
+
+        serializer = InternshipSerializer(fieldset.apply(internships), many=True, fieldset=fieldset)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class GetInternshipDetailView(APIView):
+class GetInternshipDetailView(ConditionalGetMixin, APIView):
     """Get detailed information about a specific internship"""
     permission_classes = [IsAuthenticated]
 
@@ -64,7 +111,8 @@ class GetInternshipDetailView(APIView):
                 openapi.IN_PATH,
                 description="Internship ID",
                 type=openapi.TYPE_INTEGER
-            )
+            ),
+            *FIELDSET_PARAMETERS
         ],
         responses={
             200: InternshipSerializer,
@@ -72,19 +120,38 @@ class GetInternshipDetailView(APIView):
         }
     )
     def get(self, request, id):
-        internship = get_object_or_404(Internship, id=id)
-        
-        # Check if user has access to this internship
-        if internship.student_id != request.user and internship.teacher_id != request.user:
-            return Response({
-                'error': 'You do not have permission to view this internship.'
-            }, status=status.HTTP_403_FORBIDDEN)
+        fieldset, error = parse_fieldset(request, InternshipSerializer)
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Access rules are part of the query: one indexed lookup, forbidden rows are never loaded
+        internship = fieldset.apply(
+            Internship.objects.visible_to(request.user),
+            'updated_at', 'student_id__updated_at', 'teacher_id__updated_at'
+        ).filter(id=id).first()
+        if internship is None:
+            if Internship.objects.filter(id=id).exists():
+                return Response({
+                    'error': 'You do not have permission to view this internship.'
+                }, status=status.HTTP_403_FORBIDDEN)
+            raise Http404
+
+        timestamps = [
+            value for value in (
+                internship.updated_at,
+                internship.student_id.updated_at,
+                internship.teacher_id.updated_at if internship.teacher_id else None,
+            ) if value
+        ]
+        not_modified = self.not_modified(request, max(timestamps) if timestamps else None)
+        if not_modified:
+            return not_modified
         
-        serializer = InternshipSerializer(internship)
+        serializer = InternshipSerializer(internship, fieldset=fieldset)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class ListTeachersView(APIView):
+class ListTeachersView(ConditionalGetMixin, APIView):
     """Get list of all teachers for sending invitations"""
     permission_classes = [IsAuthenticated]
 
@@ -104,6 +171,11 @@ class ListTeachersView(APIView):
         
         # Get all users with Teacher role
         teachers = User.objects.filter(role=teacher_role)
+        not_modified = self.collection_not_modified(request, *collection_state(teachers))
+        if not_modified:
+            return not_modified
+
+        teachers = teachers.select_related('role')
         serializer = TeacherListSerializer(teachers, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -129,27 +201,168 @@ class SendTeacherInvitationView(APIView):
 
         # Verify internship belongs to student
         internship_id = request.data.get('internship')
-        internship = get_object_or_404(Internship, id=internship_id)
-        
-        if internship.student_id != request.user:
+        if not Internship.objects.owned_by(request.user).filter(id=internship_id).exists():
+            get_object_or_404(Internship, id=internship_id)
             return Response({
                 'error': 'You can only send invitations for your own internships.'
             }, status=status.HTTP_403_FORBIDDEN)
 
         serializer = TeacherInvitationSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save(student=request.user, status=0)  # Pending
+            with transaction.atomic():
+                invitation = serializer.save(student=request.user, status=0)  # Pending
+                enqueue('internship.notify_invitation_sent', {'invitation_id': invitation.id})
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class GetStudentInvitationsView(APIView):
+MAX_BATCH_INVITATIONS = 20
+
+
+class SendTeacherInvitationsBatchView(APIView):
+    """Send invitations to several teachers for the same internship"""
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                'internship': openapi.Schema(type=openapi.TYPE_INTEGER, description='Internship ID'),
+                'teachers': openapi.Schema(
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(type=openapi.TYPE_INTEGER),
+                    description='Teacher IDs'
+                ),
+                'message': openapi.Schema(type=openapi.TYPE_STRING, description='Optional message')
+            },
+            required=['internship', 'teachers']
+        ),
+        responses={
+            200: 'Per-teacher outcomes, nothing new was sent',
+            201: 'Per-teacher outcomes, at least one invitation was sent',
+            400: 'Bad Request',
+            403: 'Forbidden'
+        }
+    )
+    def post(self, request):
+        # Check if user is a student
+        if not request.user.role or request.user.role.name != 'Student':
+            return Response({
+                'error': 'Only students can send invitations.'
+            }, status=status.HTTP_403_FORBIDDEN)
+
+        teacher_ids = request.data.get('teachers')
+        if not isinstance(teacher_ids, list) or not teacher_ids:
+            return Response({
+                'teachers': ['A non-empty list of teacher IDs is required.']
+            }, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            teacher_ids = list(dict.fromkeys(int(teacher_id) for teacher_id in teacher_ids))
+        except (ValueError, TypeError):
+            return Response({
+                'teachers': ['Teacher IDs must be integers.']
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if len(teacher_ids) > MAX_BATCH_INVITATIONS:
+            return Response({
+                'teachers': [f'At most {MAX_BATCH_INVITATIONS} teachers can be invited at once.']
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        # Verify internship belongs to student
+        internship = Internship.objects.owned_by(request.user).filter(id=request.data.get('internship')).first()
+        if internship is None:
+            get_object_or_404(Internship, id=request.data.get('internship'))
+            return Response({
+                'error': 'You can only send invitations for your own internships.'
+            }, status=status.HTTP_403_FORBIDDEN)
+
+        # Resolve every requested user and their role in one query
+        roles = dict(User.objects.filter(id__in=teacher_ids).values_list('id', 'role__name'))
+        results = {}
+        valid_ids = []
+        for teacher_id in teacher_ids:
+            if teacher_id not in roles:
+                results[teacher_id] = {'teacher': teacher_id, 'status': 'not_found'}
+            elif roles[teacher_id] != 'Teacher':
+                results[teacher_id] = {'teacher': teacher_id, 'status': 'not_a_teacher'}
+            else:
+                valid_ids.append(teacher_id)
+
+        message = request.data.get('message') or ''
+        created_ids = []
+        if valid_ids:
+            existing = dict(TeacherInvitation.objects.filter(
+                internship=internship, teacher_id__in=valid_ids
+            ).values_list('teacher_id', 'id'))
+            new_invitations = [
+                TeacherInvitation(
+                    internship=internship, student=request.user, teacher_id=teacher_id,
+                    message=message, status=0
+                )
+                for teacher_id in valid_ids if teacher_id not in existing
+            ]
+            try:
+                with transaction.atomic():
+                    created = TeacherInvitation.objects.bulk_create(new_invitations)
+                    enqueue_many('internship.notify_invitation_sent', [
+                        {'invitation_id': invitation.id} for invitation in created
+                    ])
+            except IntegrityError:
+                # A concurrent request invited some of these teachers meanwhile: insert
+                # row by row, so only the rows this request inserted count as invited
+                created = []
+                for invitation in new_invitations:
+                    try:
+                        with transaction.atomic():
+                            created.extend(TeacherInvitation.objects.bulk_create([invitation]))
+                            enqueue('internship.notify_invitation_sent', {'invitation_id': invitation.id})
+                    except IntegrityError:
+                        continue
+                existing.update(TeacherInvitation.objects.filter(
+                    internship=internship, teacher_id__in=valid_ids
+                ).exclude(id__in=[invitation.id for invitation in created]).values_list('teacher_id', 'id'))
+
+            for invitation in created:
+                results[invitation.teacher_id] = {
+                    'teacher': invitation.teacher_id, 'status': 'invited', 'invitation': invitation.id
+                }
+                created_ids.append(invitation.id)
+            for teacher_id, invitation_id in existing.items():
+                results[teacher_id] = {
+                    'teacher': teacher_id, 'status': 'already_invited', 'invitation': invitation_id
+                }
+            # bulk_create sends no post_save, so publish the live events here
+            for teacher_id, result in results.items():
+                if result['status'] == 'invited':
+                    publish_on_commit([request.user.id, teacher_id], 'invitation.created', {
+                        'invitation_id': result['invitation'],
+                        'internship_id': internship.id,
+                        'status': 0,
+                    })
+
+        return Response({
+            'results': [results[teacher_id] for teacher_id in teacher_ids]
+        }, status=status.HTTP_201_CREATED if created_ids else status.HTTP_200_OK)
+
+
+class GetStudentInvitationsView(ConditionalGetMixin, APIView):
     """Get all invitations sent by the student"""
     permission_classes = [IsAuthenticated]
 
+    @swagger_auto_schema(manual_parameters=FIELDSET_PARAMETERS)
     def get(self, request):
-        invitations = TeacherInvitation.objects.filter(student=request.user)
-        serializer = TeacherInvitationSerializer(invitations, many=True)
+        fieldset, error = parse_fieldset(request, TeacherInvitationSerializer)
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+
+        invitations = TeacherInvitation.objects.owned_by(request.user)
+        last_modified, count = collection_state(
+            invitations, 'updated_at', 'internship__updated_at', 'teacher__updated_at'
+        )
+        not_modified = self.collection_not_modified(request, last_modified, count, request.user.updated_at)
+        if not_modified:
+            return not_modified
+
+        serializer = TeacherInvitationSerializer(fieldset.apply(invitations), many=True, fieldset=fieldset)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -182,10 +395,11 @@ class RespondToInvitationView(APIView):
                 'error': 'Only teachers can respond to invitations.'
             }, status=status.HTTP_403_FORBIDDEN)
 
-        invitation = get_object_or_404(TeacherInvitation, id=id)
+        invitation = TeacherInvitation.objects.addressed_to(request.user).with_people().filter(id=id).first()
         
         # Check if invitation is for this teacher
-        if invitation.teacher != request.user:
+        if invitation is None:
+            get_object_or_404(TeacherInvitation, id=id)
             return Response({
                 'error': 'You can only respond to invitations sent to you.'
             }, status=status.HTTP_403_FORBIDDEN)
@@ -214,24 +428,28 @@ class RespondToInvitationView(APIView):
                 'error': 'Invalid status. Use 1 for Accept, 2 for Reject.'
             }, status=status.HTTP_400_BAD_REQUEST)
 
-        invitation.status = new_status
-        invitation.save()
+        with transaction.atomic():
+            invitation.status = new_status
+            invitation.save()
 
-        # If accepted, assign teacher to internship
-        if new_status == 1:
-            internship = invitation.internship
-            internship.teacher_id = request.user
-            internship.status = 1  # Approved
-            internship.save()
+            # If accepted, assign teacher to internship
+            if new_status == 1:
+                internship = invitation.internship
+                internship.teacher_id = request.user
+                internship.status = 1  # Approved
+                internship.save()
+
+            enqueue('internship.notify_invitation_answered', {'invitation_id': invitation.id})
 
         serializer = TeacherInvitationSerializer(invitation)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
-class GetPendingInternshipsView(APIView):
+class GetPendingInternshipsView(ConditionalGetMixin, APIView):
     """Get all pending internships for admin review"""
     permission_classes = [IsAuthenticated]
 
     @swagger_auto_schema(
+        manual_parameters=FIELDSET_PARAMETERS,
         responses={
             200: InternshipSerializer(many=True),
             403: 'Forbidden - Only administrators can access'
@@ -244,9 +462,21 @@ class GetPendingInternshipsView(APIView):
                 'error': 'Only administrators can view pending internships.'
             }, status=status.HTTP_403_FORBIDDEN)
 
+        fieldset, error = parse_fieldset(request, InternshipSerializer)
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+
         # Get all pending internships
-        internships = Internship.objects.filter(status=0).order_by('-created_at')
-        serializer = InternshipSerializer(internships, many=True)
+        internships = Internship.objects.filter(status=0)
+        last_modified, count = collection_state(
+            internships, 'updated_at', 'student_id__updated_at', 'teacher_id__updated_at'
+        )
+        not_modified = self.collection_not_modified(request, last_modified, count)
+        if not_modified:
+            return not_modified
+
+        internships = fieldset.apply(internships).order_by('-created_at')
+        serializer = InternshipSerializer(internships, many=True, fieldset=fieldset)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -286,8 +516,11 @@ class ApproveInternshipView(APIView):
             }, status=status.HTTP_400_BAD_REQUEST)
 
         # Approve the internship
-        internship.status = 1  # Approved
-        internship.save()
+        with transaction.atomic():
+            internship.status = 1  # Approved
+            internship.save()
+            enqueue('internship.notify_internship_reviewed', {'internship_id': internship.id})
+            audit.record(request, 'internship.approve', internship)
 
         serializer = InternshipSerializer(internship)
         return Response({
@@ -340,24 +573,31 @@ class RejectInternshipView(APIView):
                 'error': 'Only pending internships can be rejected.'
             }, status=status.HTTP_400_BAD_REQUEST)
 
-        # Reject the internship
-        internship.status = 2  # Rejected
-        internship.save()
-
         # Optional: Store rejection reason (you might want to add a field to the model)
         reason = request.data.get('reason', '')
 
+        # Reject the internship
+        with transaction.atomic():
+            internship.status = 2  # Rejected
+            internship.save()
+            enqueue('internship.notify_internship_reviewed', {
+                'internship_id': internship.id,
+                'reason': reason
+            })
+            audit.record(request, 'internship.reject', internship, reason=reason)
+
         serializer = InternshipSerializer(internship)
         return Response({
             'message': 'Internship rejected successfully.',
             'data': serializer.data
         }, status=status.HTTP_200_OK)
 
-class GetTeacherInvitationsView(APIView):
+class GetTeacherInvitationsView(ConditionalGetMixin, APIView):
     """Get all invitations received by the teacher"""
     permission_classes = [IsAuthenticated]
 
     @swagger_auto_schema(
+        manual_parameters=FIELDSET_PARAMETERS,
         responses={
             200: TeacherInvitationSerializer(many=True),
             403: 'Forbidden - Only teachers can access'
@@ -370,10 +610,376 @@ class GetTeacherInvitationsView(APIView):
                 'error': 'Only teachers can view invitations.'
             }, status=status.HTTP_403_FORBIDDEN)
 
+        fieldset, error = parse_fieldset(request, TeacherInvitationSerializer)
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+
         # Get all invitations for this teacher
-        invitations = TeacherInvitation.objects.filter(
-            teacher=request.user
-        ).select_related('student', 'internship')
+        invitations = TeacherInvitation.objects.addressed_to(request.user)
+        last_modified, count = collection_state(
+            invitations, 'updated_at', 'internship__updated_at', 'student__updated_at'
+        )
+        not_modified = self.collection_not_modified(request, last_modified, count, request.user.updated_at)
+        if not_modified:
+            return not_modified
+
+        invitations = fieldset.apply(invitations)
         
-        serializer = TeacherInvitationSerializer(invitations, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
\ No newline at end of file
+        serializer = TeacherInvitationSerializer(invitations, many=True, fieldset=fieldset)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+EXPORT_FILTER_PARAMETERS = [
+    openapi.Parameter('status', openapi.IN_QUERY, description="Filter by status code", type=openapi.TYPE_INTEGER),
+    openapi.Parameter('type', openapi.IN_QUERY, description="Filter by internship type", type=openapi.TYPE_STRING),
+    openapi.Parameter('date_from', openapi.IN_QUERY, description="Earliest date (YYYY-MM-DD)", type=openapi.TYPE_STRING),
+    openapi.Parameter('date_to', openapi.IN_QUERY, description="Latest date (YYYY-MM-DD)", type=openapi.TYPE_STRING),
+]
+
+
+class ExportInternshipsView(APIView):
+    """Stream internships as CSV for admin exports"""
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        manual_parameters=EXPORT_FILTER_PARAMETERS,
+        responses={
+            200: 'CSV file',
+            400: 'Bad Request',
+            403: 'Forbidden - Only administrators can export'
+        }
+    )
+    def get(self, request):
+        # Check if user is an administrator
+        if not request.user.role or request.user.role.name != 'Administrator':
+            return Response({
+                'error': 'Only administrators can export internships.'
+            }, status=status.HTTP_403_FORBIDDEN)
+
+        filters, error = parse_export_filters(request.query_params)
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+
+        response = StreamingHttpResponse(
+            stream_csv(INTERNSHIP_EXPORT_HEADER, internship_export_rows(filters)),
+            content_type='text/csv'
+        )
+        response['Content-Disposition'] = 'attachment; filename="internships.csv"'
+        return response
+
+
+class ExportInvitationsView(APIView):
+    """Stream teacher invitations as CSV for admin exports"""
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        manual_parameters=EXPORT_FILTER_PARAMETERS,
+        responses={
+            200: 'CSV file',
+            400: 'Bad Request',
+            403: 'Forbidden - Only administrators can export'
+        }
+    )
+    def get(self, request):
+        # Check if user is an administrator
+        if not request.user.role or request.user.role.name != 'Administrator':
+            return Response({
+                'error': 'Only administrators can export invitations.'
+            }, status=status.HTTP_403_FORBIDDEN)
+
+        filters, error = parse_export_filters(request.query_params)
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+
+        response = StreamingHttpResponse(
+            stream_csv(INVITATION_EXPORT_HEADER, invitation_export_rows(filters)),
+            content_type='text/csv'
+        )
+        response['Content-Disposition'] = 'attachment; filename="invitations.csv"'
+        return response
+
+
+class ExportDocumentsView(APIView):
+    """Stream the cahiers de charges of a cohort as one ZIP archive (admin only)"""
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        manual_parameters=EXPORT_FILTER_PARAMETERS,
+        responses={
+            200: 'ZIP archive',
+            400: 'Bad Request',
+            403: 'Forbidden - Only administrators can export'
+        }
+    )
+    def get(self, request):
+        # Check if user is an administrator
+        if not request.user.role or request.user.role.name != 'Administrator':
+            return Response({
+                'error': 'Only administrators can export documents.'
+            }, status=status.HTTP_403_FORBIDDEN)
+
+        filters, error = parse_export_filters(request.query_params)
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+
+        response = StreamingHttpResponse(
+            stream_zip(cohort_document_entries(filters)),
+            content_type='application/zip'
+        )
+        response['Content-Disposition'] = 'attachment; filename="cahiers-de-charges.zip"'
+        return response
+
+
+class SupervisorDocumentsView(APIView):
+    """Stream the documents of a teacher's students as one ZIP archive"""
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        responses={
+            200: 'ZIP archive',
+            403: 'Forbidden - Only teachers can download their students\' documents'
+        }
+    )
+    def get(self, request):
+        if not request.user.role or request.user.role.name != 'Teacher':
+            return Response({
+                'error': 'Only teachers can download their students\' documents.'
+            }, status=status.HTTP_403_FORBIDDEN)
+
+        response = StreamingHttpResponse(
+            stream_zip(supervisor_document_entries(request.user)),
+            content_type='application/zip'
+        )
+        response['Content-Disposition'] = 'attachment; filename="student-documents.zip"'
+        return response
+
+
+class ImportInternshipsView(APIView):
+    """Bulk import internships from a CSV spreadsheet (admin only)"""
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser, FormParser]
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter(
+                'file',
+                openapi.IN_FORM,
+                description="CSV file with student, teacher, type, company_name, title, "
+                            "description, start_date, end_date and cahier_de_charges columns",
+                type=openapi.TYPE_FILE,
+                required=True
+            ),
+            openapi.Parameter(
+                'documents',
+                openapi.IN_FORM,
+                description="Optional ZIP archive with the referenced cahier de charges files",
+                type=openapi.TYPE_FILE
+            )
+        ],
+        responses={
+            200: 'Per-row import report',
+            400: 'Bad Request',
+            403: 'Forbidden - Only administrators can import internships'
+        }
+    )
+    def post(self, request):
+        # Check if user is an administrator
+        if not request.user.role or request.user.role.name != 'Administrator':
+            return Response({
+                'error': 'Only administrators can import internships.'
+            }, status=status.HTTP_403_FORBIDDEN)
+
+        csv_file = request.FILES.get('file')
+        if csv_file is None:
+            return Response({
+                'error': 'A CSV file is required.'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            importer = InternshipImporter(csv_file, archive=request.FILES.get('documents'))
+            rows = importer.run()
+        except InternshipImportError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        created = sum(1 for row in rows if row['status'] == 'created')
+        return Response({
+            'message': f'{created} internship(s) imported.',
+            'created': created,
+            'failed': len(rows) - created,
+            'rows': rows
+        }, status=status.HTTP_200_OK)
+
+
+class CalendarFeedLinkView(APIView):
+    """Get the personal iCalendar feed URL of the authenticated user"""
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        responses={
+            200: openapi.Response(
+                description="Calendar feed URL",
+                examples={"application/json": {"url": "https://example.com/internship/calendar/1:abc.ics"}}
+            )
+        }
+    )
+    def get(self, request):
+        token = make_feed_token(request.user)
+        url = request.build_absolute_uri(reverse('calendar-feed', kwargs={'token': token}))
+        return Response({'url': url}, status=status.HTTP_200_OK)
+
+
+class CalendarFeedView(APIView):
+    """iCalendar feed of the soutenances a user takes part in, authenticated by its token"""
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    def get(self, request, token):
+        user_id = read_feed_token(token)
+        if user_id is None or not User.objects.filter(id=user_id, is_active=True).exists():
+            return Response({
+                'error': 'Calendar feed not found.'
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        feed = get_feed(user_id)
+        not_modified = get_conditional_response(
+            request, etag=feed['etag'], last_modified=int(feed['last_modified'])
+        )
+        if not_modified is not None:
+            return not_modified
+
+        response = HttpResponse(feed['body'], content_type='text/calendar; charset=utf-8')
+        response['ETag'] = feed['etag']
+        response['Last-Modified'] = http_date(feed['last_modified'])
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+
+class SyncView(APIView):
+    """Get the internships and invitations of the user that changed since a cursor"""
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter(
+                'cursor',
+                openapi.IN_QUERY,
+                description="Cursor returned by the previous sync; omit for a full sync",
+                type=openapi.TYPE_STRING
+            )
+        ],
+        responses={
+            200: openapi.Response(
+                description="Changes since the cursor",
+                examples={
+                    "application/json": {
+                        "cursor": "2025-03-01T10:00:00+00:00",
+                        "reset": False,
+                        "internships": [],
+                        "invitations": [],
+                        "deleted": {"internships": [12], "invitations": []}
+                    }
+                }
+            ),
+            400: 'Bad Request'
+        }
+    )
+    def get(self, request):
+        try:
+            since = parse_cursor(request.query_params.get('cursor'))
+        except ValueError:
+            return Response({
+                'error': 'Invalid cursor.'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        changes = changes_since(request.user, since)
+        return Response({
+            'cursor': changes['cursor'],
+            'reset': changes['reset'],
+            'internships': InternshipSerializer(changes['internships'], many=True).data,
+            'invitations': TeacherInvitationSerializer(changes['invitations'], many=True).data,
+            'deleted': changes['deleted']
+        }, status=status.HTTP_200_OK)
+
+
+class EventStreamTicketView(APIView):
+    """Get a single-use ticket that opens the event stream of the authenticated user"""
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        responses={
+            201: openapi.Response(
+                description="Stream URL, valid once and for a few seconds",
+                examples={"application/json": {
+                    "url": "https://example.com/internship/events/?ticket=abc", "expires_in": 30
+                }}
+            )
+        }
+    )
+    def post(self, request):
+        ticket = issue_stream_ticket(request.user)
+        url = request.build_absolute_uri(f"{reverse('event-stream')}?ticket={ticket}")
+        return Response({'url': url, 'expires_in': STREAM_TICKET_SECONDS}, status=status.HTTP_201_CREATED)
+
+
+@sync_to_async
+def _header_user(request):
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = authentication.get_raw_token(header) if header else None
+    if not raw_token:
+        return None
+    try:
+        return authentication.get_user(authentication.get_validated_token(raw_token))
+    except (InvalidToken, AuthenticationFailed):
+        return None
+
+
+async def _authenticate_stream(request):
+    """
+    Resolve the user of an event stream from the Authorization header, or from
+    the ?ticket= of EventStreamTicketView for browsers' EventSource, which
+    cannot send headers. Access tokens are never taken from the URL.
+    """
+    ticket = request.GET.get('ticket')
+    if not ticket:
+        return await _header_user(request)
+    user_id = await redeem_stream_ticket(ticket)
+    if user_id is None:
+        return None
+    return await User.objects.filter(id=user_id, is_active=True).afirst()
+
+
+async def event_stream(request):
+    """Server-sent events with live invitation and internship status updates (requires ASGI)"""
+    if not isinstance(request, ASGIRequest):
+        # A WSGI server drains the whole response before sending it, and this one never ends
+        return JsonResponse({
+            'error': 'Live events are only served under ASGI (SERVER_INTERFACE=asgi).'
+        }, status=status.HTTP_501_NOT_IMPLEMENTED)
+    user = await _authenticate_stream(request)
+    if user is None:
+        return JsonResponse({
+            'error': 'Authentication credentials were not provided or are invalid.'
+        }, status=status.HTTP_401_UNAUTHORIZED)
+
+    heartbeat = getattr(settings, 'EVENTS_HEARTBEAT_SECONDS', 20)
+    broker = get_broker()
+
+    async def stream():
+        subscription = broker.subscribe(user.id)
+        try:
+            # Sent right away so proxies and the client see the stream open
+            yield 'retry: 5000\n\n'
+            while True:
+                try:
+                    message = await asyncio.wait_for(subscription.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield ': ping\n\n'
+                    continue
+                yield format_sse(message)
+        finally:
+            broker.unsubscribe(subscription)
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
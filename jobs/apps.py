@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class JobsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'jobs'
+    def ready(self):
+        from django.utils.module_loading import autodiscover_modules
+        # Register the @task functions declared in each app's tasks.py
+        autodiscover_modules('tasks')
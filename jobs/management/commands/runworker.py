@@ -0,0 +1,83 @@
+import os
+import signal
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from jobs.queue import claim_jobs, release_stale_jobs, run_job
+
+
+class Command(BaseCommand):
+    help = 'Run the background job worker'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=4, help='Number of jobs run in parallel')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds to sleep when the queue is empty')
+        parser.add_argument('--burst', action='store_true', help='Exit once the queue is empty')
+
+    def handle(self, *args, **options):
+        concurrency = max(1, options['concurrency'])
+        poll_interval = options['poll_interval']
+        worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        stopping = threading.Event()
+        slots = threading.Semaphore(concurrency)
+
+        def stop(signum, frame):
+            self.stdout.write('Shutting down after running jobs finish...')
+            stopping.set()
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+
+        def execute(job):
+            try:
+                run_job(job)
+            finally:
+                # Worker threads keep their own connection; drop it if it went bad
+                close_old_connections()
+                slots.release()
+
+        # Jobs of a worker that died are put back once their lock is stale; checked a few
+        # times per lock timeout, so they wait at most a little longer than that
+        release_interval = getattr(settings, 'JOBS_LOCK_TIMEOUT_SECONDS', 15 * 60) / 4
+        next_release = time.monotonic()
+
+        self.stdout.write(f'Worker {worker_id} started with concurrency {concurrency}')
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='job') as pool:
+            while not stopping.is_set():
+                # Wait for a free slot, then claim as many jobs as there are free slots
+                slots.acquire()
+                free = 1
+                while free < concurrency and slots.acquire(blocking=False):
+                    free += 1
+
+                close_old_connections()
+                if time.monotonic() >= next_release:
+                    release_stale_jobs()
+                    next_release = time.monotonic() + release_interval
+                jobs = claim_jobs(worker_id, free)
+                for _ in range(free - len(jobs)):
+                    slots.release()
+                for job in jobs:
+                    pool.submit(execute, job)
+
+                if not jobs:
+                    if options['burst'] and self._idle(slots, concurrency):
+                        break
+                    stopping.wait(poll_interval)
+        connections.close_all()
+        self.stdout.write('Worker stopped')
+
+    def _idle(self, slots, concurrency):
+        """True when no job is running, i.e. every slot can be taken"""
+        taken = 0
+        while taken < concurrency and slots.acquire(blocking=False):
+            taken += 1
+        for _ in range(taken):
+            slots.release()
+        return taken == concurrency
@@ -0,0 +1,134 @@
+import logging
+import random
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+
+PENDING, RUNNING, DEAD = 0, 1, 2
+
+
+def task(name):
+    """Register a function as a background task under the given name"""
+    def decorator(func):
+        _registry[name] = func
+        func.task_name = name
+        return func
+    return decorator
+
+
+def get_task(name):
+    return _registry.get(name)
+
+
+def enqueue(name, payload=None, delay=None, max_attempts=None):
+    """
+    Queue a task. The job row is written on the current connection, so calling
+    this inside transaction.atomic() commits or rolls back with the caller's changes.
+    """
+    if name not in _registry:
+        raise KeyError(f"Unknown task '{name}'.")
+    run_at = timezone.now()
+    if delay:
+        run_at += delay
+    return Job.objects.create(
+        task=name,
+        payload=payload or {},
+        run_at=run_at,
+        max_attempts=max_attempts or getattr(settings, 'JOBS_MAX_ATTEMPTS', 5),
+    )
+
+
+def enqueue_many(name, payloads, max_attempts=None):
+    """Queue one job per payload with a single INSERT"""
+    if name not in _registry:
+        raise KeyError(f"Unknown task '{name}'.")
+    now = timezone.now()
+    max_attempts = max_attempts or getattr(settings, 'JOBS_MAX_ATTEMPTS', 5)
+    return Job.objects.bulk_create([
+        Job(task=name, payload=payload, run_at=now, max_attempts=max_attempts)
+        for payload in payloads
+    ])
+
+
+def retry_delay(attempts):
+    """Exponential backoff with jitter: roughly 10s, 20s, 40s... capped at one hour"""
+    base = getattr(settings, 'JOBS_RETRY_BASE_SECONDS', 10)
+    delay = min(base * (2 ** max(attempts - 1, 0)), 3600)
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+def release_stale_jobs():
+    """Put back jobs whose worker died while running them"""
+    timeout = getattr(settings, 'JOBS_LOCK_TIMEOUT_SECONDS', 15 * 60)
+    stale_before = timezone.now() - timedelta(seconds=timeout)
+    return Job.objects.filter(status=RUNNING, locked_at__lt=stale_before).update(
+        status=PENDING, locked_at=None, locked_by=''
+    )
+
+
+def claim_jobs(worker_id, limit):
+    """Atomically lock up to `limit` due jobs for this worker"""
+    now = timezone.now()
+    with transaction.atomic():
+        due = Job.objects.filter(status=PENDING, run_at__lte=now).order_by('run_at', 'id')
+        if connection.features.has_select_for_update_skip_locked:
+            # Concurrent workers skip each other's rows instead of blocking
+            due = due.select_for_update(skip_locked=True)
+        candidates = list(due.values_list('id', flat=True)[:limit])
+
+        claimed = []
+        for job_id in candidates:
+            # The status guard keeps claiming safe on backends without SKIP LOCKED
+            updated = Job.objects.filter(id=job_id, status=PENDING).update(
+                status=RUNNING, locked_at=now, locked_by=worker_id, attempts=F('attempts') + 1
+            )
+            if updated:
+                claimed.append(job_id)
+    return list(Job.objects.filter(id__in=claimed))
+
+
+def run_job(job):
+    """Execute a claimed job, then delete it, reschedule it or dead-letter it"""
+    func = get_task(job.task)
+    try:
+        if func is None:
+            raise LookupError(f"Unknown task '{job.task}'.")
+        func(**job.payload)
+    except Exception:
+        error = traceback.format_exc()
+        if job.attempts >= job.max_attempts:
+            logger.error("Job %s (%s) dead-lettered after %s attempts", job.pk, job.task, job.attempts)
+            Job.objects.filter(id=job.pk).update(
+                status=DEAD, locked_at=None, last_error=error, updated_at=timezone.now()
+            )
+        else:
+            logger.warning("Job %s (%s) failed, retrying", job.pk, job.task)
+            Job.objects.filter(id=job.pk).update(
+                status=PENDING, locked_at=None, locked_by='', last_error=error,
+                run_at=timezone.now() + retry_delay(job.attempts), updated_at=timezone.now()
+            )
+        return False
+    Job.objects.filter(id=job.pk).delete()
+    return True
+
+
+def run_pending(worker_id='inline', limit=100):
+    """Run due jobs synchronously until none are left; used by tests and --burst"""
+    processed = 0
+    while True:
+        jobs = claim_jobs(worker_id, limit)
+        if not jobs:
+            return processed
+        for job in jobs:
+            run_job(job)
+            processed += 1
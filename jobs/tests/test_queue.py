@@ -0,0 +1,95 @@
+import time
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from jobs.models import Job
+from jobs.queue import claim_jobs, enqueue, run_job, run_pending, task
+
+calls = []
+
+
+@task('tests.record')
+def record(value):
+    calls.append(value)
+
+
+@task('tests.sleep')
+def sleep(seconds):
+    time.sleep(seconds)
+
+
+@task('tests.explode')
+def explode():
+    raise RuntimeError('boom')
+
+
+@pytest.mark.django_db
+class TestJobQueue:
+    """Test cases for the database-backed job queue"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        calls.clear()
+
+    def test_enqueue_rejects_unknown_task(self):
+        """Test that only registered tasks can be queued"""
+        with pytest.raises(KeyError):
+            enqueue('tests.missing')
+
+    def test_successful_job_is_removed(self):
+        """Test that a job runs once and leaves the queue"""
+        enqueue('tests.record', {'value': 1})
+        assert run_pending() == 1
+        assert calls == [1]
+        assert not Job.objects.exists()
+
+    def test_delayed_job_is_not_claimed_early(self):
+        """Test that jobs only run once they are due"""
+        enqueue('tests.record', {'value': 1}, delay=timedelta(minutes=5))
+        assert claim_jobs('worker', 10) == []
+
+    def test_claimed_job_is_not_claimed_twice(self):
+        """Test that a running job is invisible to other workers"""
+        enqueue('tests.record', {'value': 1})
+        assert len(claim_jobs('worker-a', 10)) == 1
+        assert claim_jobs('worker-b', 10) == []
+
+    def test_failed_job_is_retried_with_backoff(self):
+        """Test that a failing job is rescheduled in the future"""
+        job = enqueue('tests.explode')
+        (claimed,) = claim_jobs('worker', 1)
+        assert run_job(claimed) is False
+        job.refresh_from_db()
+        assert job.status == 0
+        assert job.attempts == 1
+        assert job.run_at > timezone.now()
+        assert 'boom' in job.last_error
+
+    def test_exhausted_job_is_dead_lettered(self):
+        """Test that a job failing on its last attempt is kept as dead"""
+        job = enqueue('tests.explode', max_attempts=1)
+        run_pending()
+        job.refresh_from_db()
+        assert job.get_status_display() == 'Dead'
+
+    def test_worker_command_burst(self):
+        """Test that the worker command drains the queue and exits in burst mode"""
+        for value in range(5):
+            enqueue('tests.record', {'value': value})
+        call_command('runworker', '--burst', '--concurrency', '2', '--poll-interval', '0.01')
+        assert sorted(calls) == [0, 1, 2, 3, 4]
+
+    def test_worker_reclaims_jobs_that_go_stale_while_it_runs(self, settings):
+        """Test that stale jobs are released during the run, not only when the worker starts"""
+        settings.JOBS_LOCK_TIMEOUT_SECONDS = 2
+        enqueue('tests.sleep', {'seconds': 1.5})
+        # Locked by a worker that died, and only goes stale once this worker is running
+        orphan = enqueue('tests.record', {'value': 'orphaned'})
+        Job.objects.filter(id=orphan.id).update(
+            status=1, locked_at=timezone.now() - timedelta(seconds=1.4), locked_by='gone:1'
+        )
+        call_command('runworker', '--burst', '--concurrency', '2', '--poll-interval', '0.01')
+        assert calls == ['orphaned']
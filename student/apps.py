@@ -4,3 +4,5 @@ from django.apps import AppConfig
 class StudentConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'student'
+    def ready(self):
+        import student.signals
@@ -0,0 +1,244 @@
+"""
+Full-text search over report files.
+
+A background job extracts the text of each report (PDF with pypdf, DOCX from
+its XML) and stores it with one ReportTerm row per distinct term: a small
+inverted index that works the same on every database. Files are hashed, so
+indexing a report whose file did not change is a no-op. Search ranks reports
+with BM25 over the postings of the query terms and builds a highlighted
+snippet from the stored text.
+"""
+import hashlib
+import math
+import re
+import shutil
+import tempfile
+import unicodedata
+import zipfile
+from collections import Counter
+from xml.etree import ElementTree
+
+from django.db import transaction
+from django.db.models import Avg, Count
+from django.utils import timezone
+from django.utils.html import escape
+
+from .models import Report, ReportTerm, ReportText
+
+MAX_TERM_LENGTH = 40
+SPOOL_MAX_MEMORY = 1024 * 1024
+SNIPPET_LENGTH = 240
+
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or that the this to was were will with
+au aux avec ce ces dans de des du elle en et il ils la le les leur lui mais par pour qui que sa se ses
+son sur un une est sont nous vous
+""".split())
+
+WORD_RE = re.compile(r'\w+')
+WORD_NAMESPACE = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+
+class ExtractionError(Exception):
+    """The file could not be read as a PDF or DOCX document"""
+
+
+def normalize(word):
+    """Lowercase and strip accents, so 'Étude' matches 'etude'"""
+    decomposed = unicodedata.normalize('NFKD', word.lower())
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def tokenize(text):
+    for match in WORD_RE.finditer(text):
+        term = normalize(match.group())
+        if 1 < len(term) <= MAX_TERM_LENGTH and term not in STOPWORDS and not term.isdigit():
+            yield term
+
+
+def _extract_pdf(file):
+    from pypdf import PdfReader
+    from pypdf.errors import PyPdfError
+
+    try:
+        reader = PdfReader(file)
+        return '\n'.join(page.extract_text() or '' for page in reader.pages)
+    except PyPdfError as exc:
+        raise ExtractionError(str(exc))
+
+
+def _extract_docx(file):
+    try:
+        with zipfile.ZipFile(file) as archive:
+            root = ElementTree.fromstring(archive.read('word/document.xml'))
+    except (zipfile.BadZipFile, KeyError, ElementTree.ParseError) as exc:
+        raise ExtractionError(str(exc))
+    paragraphs = []
+    for paragraph in root.iter(f'{WORD_NAMESPACE}p'):
+        paragraphs.append(''.join(node.text or '' for node in paragraph.iter(f'{WORD_NAMESPACE}t')))
+    return '\n'.join(paragraphs)
+
+
+EXTRACTORS = {
+    '.pdf': _extract_pdf,
+    '.docx': _extract_docx,
+}
+
+
+def extract_text(file, name):
+    """Return the text of a PDF or DOCX file; other formats yield no text"""
+    extension = name[name.rfind('.'):].lower() if '.' in name else ''
+    extractor = EXTRACTORS.get(extension)
+    if extractor is None:
+        return ''
+    return extractor(file)
+
+
+def random_access(handle):
+    """
+    The parsers seek around the file; a streamed one (object storage) is
+    copied first, to disk past SPOOL_MAX_MEMORY.
+    """
+    if handle.seekable():
+        return handle
+    spooled = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+    shutil.copyfileobj(handle, spooled)
+    spooled.seek(0)
+    return spooled
+
+
+def file_hash(field_file):
+    digest = hashlib.sha256()
+    with field_file.open('rb') as handle:
+        for chunk in iter(lambda: handle.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def index_report(report_id, force=False):
+    """
+    (Re)build the index entries of a report. Returns False when the report is
+    gone, has no file, or its file is already indexed at the same hash.
+    """
+    report = Report.objects.filter(id=report_id).first()
+    if report is None or not report.file_path:
+        return False
+
+    content_hash = file_hash(report.file_path)
+    current = ReportText.objects.filter(report=report).values_list('content_hash', flat=True).first()
+    if current == content_hash and not force:
+        return False
+
+    error = ''
+    try:
+        with report.file_path.open('rb') as handle, random_access(handle) as readable:
+            text = extract_text(readable, report.file_path.name)
+    except ExtractionError as exc:
+        text, error = '', str(exc)
+    counts = Counter(tokenize(text))
+
+    with transaction.atomic():
+        ReportText.objects.update_or_create(report=report, defaults={
+            'content_hash': content_hash,
+            'text': text,
+            'length': sum(counts.values()),
+            'error': error,
+            'indexed_at': timezone.now(),
+        })
+        ReportTerm.objects.filter(report=report).delete()
+        ReportTerm.objects.bulk_create(
+            [ReportTerm(report=report, term=term, frequency=count) for term, count in counts.items()],
+            batch_size=1000
+        )
+    return True
+
+
+def stale_report_ids():
+    """Reports with a file but no index entry yet"""
+    return list(
+        Report.objects.exclude(file_path='').filter(text_index__isnull=True).values_list('id', flat=True)
+    )
+
+
+def search_reports(query, limit=20, k1=1.2, b=0.75):
+    """
+    Rank archived reports against a query with BM25.
+    Returns [(report, score, snippet)] best first.
+    """
+    terms = list(dict.fromkeys(tokenize(query)))
+    if not terms:
+        return []
+
+    totals = ReportText.objects.filter(report__is_archived=True).aggregate(
+        documents=Count('id'), average_length=Avg('length')
+    )
+    documents = totals['documents']
+    if not documents:
+        return []
+    average_length = totals['average_length'] or 1
+
+    postings = list(
+        ReportTerm.objects
+        .filter(term__in=terms, report__is_archived=True, report__text_index__isnull=False)
+        .values_list('report_id', 'term', 'frequency')
+    )
+    document_frequency = Counter(term for _, term, _ in postings)
+    lengths = dict(
+        ReportText.objects.filter(report_id__in={report_id for report_id, _, _ in postings})
+        .values_list('report_id', 'length')
+    )
+
+    scores = Counter()
+    for report_id, term, frequency in postings:
+        idf = math.log(1 + (documents - document_frequency[term] + 0.5) / (document_frequency[term] + 0.5))
+        norm = k1 * (1 - b + b * lengths.get(report_id, 0) / average_length)
+        scores[report_id] += idf * frequency * (k1 + 1) / (frequency + norm)
+
+    ranked = scores.most_common(limit)
+    reports = Report.objects.in_bulk([report_id for report_id, _ in ranked])
+    texts = dict(ReportText.objects.filter(report_id__in=reports).values_list('report_id', 'text'))
+    return [
+        (reports[report_id], score, make_snippet(texts.get(report_id, ''), terms))
+        for report_id, score in ranked if report_id in reports
+    ]
+
+
+def make_snippet(text, terms, length=SNIPPET_LENGTH):
+    """
+    HTML snippet of the passage with the most query terms, each wrapped in
+    <mark>. The text itself is escaped.
+    """
+    words = list(WORD_RE.finditer(text))
+    if not words:
+        return ''
+    term_set = set(terms)
+    hits = [index for index, match in enumerate(words) if normalize(match.group()) in term_set]
+
+    # Slide a window over the hits and keep the one covering the most distinct terms
+    best_start = hits[0] if hits else 0
+    best_count = 0
+    window = 30
+    for position, start in enumerate(hits):
+        covered = set()
+        for index in hits[position:]:
+            if index >= start + window:
+                break
+            covered.add(normalize(words[index].group()))
+        if len(covered) > best_count:
+            best_start, best_count = start, len(covered)
+
+    first = max(best_start - 5, 0)
+    begin = words[first].start()
+    end = min(begin + length, len(text))
+    passage = text[begin:end]
+
+    parts = []
+    cursor = 0
+    for match in WORD_RE.finditer(passage):
+        if normalize(match.group()) in term_set:
+            parts.append(escape(passage[cursor:match.start()]))
+            parts.append(f'<mark>{escape(match.group())}</mark>')
+            cursor = match.end()
+    parts.append(escape(passage[cursor:]))
+    snippet = ' '.join(''.join(parts).split())
+    return ('… ' if begin > 0 else '') + snippet + (' …' if end < len(text) else '')
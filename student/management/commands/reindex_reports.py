@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from jobs.queue import enqueue_many
+from student.indexing import stale_report_ids
+from student.models import Report
+
+
+class Command(BaseCommand):
+    help = 'Queue text indexing for reports missing from the search index'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help='Queue every report; unchanged files are skipped by their hash')
+        parser.add_argument('--force', action='store_true',
+                            help='Re-extract even when the file hash is unchanged (with --all)')
+
+    def handle(self, *args, **options):
+        if options['all']:
+            report_ids = list(Report.objects.exclude(file_path='').values_list('id', flat=True))
+        else:
+            report_ids = stale_report_ids()
+        enqueue_many('student.index_report', [
+            {'report_id': report_id, 'force': options['force']} for report_id in report_ids
+        ])
+        self.stdout.write(f'Queued {len(report_ids)} report(s) for indexing')
@@ -15,4 +15,29 @@ class Report(models.Model):
     publish_date = models.DateField(auto_now_add=True, null=True)
 
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return self.name
+
+class ReportText(models.Model):
+    """Text extracted from a report file; content_hash makes re-indexing idempotent"""
+    report = models.OneToOneField(Report, on_delete=models.CASCADE, related_name='text_index')
+    content_hash = models.CharField(max_length=64)
+    text = models.TextField(blank=True)
+    length = models.PositiveIntegerField(default=0)  # Number of indexed terms, for ranking
+    error = models.TextField(blank=True)
+    indexed_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"Text of {self.report}"
+
+
+class ReportTerm(models.Model):
+    """Inverted index posting: how often a term occurs in a report"""
+    report = models.ForeignKey(Report, on_delete=models.CASCADE, related_name='terms')
+    term = models.CharField(max_length=40)
+    frequency = models.PositiveIntegerField()
+
+    class Meta:
+        unique_together = ['term', 'report']
+
+    def __str__(self):
+        return f"{self.term} x{self.frequency} in report {self.report_id}"
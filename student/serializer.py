@@ -1,7 +1,10 @@
 from rest_framework import serializers
 from .models import Report
+from PfeManagement.directuploads import DirectUploadFileField
 
 class ReportSerializer(serializers.ModelSerializer):
+    file_path = DirectUploadFileField(upload_target='report')
+
     class Meta:
         model = Report
         fields = ['id', 'name', 'description', 'file_path', 'is_archived', 'added_by', 'publish_date']
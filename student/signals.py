@@ -0,0 +1,21 @@
+from django.db import transaction
+from django.db.models.signals import post_init, post_save
+from django.dispatch import receiver
+
+from student.models import Report
+from jobs.queue import enqueue
+
+
+@receiver(post_init, sender=Report)
+def remember_loaded_file(sender, instance, **kwargs):
+    instance._loaded_file = instance.__dict__.get('file_path')
+
+
+@receiver(post_save, sender=Report)
+def index_uploaded_report(sender, instance, created, **kwargs):
+    # Extraction runs in a worker; only a new or replaced file needs it
+    if not instance.file_path:
+        return
+    if created or str(instance.file_path) != str(instance._loaded_file):
+        transaction.on_commit(lambda: enqueue('student.index_report', {'report_id': instance.id}))
+    instance._loaded_file = instance.file_path.name
@@ -0,0 +1,8 @@
+from jobs.queue import task
+from .indexing import index_report
+
+
+@task('student.index_report')
+def index_report_task(report_id, force=False):
+    """Extract the text of a report file and update the search index"""
+    index_report(report_id, force=force)
@@ -0,0 +1,107 @@
+import io
+import zipfile
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from rest_framework.test import APIClient
+
+from jobs.queue import run_pending
+from student.indexing import index_report, make_snippet
+from student.models import Report, ReportTerm, ReportText
+
+User = get_user_model()
+
+
+def make_docx(*paragraphs):
+    body = ''.join(f'<w:p><w:r><w:t>{text}</w:t></w:r></w:p>' for text in paragraphs)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        archive.writestr('word/document.xml', (
+            '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+            f'<w:body>{body}</w:body></w:document>'
+        ))
+    return buffer.getvalue()
+
+
+def make_pdf(text):
+    stream = f'BT /F1 12 Tf 72 720 Td ({text}) Tj ET'.encode()
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+        b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R '
+        b'/Resources << /Font << /F1 5 0 R >> >> >>',
+        b'<< /Length %d >>\nstream\n' % len(stream) + stream + b'\nendstream',
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+    ]
+    out = io.BytesIO()
+    out.write(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b'%d 0 obj\n' % number + body + b'\nendobj\n')
+    xref = out.tell()
+    out.write(b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b'%010d 00000 n \n' % offset)
+    out.write(b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+@pytest.mark.django_db
+class TestReportSearch:
+    """Test cases for report text extraction and search"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, settings, tmp_path):
+        settings.MEDIA_ROOT = str(tmp_path)
+        self.user = User.objects.create_user(username='reader', password='pass12345')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _report(self, name, content, filename, archived=True):
+        report = Report(name=name, description='', is_archived=archived, added_by=self.user)
+        report.file_path.save(filename, ContentFile(content), save=False)
+        report.save()
+        return report
+
+    def test_upload_queues_extraction_off_the_request_path(self, django_capture_on_commit_callbacks):
+        """Test that saving a report only queues indexing, which a worker then performs"""
+        with django_capture_on_commit_callbacks(execute=True):
+            report = self._report('Pipeline', make_pdf('Realtime data pipeline with Kafka'), 'pipeline.pdf')
+        assert not ReportText.objects.exists()
+        run_pending()
+        assert 'Kafka' in ReportText.objects.get(report=report).text
+        assert ReportTerm.objects.filter(report=report, term='kafka').exists()
+
+    def test_reindexing_is_idempotent(self):
+        """Test that an unchanged file is skipped and a replaced one re-indexed"""
+        report = self._report('Notes', make_docx('Étude de marché', 'Marketing plan'), 'notes.docx')
+        assert index_report(report.id)
+        assert not index_report(report.id)
+        terms = set(ReportTerm.objects.filter(report=report).values_list('term', flat=True))
+        assert {'etude', 'marche', 'marketing', 'plan'} <= terms
+
+        report.file_path.save('notes2.docx', ContentFile(make_docx('Supply chain')), save=True)
+        assert index_report(report.id)
+        assert set(ReportTerm.objects.filter(report=report).values_list('term', flat=True)) == {'supply', 'chain'}
+
+    def test_search_ranks_and_highlights(self):
+        """Test that the most relevant archived report comes first with a highlighted snippet"""
+        best = self._report('A', make_docx('Kafka streaming', 'Kafka consumers and Kafka topics'), 'a.docx')
+        other = self._report('B', make_docx('Web application using a message queue like Kafka'), 'b.docx')
+        hidden = self._report('C', make_docx('Kafka Kafka Kafka'), 'c.docx', archived=False)
+        for report in (best, other, hidden):
+            index_report(report.id)
+
+        response = self.client.get('/student/reports/search/', {'q': 'kafka streaming'})
+        assert response.status_code == 200
+        assert [result['id'] for result in response.data] == [best.id, other.id]
+        assert '<mark>Kafka</mark>' in response.data[0]['snippet']
+        assert self.client.get('/student/reports/search/').status_code == 400
+
+    def test_snippet_escapes_text(self):
+        """Test that extracted text cannot inject markup"""
+        snippet = make_snippet('<script>alert(1)</script> kafka', ['kafka'])
+        assert '<script>' not in snippet
+        assert '<mark>kafka</mark>' in snippet
@@ -1,6 +1,7 @@
 from django.urls import path
-from .views import  ReportView
+from .views import ReportView, ReportSearchView
 
 urlpatterns = [
     path('reports/', ReportView.as_view(), name='reports'),
+    path('reports/search/', ReportSearchView.as_view(), name='search-reports'),
 ]
\ No newline at end of file
@@ -1,18 +1,22 @@
 from student.serializer import ReportSerializer
 from student.models import Report
+from student.indexing import search_reports
+from PfeManagement.uploads import DOCUMENT_UPLOAD, LimitedMultiPartParser
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.parsers import FormParser
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework import viewsets, status
 from drf_yasg.utils import swagger_auto_schema
+from drf_yasg import openapi
 import os
 from django.conf import settings
 
 class ReportView(APIView):
     permission_classes = [IsAuthenticated]
-    parser_classes = [MultiPartParser, FormParser]
+    parser_classes = [LimitedMultiPartParser, FormParser]
+    upload_limits = {'file_path': DOCUMENT_UPLOAD}
 
     def get(self, request):
         reports = Report.objects.filter(is_archived=True)
@@ -21,8 +25,36 @@ class ReportView(APIView):
 
     @swagger_auto_schema(request_body=ReportSerializer)
     def post(self, request):
-        serializer = ReportSerializer(data=request.data)
+        serializer = ReportSerializer(data=request.data, context={'request': request})
         if serializer.is_valid():
             serializer.save(added_by=request.user)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class ReportSearchView(APIView):
+    """Full-text search over archived reports"""
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter('q', openapi.IN_QUERY, description="Search terms", type=openapi.TYPE_STRING),
+            openapi.Parameter('limit', openapi.IN_QUERY, description="Maximum results (max 50)", type=openapi.TYPE_INTEGER),
+        ]
+    )
+    def get(self, request):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({'error': 'A search query (q) is required.'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = min(max(int(request.query_params.get('limit', 20)), 1), 50)
+        except ValueError:
+            return Response({'error': 'limit must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        results = []
+        for report, score, snippet in search_reports(query, limit=limit):
+            data = ReportSerializer(report).data
+            data['score'] = round(score, 4)
+            data['snippet'] = snippet
+            results.append(data)
+        return Response(results, status=status.HTTP_200_OK)